@@ -0,0 +1,69 @@
+"""
+Benchmark de la normalisation des numéros de téléphone à l'import.
+
+Compare format_phone_number appliqué ligne par ligne (.apply) et sa version
+vectorisée format_phone_number_column, vérifie que les deux donnent le même
+résultat et affiche le débit en lignes par seconde.
+
+Usage : python bench_phone_normalization.py [nombre_de_lignes]
+"""
+
+import random
+import sys
+import time
+
+import pandas as pd
+
+from main import format_phone_number, format_phone_number_column
+
+
+def sample_phone_numbers(rows: int, seed: int = 42) -> pd.Series:
+    """Numéros dans les formats rencontrés dans les fichiers de leads."""
+    rng = random.Random(seed)
+    values = []
+    for _ in range(rows):
+        digits = "".join(rng.choice("0123456789") for _ in range(9))
+        values.append(
+            rng.choice(
+                [
+                    f"0{digits}",
+                    f"+33{digits}",
+                    f"33{digits}",
+                    f"{rng.randint(1, 7)}{digits[1:]}",
+                    f"0{digits[0]} {digits[1:3]} {digits[3:5]} {digits[5:7]} {digits[7:]}",
+                    f"0{digits[0]}.{digits[1:3]}.{digits[3:5]}.{digits[5:7]}.{digits[7:]}",
+                    f"(+33) {digits}",
+                    f"0033{digits}",
+                    f"+44{digits}",
+                    f"12{digits}",
+                    "",
+                    None,
+                ]
+            )
+        )
+    return pd.Series(values, dtype=object)
+
+
+def rows_per_second(rows: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    return rows / (time.perf_counter() - start)
+
+
+def main(rows: int) -> None:
+    values = sample_phone_numbers(rows)
+
+    expected = values.apply(format_phone_number)
+    actual = format_phone_number_column(values)
+    mismatches = int((expected.fillna("<None>") != actual.fillna("<None>")).sum())
+    print(f"Lignes: {rows}, écarts avec format_phone_number: {mismatches}")
+
+    scalar = rows_per_second(rows, lambda: values.apply(format_phone_number))
+    vectorized = rows_per_second(rows, lambda: format_phone_number_column(values))
+    print(f"format_phone_number (.apply)   : {scalar:>12,.0f} lignes/s")
+    print(f"format_phone_number_column     : {vectorized:>12,.0f} lignes/s")
+    print(f"Accélération                   : {vectorized / scalar:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,15 +1,40 @@
 import asyncio
 import subprocess
 import os  # Ajouté pour la création de dossier si besoin
-from datetime import datetime, timezone
-from typing import Union, List, Annotated, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Union,
+    List,
+    Annotated,
+    Optional,
+    Dict,
+    Any,
+    Set,
+    Tuple,
+    Callable,
+    Awaitable,
+    Iterator,
+)
 import io
 import pandas as pd
 import pyarrow  # Juste pour s'assurer qu'il est importable, pandas l'utilisera
+import pyarrow.ipc  # Flux Arrow IPC pour GET /contacts
+import pyarrow.parquet  # Lecture du schéma pour la migration du stockage
+import pyarrow.csv  # Lecture en flux des imports CSV
+import pyarrow.compute  # Normalisation vectorisée des numéros à l'import
 from pathlib import Path  # Pour gérer les chemins de manière robuste
 import uuid  # Importer uuid pour générer des IDs uniques
 import re  # Importer re pour les expressions régulières
 import platform  # Ajouté pour la détection de l'OS
+import json  # Pour le journal des mutations de contacts
+import threading  # Verrou du fichier de stockage pendant la compaction
+import unicodedata  # Normalisation des accents pour la recherche
+import bisect  # Recherche du curseur de pagination
+import shlex  # Échappement des commandes envoyées au shell adb
+import time  # Horloge monotone du moniteur d'état d'appel
+import shutil  # Concaténation des journaux lors de la bascule
+import hashlib  # Empreinte des paramètres de liste dans l'ETag
+from collections import Counter, defaultdict, deque
 
 # import pytz # Commenté car nous allons utiliser zoneinfo
 from zoneinfo import (
@@ -25,6 +50,9 @@ import uvicorn
 from fastapi import (
     FastAPI,
     HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
     UploadFile,
     File,
     Form,
@@ -32,9 +60,10 @@ from fastapi import (
     Response,
     Path as FastAPIPath,
     Body,
+    Query,
 )
 from fastapi.responses import StreamingResponse, FileResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from fastapi.middleware.cors import CORSMiddleware  # Importer CORSMiddleware
 from fastapi import status
 
@@ -43,17 +72,23 @@ from fastapi import status
 class CallRequest(BaseModel):
     phone_number: str
     contact_id: Optional[str] = None  # AJOUTÉ: Pour suivre quel contact est appelé
+    device: Optional[str] = None  # Numéro de série ou alias de l'appareil
+    sim: Optional[str] = None  # Alias de SIM / ligne (voir ADB_DEVICE_ALIASES)
 
 
 # NOUVEAU MODÈLE pour la requête de raccrochage
 class HangUpRequest(BaseModel):
     contact_id: Optional[str] = None
+    device: Optional[str] = None
+    sim: Optional[str] = None
 
 
 class EndCallRequest(BaseModel):
     contact_id: str
     call_start_time: str  # Format ISO, gardé pour info ou fallback si besoin
     measured_duration_seconds: Union[int, None] = None  # AJOUTÉ
+    device: Optional[str] = None
+    sim: Optional[str] = None
 
 
 class ContactBase(BaseModel):
@@ -96,20 +131,81 @@ class ContactUpdate(BaseModel):  # Nouveau modèle pour la mise à jour partiell
 
 class ContactInDB(ContactBase):
     id: str
+    phoneE164: Union[str, None] = None  # Clé canonique E.164 dérivée de phoneNumber
+    # Horodatages (Europe/Paris) dérivés de dateRappel/heureRappel et dateRendezVous/heureRendezVous
+    rappelAt: Union[datetime, None] = None
+    rendezVousAt: Union[datetime, None] = None
 
 
-# --- Cache en mémoire pour les contacts ---
-from functools import lru_cache
+# Sérialiseur JSON des listes de contacts (projection de champs via include)
+CONTACT_LIST_ADAPTER = TypeAdapter(List[ContactInDB])
+
+# --- Formats de réponse en flux pour GET /contacts (négociés via l'en-tête Accept) ---
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+CONTACT_STREAM_CHUNK_SIZE = 1000
+
+
+def contact_arrow_type(name: str) -> pyarrow.DataType:
+    if name == "isCurrentlyInCall":
+        return pyarrow.bool_()
+    if name in CONTACT_SCHEDULE_FIELDS:
+        return pyarrow.timestamp("us", tz="Europe/Paris")
+    return pyarrow.string()
+
+
+def contact_arrow_schema(field_names: List[str]) -> pyarrow.Schema:
+    """Schéma Arrow des contacts : booléen pour isCurrentlyInCall, horodatages, texte sinon."""
+    return pyarrow.schema([(name, contact_arrow_type(name)) for name in field_names])
+
+
+async def stream_contacts_ndjson(
+    contacts: List[ContactInDB], include: Optional[Set[str]]
+):
+    """Une ligne JSON par contact, envoyée par blocs pour borner la mémoire."""
+    for start in range(0, len(contacts), CONTACT_STREAM_CHUNK_SIZE):
+        chunk = contacts[start : start + CONTACT_STREAM_CHUNK_SIZE]
+        yield "".join(
+            contact.model_dump_json(include=include) + "\n" for contact in chunk
+        ).encode("utf-8")
+        await asyncio.sleep(0)  # Laisser la main aux autres requêtes entre deux blocs
+
+
+async def stream_contacts_arrow(
+    contacts: List[ContactInDB], include: Optional[Set[str]]
+):
+    """Flux Arrow IPC : un RecordBatch par bloc de contacts."""
+    field_names = [
+        name
+        for name in ContactInDB.model_fields.keys()
+        if not include or name in include
+    ]
+    schema = contact_arrow_schema(field_names)
+    sink = io.BytesIO()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        yield sink.getvalue()  # En-tête du flux (schéma)
+        sink.seek(0)
+        sink.truncate()
+        for start in range(0, len(contacts), CONTACT_STREAM_CHUNK_SIZE):
+            chunk = contacts[start : start + CONTACT_STREAM_CHUNK_SIZE]
+            columns = [
+                [getattr(contact, name) for contact in chunk] for name in field_names
+            ]
+            writer.write_batch(pyarrow.record_batch(columns, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            await asyncio.sleep(0)
+    yield sink.getvalue()  # Marqueur de fin de flux
 
 
-@lru_cache(maxsize=1)
+# --- Cache en mémoire pour les contacts ---
 def get_cached_contacts() -> List[ContactInDB]:
-    """Retourne et met en cache la liste des contacts pour améliorer les performances des requêtes"""
-    if not CONTACTS_STORAGE_FILE.exists() or CONTACTS_STORAGE_FILE.stat().st_size == 0:
-        return []
-    df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-    df = df.where(pd.notnull(df), None)
-    return [ContactInDB(**row) for row in df.to_dict(orient="records")]
+    """
+    Retourne la liste des contacts depuis le cache write-through du stockage :
+    chaque mutation ne reconstruit que le modèle de la ligne concernée.
+    """
+    return contact_store.models()
 
 
 # --- Configuration de l'application FastAPI ---
@@ -132,6 +228,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Autoriser toutes les méthodes (GET, POST, etc.)
     allow_headers=["*"],  # Autoriser tous les headers
+    # Curseur de pagination et version des lectures de contacts
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # --- Chemins pour les backups et le stockage principal ---
@@ -139,6 +237,21 @@ BASE_DIR = Path(__file__).resolve().parent
 BACKUP_DIR = BASE_DIR / "backups"
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)  # S'assurer que le dossier existe
 CONTACTS_STORAGE_FILE = BASE_DIR / "contacts_storage.parquet"
+# Journal append-only des mutations (write-ahead log), replié périodiquement dans le Parquet
+CONTACTS_JOURNAL_FILE = BASE_DIR / "contacts_journal.jsonl"
+CONTACTS_JOURNAL_COMPACTING_FILE = BASE_DIR / "contacts_journal.compacting.jsonl"
+# Historique des appels, partitionné par jour (voir CallHistoryLog)
+CALL_HISTORY_DIR = BASE_DIR / "call_history"
+# État persistant des campagnes d'appels (file, tentatives, issues)
+CAMPAIGNS_STATE_FILE = BASE_DIR / "campaigns_state.json"
+JOURNAL_COMPACTION_MAX_ENTRIES = int(os.getenv("CONTACTS_JOURNAL_MAX_ENTRIES", "500"))
+JOURNAL_COMPACTION_INTERVAL_SECONDS = int(
+    os.getenv("CONTACTS_JOURNAL_COMPACTION_INTERVAL", "300")
+)
+# Nombre de mutations conservées pour la synchronisation différentielle (GET /contacts/changes)
+CONTACT_CHANGE_LOG_SIZE = int(os.getenv("CONTACT_CHANGE_LOG_SIZE", "10000"))
+# Protège le fichier Parquet de base contre les réécritures concurrentes (compaction / import)
+CONTACTS_STORAGE_LOCK = threading.Lock()
 
 # --- Chemin pour le dossier d'autosauvegarde ---
 PROJECT_ROOT_DIR = (
@@ -150,8 +263,8 @@ AUTOSAVE_DIR.mkdir(parents=True, exist_ok=True)  # Créer le dossier s'il n'exis
 # --- Constante pour le fuseau horaire de Paris ---
 PARIS_TZ = ZoneInfo("Europe/Paris")
 
-# --- Variable globale pour suivre l'appel actif initié par l'application ---
-ACTIVE_CALL_INFO: Dict[str, Any] = {"contact_id": None, "start_time_iso": None}
+# --- Extraction du numéro d'un appel dans la sortie de 'dumpsys telecom' (ex: handle=tel:+33612345678) ---
+TELECOM_HANDLE_PATTERN = re.compile(r"tel:([+\d][\d\s.\-]*\d)")
 
 
 # --- Fonction d'aide pour le formatage des numéros de téléphone ---
@@ -196,403 +309,2473 @@ def format_phone_number(num_str: Union[str, None, float]) -> Union[str, None]:
     return s
 
 
-# --- Fonctions de traitement en arrière-plan ---
-async def process_imported_file(file_contents: bytes, content_type: str):
-    """Traite le fichier importé (CSV ou XLSX) et met à jour le fichier de stockage Parquet."""
-    print(f"[Background Task] Début du traitement du fichier de type: {content_type}")
-    try:
-        new_df: pd.DataFrame
-        if content_type == "text/csv":
-            new_df = pd.read_csv(io.BytesIO(file_contents))
-        elif content_type in [
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            "application/vnd.ms-excel",
-        ]:
-            new_df = pd.read_excel(io.BytesIO(file_contents))
-        else:
-            print(f"[Background Task] Type de fichier non supporté: {content_type}")
-            return
+# Cas 1 à 4 de format_phone_number en une regex RE2 (\p{Nd} : chiffres Unicode,
+# comme \d et isdigit() en Python). Les longueurs diffèrent : un seul cas possible.
+PHONE_FRENCH_PATTERN = r"^(?:\+33|0|33)\p{Nd}{9}$|^[1-7]\p{Nd}{8}$"
 
-        # Normaliser les noms de colonnes: minuscule, sans espaces, sans underscores, sans apostrophes
-        new_df.columns = [
-            str(col).lower().replace(" ", "").replace("_", "").replace("'", "")
-            for col in new_df.columns
-        ]
 
-        rename_map = {
-            "prénom": "firstName",
-            "nom": "lastName",
-            "courriel": "email",
-            "mail": "email",
-            "téléphone": "phoneNumber",
-            "telephone": "phoneNumber",
-            "numero": "phoneNumber",  # Ajout du mappage pour "Numéro"
-            "numéro": "phoneNumber",  # Ajout du mappage pour "Numéro" avec accent
-            "prenom": "firstName",
-            "nomdefamille": "lastName",
-            "statut": "status",
-            "commentaire": "comment",
-            "rappel": "dateRappel",
-            "heurerappel": "heureRappel",
-            "daterendez-vous": "dateRendezVous",
-            "heurerendez-vous": "heureRendezVous",
-            "datedappel": "dateAppel",  # Apostrophe déjà supprimée lors de la normalisation
-            "heureappel": "heureAppel",  # Apostrophe déjà supprimée
-            "dureeappel": "dureeAppel",  # Apostrophe déjà supprimée
-            "source": "source",
-        }
-        new_df.rename(columns=rename_map, inplace=True)
+def format_phone_number_column(values: pd.Series) -> pd.Series:
+    """
+    Version vectorisée de format_phone_number (pyarrow.compute) : mêmes règles,
+    même résultat valeur par valeur, sans appel Python par ligne.
+    """
+    numbers = pyarrow.array(values.astype("string"), type=pyarrow.string(), from_pandas=True)
+    # Ne garder que les chiffres et "+", puis les "+" seulement en tête de numéro
+    numbers = pyarrow.compute.replace_substring_regex(numbers, r"[^\p{Nd}+]", "")
+    numbers = pyarrow.compute.if_else(
+        pyarrow.compute.starts_with(numbers, "+"),
+        numbers,
+        pyarrow.compute.replace_substring(numbers, "+", ""),
+    )
+    # Numéros français : "+33 X XX XX XX XX" construit à partir des 9 derniers chiffres
+    national = pyarrow.compute.utf8_slice_codeunits(numbers, -9)
+    groups = [
+        pyarrow.compute.utf8_slice_codeunits(national, start, stop)
+        for start, stop in ((0, 1), (1, 3), (3, 5), (5, 7), (7, 9))
+    ]
+    numbers = pyarrow.compute.if_else(
+        pyarrow.compute.match_substring_regex(numbers, PHONE_FRENCH_PATTERN),
+        pyarrow.compute.binary_join_element_wise("+33", *groups, " "),
+        numbers,
+    )
+    numbers = pyarrow.compute.if_else(
+        pyarrow.compute.equal(pyarrow.compute.utf8_length(numbers), 0),
+        pyarrow.scalar(None, type=pyarrow.string()),
+        numbers,
+    )
+    return pd.Series(numbers.to_pandas(), index=values.index, dtype=object)
 
-        contact_model_fields_with_id = list(ContactInDB.model_fields.keys())
-        fields_from_file = [
-            field for field in contact_model_fields_with_id if field != "id"
-        ]
 
-        for col in fields_from_file:
-            if col not in new_df.columns:
-                new_df[col] = pd.NA
+def phone_number_to_e164(num_str: Union[str, None, float]) -> Union[str, None]:
+    """
+    Clé canonique E.164 (ex: "+33612345678") pour l'indexation des numéros.
+    Retourne None si le numéro ne peut pas être rattaché à un indicatif pays.
+    """
+    if num_str is None or (isinstance(num_str, float) and pd.isna(num_str)):
+        return None
+    s = str(num_str).strip()
+    if s.startswith("00"):  # Préfixe international "00" équivalent à "+"
+        s = "+" + s[2:]
+    formatted = format_phone_number(s)
+    if not formatted:
+        return None
+    compact = formatted.replace(" ", "")
+    if compact.startswith("+") and compact[1:].isdigit() and 8 <= len(compact) <= 16:
+        return compact
+    return None
+
+
+# --- Horodatages des rappels et rendez-vous ---
+# Champ horodaté -> (champ date "JJ/MM/AAAA", champ heure "HH:MM")
+CONTACT_SCHEDULE_FIELDS = {
+    "rappelAt": ("dateRappel", "heureRappel"),
+    "rendezVousAt": ("dateRendezVous", "heureRendezVous"),
+}
+CONTACT_SCHEDULE_SOURCE_FIELDS = {
+    name for pair in CONTACT_SCHEDULE_FIELDS.values() for name in pair
+}
+SCHEDULE_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d")
+SCHEDULE_TIME_PATTERN = r"^\s*(\d{1,2})[:hH](\d{2})"
+
+
+def parse_schedule_datetime(date_str: Any, time_str: Any) -> Optional[datetime]:
+    """
+    Combine une date (JJ/MM/AAAA ou AAAA-MM-JJ) et une heure (HH:MM, optionnelle :
+    minuit par défaut) en horodatage Europe/Paris. None si la date est invalide.
+    """
+    if not isinstance(date_str, str) or not date_str.strip():
+        return None
+    for date_format in SCHEDULE_DATE_FORMATS:
+        try:
+            day = datetime.strptime(date_str.strip(), date_format)
+            break
+        except ValueError:
+            continue
+    else:
+        return None
+    match = re.match(SCHEDULE_TIME_PATTERN, time_str) if isinstance(time_str, str) else None
+    if match and int(match.group(1)) < 24 and int(match.group(2)) < 60:
+        day = day.replace(hour=int(match.group(1)), minute=int(match.group(2)))
+    return day.replace(tzinfo=PARIS_TZ)
+
+
+def contact_schedule_fields(record: Dict[str, Any]) -> Dict[str, Optional[datetime]]:
+    """Horodatages rappelAt / rendezVousAt dérivés des champs texte d'un contact."""
+    return {
+        field: parse_schedule_datetime(record.get(date_field), record.get(time_field))
+        for field, (date_field, time_field) in CONTACT_SCHEDULE_FIELDS.items()
+    }
+
+
+def schedule_datetime_column(dates: pd.Series, times: pd.Series) -> pd.Series:
+    """Version vectorisée de parse_schedule_datetime (colonne datetime64[ns, Europe/Paris])."""
+    dates = dates.astype("string").str.strip()
+    day = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    for date_format in SCHEDULE_DATE_FORMATS:
+        day = day.fillna(pd.to_datetime(dates, format=date_format, errors="coerce"))
+    clock = times.astype("string").str.extract(SCHEDULE_TIME_PATTERN).astype(float)
+    valid_clock = (clock[0] < 24) & (clock[1] < 60)
+    local = (
+        day
+        + pd.to_timedelta(clock[0].where(valid_clock, 0), unit="h")
+        + pd.to_timedelta(clock[1].where(valid_clock, 0), unit="m")
+    )
+    # Heure d'été ambiguë : première occurrence ; heure inexistante : décalée d'une heure,
+    # comme zoneinfo pour parse_schedule_datetime
+    return local.dt.tz_localize(
+        PARIS_TZ,
+        ambiguous=pd.Series(True, index=local.index).to_numpy(),
+        nonexistent=pd.Timedelta(hours=1),
+    )
+
 
-        if "firstName" in new_df.columns and "lastName" in new_df.columns:
-            new_df.dropna(subset=["firstName", "lastName"], inplace=True)
-        elif "firstName" in new_df.columns:
-            new_df.dropna(subset=["firstName"], inplace=True)
-        elif "lastName" in new_df.columns:
-            new_df.dropna(subset=["lastName"], inplace=True)
+def add_contact_schedule_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """(Re)calcule les colonnes horodatées à partir des colonnes date/heure texte."""
+    df = df.copy()
+    for field, (date_field, time_field) in CONTACT_SCHEDULE_FIELDS.items():
+        if date_field in df.columns:
+            times = df.get(time_field, pd.Series(pd.NA, index=df.index))
+            df[field] = schedule_datetime_column(df[date_field], times)
         else:
-            print(
-                "[Background Task] firstName ou lastName manquant pour toutes les lignes, aucun contact à importer."
+            df[field] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, Europe/Paris]")
+    return df
+
+
+# --- Fonctions de traitement en arrière-plan ---
+# Import en flux : fichier copié sur disque puis lu par blocs (mémoire bornée)
+IMPORT_SPOOL_DIR = BASE_DIR / "imports"
+IMPORT_UPLOAD_CHUNK_SIZE = 1024 * 1024
+IMPORT_CSV_BLOCK_SIZE = int(os.getenv("IMPORT_CSV_BLOCK_SIZE_BYTES", str(1024 * 1024)))
+IMPORT_EXCEL_CONTENT_TYPES = [
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.ms-excel",
+]
+
+IMPORT_COLUMN_RENAME_MAP = {
+    "prénom": "firstName",
+    "nom": "lastName",
+    "courriel": "email",
+    "mail": "email",
+    "téléphone": "phoneNumber",
+    "telephone": "phoneNumber",
+    "numero": "phoneNumber",  # Ajout du mappage pour "Numéro"
+    "numéro": "phoneNumber",  # Ajout du mappage pour "Numéro" avec accent
+    "prenom": "firstName",
+    "nomdefamille": "lastName",
+    "statut": "status",
+    "commentaire": "comment",
+    "rappel": "dateRappel",
+    "heurerappel": "heureRappel",
+    "daterendez-vous": "dateRendezVous",
+    "heurerendez-vous": "heureRendezVous",
+    "datedappel": "dateAppel",  # Apostrophe déjà supprimée lors de la normalisation
+    "heureappel": "heureAppel",  # Apostrophe déjà supprimée
+    "dureeappel": "dureeAppel",  # Apostrophe déjà supprimée
+    "source": "source",
+}
+
+
+def normalize_import_frame(new_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Normalise un lot de lignes importées (colonnes, filtrage, types, ids).
+    Retourne None si le fichier n'a ni colonne prénom ni colonne nom.
+    """
+    # Normaliser les noms de colonnes: minuscule, sans espaces, sans underscores, sans apostrophes
+    new_df.columns = [
+        str(col).lower().replace(" ", "").replace("_", "").replace("'", "")
+        for col in new_df.columns
+    ]
+    new_df.rename(columns=IMPORT_COLUMN_RENAME_MAP, inplace=True)
+
+    contact_model_fields_with_id = list(ContactInDB.model_fields.keys())
+    fields_from_file = [
+        field for field in contact_model_fields_with_id if field != "id"
+    ]
+
+    for col in fields_from_file:
+        if col not in new_df.columns:
+            new_df[col] = pd.NA
+
+    if "firstName" in new_df.columns and "lastName" in new_df.columns:
+        new_df.dropna(subset=["firstName", "lastName"], inplace=True)
+    elif "firstName" in new_df.columns:
+        new_df.dropna(subset=["firstName"], inplace=True)
+    elif "lastName" in new_df.columns:
+        new_df.dropna(subset=["lastName"], inplace=True)
+    else:
+        return None
+
+    if new_df.empty:
+        return new_df
+
+    new_df["id"] = [str(uuid.uuid4()) for _ in range(len(new_df))]
+
+    # Process each field according to its type
+    for field in contact_model_fields_with_id:
+        if field == "id":  # id is already generated
+            continue
+        if field not in new_df.columns:
+            new_df[field] = (
+                None  # Default to None if column is missing after initial pd.NA setup
             )
-            return
+            continue
+
+        if field == "phoneNumber":
+            new_df[field] = format_phone_number_column(new_df[field])
+        elif field == "isCurrentlyInCall":
+            # Convert various string/boolean inputs to True, False, or None
+            def to_bool_or_none(val):
+                if pd.isna(val) or str(val).strip() == "":
+                    return (
+                        None  # Interprets missing values or empty strings as None
+                    )
+                if isinstance(val, bool):
+                    return val
+                s_val = str(val).lower().strip()
+                if s_val in ("true", "1", "yes", "oui", "vrai"):
+                    return True
+                if s_val in ("false", "0", "no", "non", "faux"):
+                    return False
+                return None  # Default to None if not clearly boolean, Pydantic will use default=False
+
+            new_df[field] = new_df[field].apply(to_bool_or_none)
+        else:  # For other fields (mostly Optional[str])
+            # Convert to string, then replace specific pandas NA representation with None.
+            # Empty strings from CSV/Excel will remain as empty strings.
+            new_df[field] = new_df[field].astype(str).replace("<NA>", None)
+            # If a field is truly meant to be None (not an empty string), this allows it.
+            # Pydantic models define fields as Union[str, None], so empty string is a valid string.
+            # Let an empty string be an empty string, and NA/null be None.
+            # If an empty string should be None for a specific Optional[str] field,
+            # that needs more specific handling or a convention.
+            # For now, this replaces only pandas' <NA> string for object columns.
+            # Consider new_df[field] = new_df[field].apply(lambda x: None if pd.isna(x) or x == '' else str(x)) for stricter None on empty strings
+
+    # Utiliser directement contact_model_fields_with_id pour garantir toutes les colonnes et leur ordre
+    return new_df[contact_model_fields_with_id].copy()
+
+
+def iter_import_batches(path: Path, content_type: str) -> Iterator[pd.DataFrame]:
+    """
+    Lots de lignes brutes du fichier importé. Les CSV sont lus en flux par blocs
+    de IMPORT_CSV_BLOCK_SIZE octets ; les fichiers Excel sont lus d'un seul tenant.
+    """
+    if content_type in IMPORT_EXCEL_CONTENT_TYPES:
+        yield pd.read_excel(path)
+        return
+    read_options = pyarrow.csv.ReadOptions(block_size=IMPORT_CSV_BLOCK_SIZE)
+    # Noms de colonnes lus sur le premier bloc, puis toutes les colonnes en texte :
+    # pas d'inférence par bloc (types incohérents, zéro initial des numéros perdu)
+    reader = pyarrow.csv.open_csv(path, read_options=read_options)
+    column_names = reader.schema.names
+    reader.close()
+    convert_options = pyarrow.csv.ConvertOptions(
+        column_types={name: pyarrow.string() for name in column_names},
+        strings_can_be_null=True,
+    )
+    reader = pyarrow.csv.open_csv(
+        path, read_options=read_options, convert_options=convert_options
+    )
+    try:
+        for batch in reader:
+            # Valeurs manquantes en pd.NA, comme attendu par normalize_import_frame
+            yield batch.to_pandas(types_mapper={pyarrow.string(): pd.StringDtype()}.get)
+    finally:
+        reader.close()
+
+
+def prepare_import_rows(
+    import_df: pd.DataFrame,
+) -> List[Tuple[Dict[str, Any], ContactInDB]]:
+    """Lignes nettoyées et modèles Pydantic d'un lot importé, prêts à insérer."""
+    rows = [
+        ContactStore._clean_record(record)
+        for record in import_df.to_dict(orient="records")
+    ]
+    return [(row, ContactInDB(**row)) for row in rows]
 
-        if new_df.empty:
-            print("[Background Task] Aucun contact valide à ajouter après filtrage.")
-            return
 
-        new_df["id"] = [str(uuid.uuid4()) for _ in range(len(new_df))]
+def read_next_import_batch(
+    batches: Iterator[pd.DataFrame],
+) -> Tuple[bool, Optional[List[Tuple[Dict[str, Any], ContactInDB]]]]:
+    """Lit, normalise et prépare le lot suivant (exécuté hors de la boucle asyncio)."""
+    raw_df = next(batches, None)
+    if raw_df is None:
+        return False, None
+    import_df = normalize_import_frame(raw_df)
+    if import_df is None:
+        return True, None
+    return True, prepare_import_rows(import_df)
 
-        # Process each field according to its type
-        for field in contact_model_fields_with_id:
-            if field == "id":  # id is already generated
-                continue
-            if field not in new_df.columns:
-                new_df[field] = (
-                    None  # Default to None if column is missing after initial pd.NA setup
-                )
-                continue
 
-                if field == "phoneNumber":
-                    new_df[field] = new_df[field].apply(format_phone_number)
-            elif field == "isCurrentlyInCall":
-                # Convert various string/boolean inputs to True, False, or None
-                def to_bool_or_none(val):
-                    if pd.isna(val) or str(val).strip() == "":
-                        return (
-                            None  # Interprets missing values or empty strings as None
-                        )
-                    if isinstance(val, bool):
-                        return val
-                    s_val = str(val).lower().strip()
-                    if s_val in ("true", "1", "yes", "oui", "vrai"):
-                        return True
-                    if s_val in ("false", "0", "no", "non", "faux"):
-                        return False
-                    return None  # Default to None if not clearly boolean, Pydantic will use default=False
-
-                new_df[field] = new_df[field].apply(to_bool_or_none)
-            else:  # For other fields (mostly Optional[str])
-                # Convert to string, then replace specific pandas NA representation with None.
-                # Empty strings from CSV/Excel will remain as empty strings.
-                new_df[field] = new_df[field].astype(str).replace("<NA>", None)
-                # If a field is truly meant to be None (not an empty string), this allows it.
-                # Pydantic models define fields as Union[str, None], so empty string is a valid string.
-                # Let an empty string be an empty string, and NA/null be None.
-                # If an empty string should be None for a specific Optional[str] field,
-                # that needs more specific handling or a convention.
-                # For now, this replaces only pandas' <NA> string for object columns.
-                # Consider new_df[field] = new_df[field].apply(lambda x: None if pd.isna(x) or x == '' else str(x)) for stricter None on empty strings
-
-        # S'assurer que toutes les colonnes du modèle ContactInDB sont présentes pour la sélection finale
-        # final_df_columns = [col for col in contact_model_fields_with_id if col in new_df.columns]
-        # Utiliser directement contact_model_fields_with_id pour garantir toutes les colonnes et leur ordre
-        final_df = new_df[contact_model_fields_with_id].copy()
-
-        # Charger les contacts existants s'il y en a
-        if CONTACTS_STORAGE_FILE.exists():
-            try:
-                existing_df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-                # Concaténer, en ignorant les index pour éviter les conflits et réinitialiser
-                # On pourrait ajouter une logique de déduplication ici basée sur email ou nom/prénom
-                combined_df = pd.concat([existing_df, final_df], ignore_index=True)
-                # Déduplication simple basée sur un sous-ensemble de colonnes, gardant la dernière occurrence
-                combined_df.drop_duplicates(
-                    subset=["firstName", "lastName", "email"], keep="last", inplace=True
-                )
-            except Exception as e_read_parquet:
-                print(
-                    f"[Background Task] Erreur lors de la lecture du fichier Parquet existant {CONTACTS_STORAGE_FILE}: {e_read_parquet}. Le fichier sera écrasé."
+async def persist_contacts_snapshot() -> None:
+    """
+    Réécrit le fichier de base à partir du stockage en mémoire (fin d'import),
+    hors de la boucle asyncio. L'instantané et la bascule du journal ont lieu
+    dans le même tour de boucle : les mutations suivantes vont dans un nouveau
+    journal, rejoué au chargement sur la nouvelle base.
+    """
+    global _journal_compaction_running
+    while _journal_compaction_running:
+        await asyncio.sleep(0.1)
+    _journal_compaction_running = True
+    try:
+        snapshot = contact_store.records()
+        contacts_journal.rotate()
+
+        def write_snapshot() -> None:
+            with CONTACTS_STORAGE_LOCK:
+                write_contacts_base_records(snapshot)
+                contacts_journal.compacting_path.unlink(missing_ok=True)
+
+        await asyncio.to_thread(write_snapshot)
+        contacts_journal.last_compaction = datetime.now(timezone.utc)
+    finally:
+        _journal_compaction_running = False
+
+
+async def process_imported_file(path: Path, content_type: str):
+    """
+    Importe un fichier (CSV ou XLSX) copié sur disque : chaque lot est lu et
+    préparé hors de la boucle asyncio puis fusionné et journalisé aussitôt dans
+    le stockage (un arrêt en cours d'import conserve les lots déjà vus) ; le
+    fichier de base est réécrit en fin d'import.
+    """
+    print(f"[Background Task] Début du traitement du fichier de type: {content_type}")
+    try:
+        if content_type != "text/csv" and content_type not in IMPORT_EXCEL_CONTENT_TYPES:
+            print(f"[Background Task] Type de fichier non supporté: {content_type}")
+            return
+
+        batches = iter_import_batches(path, content_type)
+        imported_count = 0
+        replaced_count = 0
+        try:
+            while True:
+                has_batch, import_rows = await asyncio.to_thread(
+                    read_next_import_batch, batches
                 )
-                combined_df = final_df
-        else:
-            combined_df = final_df
+                if not has_batch:
+                    break
+                if import_rows is None:
+                    print(
+                        "[Background Task] firstName ou lastName manquant pour toutes les lignes, aucun contact à importer."
+                    )
+                    break
+                if import_rows:
+                    replaced_count += contact_store.import_rows(import_rows)
+                    imported_count += len(import_rows)
+        finally:
+            if imported_count:
+                contact_store.finish_import()
+
+        if imported_count == 0:
+            print("[Background Task] Aucun contact valide à ajouter après filtrage.")
+            return
 
-        combined_df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
+        await persist_contacts_snapshot()
         print(
-            f"[Background Task] {len(final_df)} nouveaux contacts traités. Total de {len(combined_df)} contacts dans {CONTACTS_STORAGE_FILE}."
+            f"[Background Task] {imported_count} nouveaux contacts traités ({replaced_count} doublons remplacés). Total de {len(contact_store)} contacts dans {CONTACTS_STORAGE_FILE}."
         )
-        # Invalidation du cache après import de contacts
-        get_cached_contacts.cache_clear()
 
     except Exception as e:
         print(
             f"[Background Task] Erreur majeure lors du traitement du fichier importé: {e}"
         )
+    finally:
+        path.unlink(missing_ok=True)
 
 
-# --- Fonctions de gestion des données (chargement, sauvegarde, recherche) ---
+# --- Journal des mutations de contacts (write-ahead log) ---
 
 
-def load_contacts_from_storage() -> List[Dict]:
-    """Charge les contacts depuis le fichier Parquet."""
+def read_journal_file(path: Path) -> List[Dict[str, Any]]:
+    """Lit un fichier journal JSONL. Les lignes illisibles (écriture interrompue) sont ignorées."""
+    entries: List[Dict[str, Any]] = []
+    if not path.exists():
+        return entries
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"[Journal] Ligne de journal illisible ignorée dans {path}")
+    return entries
+
+
+def apply_journal_entries(
+    records: List[Dict[str, Any]], entries: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Rejoue des entrées de journal sur une liste d'enregistrements de contacts.
+
+    Les opérations sont idempotentes (upsert, patch et delete adressés par id),
+    rejouer deux fois la même entrée donne donc le même résultat.
+    """
+    position_by_id = {record.get("id"): pos for pos, record in enumerate(records)}
+    for entry in entries:
+        op = entry.get("op")
+        contact_id = entry.get("id")
+        fields = entry.get("fields") or {}
+        pos = position_by_id.get(contact_id)
+        if op == "upsert":
+            record = {**fields, "id": contact_id}
+            if pos is None:
+                position_by_id[contact_id] = len(records)
+                records.append(record)
+            else:
+                records[pos] = record
+        elif op == "patch":
+            if pos is not None:
+                records[pos].update(fields)
+        elif op == "delete":
+            if pos is not None:
+                records[pos] = None
+                del position_by_id[contact_id]
+    return [record for record in records if record is not None]
+
+
+class ContactJournal:
+    """
+    Journal append-only des mutations de contacts.
+
+    Chaque modification n'écrit qu'une ligne JSON avec les champs modifiés,
+    quel que soit le nombre de contacts. Le journal actif est renommé en
+    fichier "compacting" puis replié dans le Parquet de base en arrière-plan.
+    """
+
+    def __init__(self, path: Path, compacting_path: Path):
+        self.path = path
+        self.compacting_path = compacting_path
+        self._lock = threading.Lock()
+        self.entry_count = len(read_journal_file(path))
+        self.last_compaction = datetime.now(timezone.utc)
+
+    def append(
+        self, op: str, contact_id: str, fields: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Ajoute une mutation ("upsert", "patch" ou "delete") au journal et la force sur disque."""
+        self.append_many([(op, contact_id, fields)])
+
+    def append_many(
+        self, mutations: List[Tuple[str, str, Optional[Dict[str, Any]]]]
+    ) -> None:
+        """Ajoute un lot de mutations (op, id, champs) en une seule écriture synchronisée."""
+        ts = datetime.now(timezone.utc).isoformat()
+        lines = "".join(
+            json.dumps(
+                {"op": op, "id": contact_id, "fields": fields or {}, "ts": ts},
+                ensure_ascii=False,
+                default=str,
+            )
+            + "\n"
+            for op, contact_id, fields in mutations
+        )
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self.entry_count += len(mutations)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Retourne les entrées en attente de compaction puis celles du journal actif."""
+        return read_journal_file(self.compacting_path) + read_journal_file(self.path)
+
+    def should_compact(self) -> bool:
+        if self.compacting_path.exists():
+            return True  # Compaction précédente interrompue
+        if self.entry_count >= JOURNAL_COMPACTION_MAX_ENTRIES:
+            return True
+        elapsed = (datetime.now(timezone.utc) - self.last_compaction).total_seconds()
+        return self.entry_count > 0 and elapsed >= JOURNAL_COMPACTION_INTERVAL_SECONDS
+
+    def rotate(self) -> bool:
+        """
+        Bascule le journal actif vers le fichier de compaction.
+        Retourne True s'il y a des entrées à replier dans le fichier de base.
+        """
+        with self._lock:
+            if not self.path.exists() or self.entry_count == 0:
+                return self.compacting_path.exists()
+            if self.compacting_path.exists():
+                # Compaction précédente inachevée : y ajouter le journal actif
+                with open(self.path, "rb") as src, open(self.compacting_path, "ab") as dst:
+                    shutil.copyfileobj(src, dst)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                self.path.unlink()
+            else:
+                os.replace(self.path, self.compacting_path)
+            self.entry_count = 0
+            return True
+
+    def reset(self) -> None:
+        """Vide le journal (après une réécriture complète du fichier de base)."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.compacting_path.unlink(missing_ok=True)
+            self.entry_count = 0
+            self.last_compaction = datetime.now(timezone.utc)
+
+
+contacts_journal = ContactJournal(CONTACTS_JOURNAL_FILE, CONTACTS_JOURNAL_COMPACTING_FILE)
+_journal_compaction_running = False
+
+
+def read_base_contact_records() -> List[Dict[str, Any]]:
+    """Lit le fichier Parquet de base (sans le journal)."""
     if not CONTACTS_STORAGE_FILE.exists() or CONTACTS_STORAGE_FILE.stat().st_size == 0:
         return []
-    try:
-        df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-        return df.to_dict(orient="records")
-    except Exception as e:
-        print(f"[API ERREUR] Impossible de charger {CONTACTS_STORAGE_FILE}: {e}")
-        return []
+    return pd.read_parquet(CONTACTS_STORAGE_FILE).to_dict(orient="records")
 
 
-def save_contacts_to_storage(contacts_list: List[Dict]):
-    """Sauvegarde la liste complète des contacts dans le fichier Parquet."""
-    try:
-        df = pd.DataFrame(contacts_list)
-        # S'assurer que toutes les colonnes attendues par ContactInDB sont présentes, même si vides
-        for col in ContactInDB.model_fields.keys():
-            if col not in df.columns:
-                df[col] = pd.NA  # Ou None, ou une valeur par défaut appropriée
-        df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
-        print(f"[API INFO] Contacts sauvegardés dans {CONTACTS_STORAGE_FILE}")
-    except Exception as e:
-        print(
-            f"[API ERREUR] Impossible de sauvegarder dans {CONTACTS_STORAGE_FILE}: {e}"
-        )
+def contact_records_to_dataframe(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Construit un DataFrame avec toutes les colonnes attendues par ContactInDB."""
+    df = pd.DataFrame(records)
+    for col in ContactInDB.model_fields.keys():
+        if col not in df.columns:
+            df[col] = pd.NA
+    return add_contact_schedule_columns(df)
 
 
-# NOUVELLE FONCTION D'AIDE (ou à adapter si elle existe déjà sous un autre nom)
-def find_contact_by_id(contact_id: str) -> Optional[Dict]:
-    """Trouve un contact par son ID en utilisant le cache pour améliorer les performances."""
-    contacts = get_cached_contacts()
-    for contact in contacts:
-        if contact.id == contact_id:
-            # Retourner un dict pour compatibilité avec le reste du code
-            return contact.model_dump()
-    return None
+# Schéma unique du fichier de base, quel que soit le chemin d'écriture (import, compaction, migration)
+CONTACT_STORAGE_SCHEMA = contact_arrow_schema(list(ContactInDB.model_fields.keys()))
 
 
-# --- Logique de Backup (Scheduler) ---
-def perform_backup_contacts():
-    """Sauvegarde les contacts en format Parquet."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = BACKUP_DIR / f"contacts_backup_{timestamp}.parquet"
-    print(f"[Scheduler] Exécution du backup des contacts vers {filename}...")
+def contacts_dataframe_to_table(df: pd.DataFrame) -> pyarrow.Table:
+    """Table Arrow au schéma CONTACT_STORAGE_SCHEMA (horodatages en microsecondes)."""
+    return pyarrow.Table.from_pandas(
+        df[CONTACT_STORAGE_SCHEMA.names], schema=CONTACT_STORAGE_SCHEMA, preserve_index=False
+    )
 
-    if not CONTACTS_STORAGE_FILE.exists():
-        print("[Scheduler] Aucun contact à sauvegarder.")
-        return
 
-    try:
-        # Convertir le fichier Parquet en DataFrame
-        df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-        df.to_parquet(filename, index=False)
-        print(f"[Scheduler] Backup {filename} terminé avec succès.")
-    except Exception as e:
-        print(f"[Scheduler] Erreur lors de la création du backup Parquet: {e}")
+def write_contacts_base(df: pd.DataFrame) -> None:
+    """Réécrit atomiquement le fichier Parquet de base (fichier temporaire + os.replace)."""
+    tmp_file = CONTACTS_STORAGE_FILE.with_suffix(".parquet.tmp")
+    pyarrow.parquet.write_table(
+        contacts_dataframe_to_table(add_contact_schedule_columns(df)), tmp_file
+    )
+    os.replace(tmp_file, CONTACTS_STORAGE_FILE)
 
 
-schedule.every(30).minutes.do(perform_backup_contacts)
-# schedule.every(10).seconds.do(perform_backup_contacts) # Pour test
+CONTACTS_BASE_WRITE_CHUNK_SIZE = 50000
 
 
-async def run_scheduler():
-    """Exécute les tâches planifiées en continu."""
-    while True:
-        schedule.run_pending()
-        await asyncio.sleep(1)
+def write_contacts_base_records(records: List[Dict[str, Any]]) -> None:
+    """Variante de write_contacts_base écrivant les enregistrements par blocs (mémoire bornée)."""
+    tmp_file = CONTACTS_STORAGE_FILE.with_suffix(".parquet.tmp")
+    with pyarrow.parquet.ParquetWriter(tmp_file, CONTACT_STORAGE_SCHEMA) as writer:
+        for start in range(0, len(records), CONTACTS_BASE_WRITE_CHUNK_SIZE):
+            df = contact_records_to_dataframe(
+                records[start : start + CONTACTS_BASE_WRITE_CHUNK_SIZE]
+            )
+            writer.write_table(contacts_dataframe_to_table(df))
+    os.replace(tmp_file, CONTACTS_STORAGE_FILE)
 
 
-@app.on_event("startup")
-async def startup_event():
-    print("Application FastAPI démarrée...")
-    # Précharger et mettre en cache les contacts pour réduire la latence initiale
+def migrate_contacts_storage_schema() -> None:
+    """
+    Migration des fichiers écrits avec un autre schéma (antérieurs aux colonnes
+    horodatées rappelAt / rendezVousAt, horodatages en nanosecondes...) :
+    réécrit le Parquet de base au schéma CONTACT_STORAGE_SCHEMA (le journal reste valide).
+    """
+    with CONTACTS_STORAGE_LOCK:
+        if not CONTACTS_STORAGE_FILE.exists() or CONTACTS_STORAGE_FILE.stat().st_size == 0:
+            return
+        schema = pyarrow.parquet.read_schema(CONTACTS_STORAGE_FILE)
+        if schema.remove_metadata().equals(CONTACT_STORAGE_SCHEMA):
+            return
+        write_contacts_base(contact_records_to_dataframe(read_base_contact_records()))
+    print("[Storage] Fichier de contacts migré vers le schéma courant.")
+
+
+def load_contacts_dataframe() -> pd.DataFrame:
+    """Charge l'état courant des contacts : fichier de base + rejeu du journal."""
+    # Lire le journal avant la base : si une compaction se termine entre les deux,
+    # la base lue contient déjà les entrées repliées (le rejeu est idempotent).
+    entries = contacts_journal.entries()
+    records = read_base_contact_records()
+    if entries:
+        records = apply_journal_entries(records, entries)
+    return contact_records_to_dataframe(records)
+
+
+def fold_compacting_journal() -> None:
+    """Replie le fichier journal en cours de compaction dans le Parquet de base."""
+    with CONTACTS_STORAGE_LOCK:
+        entries = read_journal_file(contacts_journal.compacting_path)
+        if entries:
+            records = apply_journal_entries(read_base_contact_records(), entries)
+            write_contacts_base(contact_records_to_dataframe(records))
+        contacts_journal.compacting_path.unlink(missing_ok=True)
+    print(f"[Journal] Compaction terminée: {len(entries)} mutations repliées.")
+
+
+async def compact_contacts_journal():
+    """Compaction en arrière-plan : la réécriture du Parquet se fait hors de la boucle asyncio."""
+    global _journal_compaction_running
+    if _journal_compaction_running:
+        return
+    _journal_compaction_running = True
     try:
-        _ = get_cached_contacts()
-        print(f"[Startup] Chargement initial de {len(_)} contacts en cache.")
+        # La rotation reste dans la boucle pour ne pas croiser une lecture du journal actif
+        if contacts_journal.rotate():
+            await asyncio.to_thread(fold_compacting_journal)
+        contacts_journal.last_compaction = datetime.now(timezone.utc)
     except Exception as e:
-        print(f"[Startup] Erreur lors du préchargement du cache des contacts: {e}")
-    asyncio.create_task(run_scheduler())
-    print("Scheduler démarré.")
-    # Lancer un premier backup au démarrage si souhaité
-    # perform_backup_contacts()
+        print(f"[Journal] Erreur lors de la compaction du journal: {e}")
+    finally:
+        _journal_compaction_running = False
 
 
-# --- Fonctions ADB ---
+def replace_all_contacts(df: pd.DataFrame) -> None:
+    """Remplace tout le stockage (import, sauvegarde complète) et vide le journal."""
+    with CONTACTS_STORAGE_LOCK:
+        write_contacts_base(df)
+        contacts_journal.reset()
 
 
-def run_adb_command(command_parts: list[str], timeout_seconds: int = 10) -> str:
-    try:
-        adb_executable = "adb"
-        # Si vous avez adb dans un emplacement spécifique et non dans le PATH :
-        # adb_path_env = os.getenv("ADB_PATH")
-        # if adb_path_env:
-        # adb_executable = adb_path_env
-
-        command = [adb_executable] + command_parts
-        print(f"[API] Exécution de la commande ADB : {' '.join(command)}")
-
-        # Utilisation de subprocess.run avec timeout
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            check=False,  # On vérifiera le returncode manuellement
-            shell=False,  # Important pour la sécurité
-            timeout=timeout_seconds,
-        )
-
-        if result.returncode != 0:
-            # Essayons de décoder stderr avec des encodages courants si ce n'est pas de l'UTF-8 valide
-            decoded_stderr = result.stderr.strip()
-            try:
-                # Tenter UTF-8 d'abord, puis des encodages courants pour Windows
-                decoded_stderr.encode("utf-8")  # Teste si c'est déjà de l'UTF-8 valide
-            except (
-                UnicodeEncodeError
-            ):  # Signifie que ce n'est pas de l'UTF-8 valide si ça vient de text=True et capture_output=True
-                try:
-                    decoded_stderr = (
-                        result.stderr.strip()
-                        .encode("latin-1")
-                        .decode("cp1252", errors="replace")
-                    )
-                except Exception:  # Fallback si tout échoue
-                    decoded_stderr = (
-                        result.stderr.strip()
-                        .encode("utf-8", errors="replace")
-                        .decode("utf-8", errors="replace")
-                    )
+# --- Diffusion des événements en temps réel (SSE / WebSocket) ---
+EVENT_SUBSCRIBER_QUEUE_SIZE = 1000
+EVENT_KEEPALIVE_SECONDS = 15
 
-            error_message = f"Erreur lors de l'exécution de la commande ADB. Code: {result.returncode}, Stderr: {decoded_stderr}"
-            print(f"[API ERREUR] {error_message}")
-            raise subprocess.CalledProcessError(
-                result.returncode, command, output=result.stdout, stderr=result.stderr
-            )
 
-        print(
-            f"[API] Commande ADB exécutée avec succès. Output: {result.stdout.strip()}"
-        )
-        return result.stdout.strip()
+class EventBroadcaster:
+    """
+    Diffuse les mutations de contacts et les transitions d'appel aux clients abonnés.
 
-    except FileNotFoundError:
-        print(
-            "[API ERREUR] Commande ADB non trouvée. Assurez-vous qu'ADB est installé et dans le PATH (ou variable ADB_PATH configurée)."
-        )
-        raise HTTPException(status_code=500, detail="ADB non trouvé sur le serveur.")
-    except subprocess.TimeoutExpired:
-        error_message = f"Timeout lors de l'exécution de la commande ADB : {' '.join(command_parts)}"
-        print(f"[API ERREUR] {error_message}")
-        raise HTTPException(status_code=500, detail=error_message)
-    except subprocess.CalledProcessError as e:
-        # stderr devrait déjà être une string ici si text=True était utilisé dans subprocess.run
-        # Si e.stderr est bytes, il faudrait le décoder.
-        stderr_str = e.stderr
-        if isinstance(stderr_str, bytes):
+    Chaque abonné a sa propre file bornée : un client trop lent reçoit un
+    événement "resync_required" au lieu de faire grossir la mémoire.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """
+        Diffuse un événement. Les modèles Pydantic qu'il contient (contact muté)
+        ne sont sérialisés qu'ici, une fois pour tous les abonnés, et seulement
+        s'il y a des abonnés.
+        """
+        if not self._subscribers:
+            return
+        event = {
+            key: value.model_dump() if isinstance(value, BaseModel) else value
+            for key, value in event.items()
+        }
+        event["ts"] = datetime.now(timezone.utc).isoformat()
+        for queue in list(self._subscribers):
             try:
-                stderr_str = stderr_str.decode("utf-8", errors="replace")
-            except:  # Fallback si le décodage utf-8 échoue
-                stderr_str = str(stderr_str)  # Représentation brute des bytes
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync_required", "ts": event["ts"]})
 
-        error_message = f"Erreur lors de l'exécution de la commande ADB ({' '.join(e.cmd)}, code {e.returncode}): {stderr_str.strip()}"
-        print(f"[API ERREUR] {error_message}")
-        raise HTTPException(status_code=500, detail=error_message)
-    except Exception as e:
-        error_message = f"Erreur inattendue avec ADB: {str(e)}"
-        print(f"[API ERREUR] {error_message}")
-        raise HTTPException(status_code=500, detail=error_message)
 
+event_broadcaster = EventBroadcaster()
 
-# --- Routes API ---
-@app.post("/call", summary="Initier un appel téléphonique via ADB")
-async def make_call(call_request: CallRequest):
-    phone_number = call_request.phone_number
-    contact_id = call_request.contact_id  # Récupérer l'ID du contact
 
-    print(
-        f"[API] Requête pour appeler le numéro : {phone_number}"
-        + (f" pour contact ID: {contact_id}" if contact_id else "")
-    )
-    try:
-        cleaned_phone_number = phone_number.replace(" ", "")
-        print(f"[API DEBUG] Numéro nettoyé AVANT appel ADB: '{cleaned_phone_number}'")
-        command = [
-            "adb",
-            "shell",
-            "am",
-            "start",
-            "-a",
-            "android.intent.action.CALL",
-            "-d",
-            f"tel:{cleaned_phone_number}",
-        ]
-        print(f"[API] Exécution de la commande ADB : {' '.join(command)}")
+def normalize_email_key(email: Optional[str]) -> Optional[str]:
+    """Clé d'index pour un email : sans espaces superflus, insensible à la casse."""
+    if not email:
+        return None
+    key = str(email).strip().lower()
+    return key or None
 
-        process = await asyncio.create_subprocess_exec(
-            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
 
-        current_time_utc_aware = datetime.now(timezone.utc)
-        current_time_iso_utc = current_time_utc_aware.isoformat()
+def normalize_name_key(
+    first_name: Optional[str], last_name: Optional[str]
+) -> Tuple[str, str]:
+    """Clé d'index pour le couple (prénom, nom) : espaces normalisés, insensible à la casse."""
+    return (
+        " ".join(str(first_name or "").split()).casefold(),
+        " ".join(str(last_name or "").split()).casefold(),
+    )
 
-        if process.returncode == 0:
-            print(f"[API] Commande ADB pour initier l'appel exécutée avec succès.")
+
+# Champs couverts par la recherche plein texte de GET /contacts
+SEARCHABLE_CONTACT_FIELDS = [
+    "firstName",
+    "lastName",
+    "email",
+    "status",
+    "source",
+    "comment",
+]
+
+
+def normalize_search_text(value: Any) -> str:
+    """Texte de recherche : sans accents, insensible à la casse, espaces normalisés."""
+    if value is None:
+        return ""
+    value = str(value)
+    if value.isascii():
+        return " ".join(value.lower().split())
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
+
+
+# Numéro saisi dans la recherche (ex: "+33 6 12 34 56 78", "06.12.34")
+PHONE_QUERY_PATTERN = re.compile(r"\+?\d[\d\s.\-/()]*\d")
+PHONE_QUERY_MIN_DIGITS = 6
+
+
+def search_query_terms(query: str) -> List[List[str]]:
+    """
+    Termes d'une requête de recherche, chacun avec ses formes acceptées.
+    Les numéros sont réduits à leurs chiffres comme dans le texte indexé
+    (sans "+", espaces, points ni tirets) ; un numéro en +33 / 0033 est aussi
+    cherché sous sa forme nationale (0...).
+    """
+
+    def collapse_phone(match: re.Match) -> str:
+        digits = re.sub(r"\D", "", match.group(0))
+        if match.group(0).startswith("+") or len(digits) >= PHONE_QUERY_MIN_DIGITS:
+            return digits
+        return match.group(0)
+
+    text = PHONE_QUERY_PATTERN.sub(collapse_phone, normalize_search_text(query))
+    terms = []
+    for term in text.split():
+        term = term.strip("+")
+        if not term:
+            continue
+        forms = [term]
+        if term.isdigit():
+            if term.startswith("00") and len(term) >= PHONE_QUERY_MIN_DIGITS:
+                term = term[2:]
+                forms = [term]
+            if term.startswith("33") and len(term) > 3:
+                forms.append("0" + term[2:])
+        terms.append(forms)
+    return terms
+
+
+def text_trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def contact_search_text(row: Dict[str, Any]) -> str:
+    """Concatène les champs recherchables d'un contact (un champ par ligne)."""
+    parts = [
+        normalize_search_text(row.get(field)) for field in SEARCHABLE_CONTACT_FIELDS
+    ]
+    phone_key = row.get("phoneE164")
+    if phone_key:
+        # Chiffres internationaux et, pour la France, forme nationale (0612...)
+        parts.append(phone_key[1:])
+        if phone_key.startswith("+33"):
+            parts.append("0" + phone_key[3:])
+    elif row.get("phoneNumber"):
+        parts.append(re.sub(r"\D", "", str(row["phoneNumber"])))
+    return "\n".join(part for part in parts if part)
+
+
+class ContactStore:
+    """
+    Stockage résident et autoritaire des contacts.
+
+    Les lignes sont conservées en mémoire avec un index id -> position : lectures
+    et modifications d'une ligne sont en O(1) et ne touchent jamais le disque.
+    Chaque mutation est persistée via le journal ; le fichier Parquet n'est lu
+    qu'au chargement initial.
+    """
+
+    def __init__(self, journal: ContactJournal):
+        self.journal = journal
+        self._rows: List[Optional[Dict[str, Any]]] = []
+        # Cache write-through des modèles Pydantic, aligné sur self._rows
+        self._models: List[Optional[ContactInDB]] = []
+        self._position_by_id: Dict[str, int] = {}
+        # Clé de tri stable pour la pagination par curseur, alignée sur self._rows
+        self._seqs: List[int] = []
+        self._next_seq = 1
+        # Index secondaires pour la détection des doublons (clé normalisée -> ids)
+        self._ids_by_email: Dict[str, Set[str]] = {}
+        self._ids_by_name: Dict[Tuple[str, str], Set[str]] = {}
+        # Index inverse numéro E.164 -> ids, pour attribuer un appel à un contact
+        self._ids_by_phone: Dict[str, Set[str]] = {}
+        # Compteurs par statut et par source (graphiques de progression), en O(1)
+        self._count_by_status: Counter = Counter()
+        self._count_by_source: Counter = Counter()
+        # Index inversé trigramme -> ids pour la recherche par sous-chaîne,
+        # construit à la première recherche puis maintenu à chaque mutation
+        self._search_text_by_id: Dict[str, str] = {}
+        self._ids_by_trigram: Dict[str, Set[str]] = {}
+        self._search_index_ready = False
+        # Index trié (horodatage, id, type) des rappels et rendez-vous, construit à
+        # la première requête puis maintenu à chaque mutation
+        self._schedule: List[Tuple[datetime, str, str]] = []
+        self._schedule_index_ready = False
+        self._deleted_count = 0
+        self.loaded = False
+        # Version monotone du stockage (ETag) : "epoch" distingue les redémarrages
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self._row_versions: Dict[str, int] = {}
+        # Journal borné des changements (version, id, supprimé ?) pour la synchro différentielle
+        self._change_log: deque = deque(maxlen=CONTACT_CHANGE_LOG_SIZE)
+        self._change_log_floor = 0  # Versions antérieures : resynchronisation complète
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    @staticmethod
+    def _clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Remplace les NaN/NA de pandas par None pour Pydantic."""
+        cleaned = {}
+        for field in ContactInDB.model_fields.keys():
+            value = record.get(field)
+            cleaned[field] = None if value is None or pd.isna(value) else value
+        cleaned["phoneE164"] = phone_number_to_e164(cleaned.get("phoneNumber"))
+        cleaned.update(contact_schedule_fields(cleaned))
+        return cleaned
+
+    def _set_records(self, records: List[Dict[str, Any]]) -> None:
+        self._rows = [self._clean_record(record) for record in records]
+        self._models = [ContactInDB(**row) for row in self._rows]
+        self._position_by_id = {row["id"]: pos for pos, row in enumerate(self._rows)}
+        self._seqs = list(range(self._next_seq, self._next_seq + len(self._rows)))
+        self._next_seq += len(self._rows)
+        self._ids_by_email = {}
+        self._ids_by_name = {}
+        self._ids_by_phone = {}
+        self._count_by_status = Counter()
+        self._count_by_source = Counter()
+        self._search_text_by_id = {}
+        self._ids_by_trigram = {}
+        self._search_index_ready = False
+        self._schedule = []
+        self._schedule_index_ready = False
+        for row in self._rows:
+            self._index_row(row)
+        self._deleted_count = 0
+        # Séquences renumérotées : les curseurs de pagination émis avant sont périmés
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version += 1
+        self._row_versions = {row["id"]: self.version for row in self._rows}
+        # Remplacement complet : les changements antérieurs ne sont plus rejouables
+        self._change_log.clear()
+        self._change_log_floor = self.version
+        self.loaded = True
+        self._notify({"type": "contacts.reset", "version": self.version})
+
+    def _index_row(self, row: Dict[str, Any]) -> None:
+        """Ajoute une ligne aux index secondaires."""
+        email_key = normalize_email_key(row.get("email"))
+        if email_key:
+            self._ids_by_email.setdefault(email_key, set()).add(row["id"])
+        name_key = normalize_name_key(row.get("firstName"), row.get("lastName"))
+        self._ids_by_name.setdefault(name_key, set()).add(row["id"])
+        phone_key = row.get("phoneE164")
+        if phone_key:
+            self._ids_by_phone.setdefault(phone_key, set()).add(row["id"])
+        self._count_by_status[row.get("status")] += 1
+        self._count_by_source[row.get("source")] += 1
+        if self._schedule_index_ready:
+            for entry in self._schedule_entries(row):
+                bisect.insort(self._schedule, entry)
+        if self._search_index_ready:
+            search_text = contact_search_text(row)
+            self._search_text_by_id[row["id"]] = search_text
+            for trigram in text_trigrams(search_text):
+                self._ids_by_trigram.setdefault(trigram, set()).add(row["id"])
+
+    def _unindex_row(self, row: Dict[str, Any]) -> None:
+        """Retire une ligne des index secondaires."""
+        email_key = normalize_email_key(row.get("email"))
+        if email_key and email_key in self._ids_by_email:
+            self._ids_by_email[email_key].discard(row["id"])
+            if not self._ids_by_email[email_key]:
+                del self._ids_by_email[email_key]
+        name_key = normalize_name_key(row.get("firstName"), row.get("lastName"))
+        if name_key in self._ids_by_name:
+            self._ids_by_name[name_key].discard(row["id"])
+            if not self._ids_by_name[name_key]:
+                del self._ids_by_name[name_key]
+        phone_key = row.get("phoneE164")
+        if phone_key and phone_key in self._ids_by_phone:
+            self._ids_by_phone[phone_key].discard(row["id"])
+            if not self._ids_by_phone[phone_key]:
+                del self._ids_by_phone[phone_key]
+        for counter, key in (
+            (self._count_by_status, row.get("status")),
+            (self._count_by_source, row.get("source")),
+        ):
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+        if self._schedule_index_ready:
+            for entry in self._schedule_entries(row):
+                pos = bisect.bisect_left(self._schedule, entry)
+                if pos < len(self._schedule) and self._schedule[pos] == entry:
+                    del self._schedule[pos]
+        search_text = self._search_text_by_id.pop(row["id"], "")
+        for trigram in text_trigrams(search_text):
+            ids = self._ids_by_trigram.get(trigram)
+            if ids is not None:
+                ids.discard(row["id"])
+                if not ids:
+                    del self._ids_by_trigram[trigram]
+
+    def _build_search_index(self) -> None:
+        """Construit en une passe l'index de recherche de toutes les lignes."""
+        search_text_by_id: Dict[str, str] = {}
+        ids_by_trigram: Dict[str, Set[str]] = defaultdict(set)
+        for row in self._rows:
+            if row is None:
+                continue
+            search_text = contact_search_text(row)
+            search_text_by_id[row["id"]] = search_text
+            for trigram in text_trigrams(search_text):
+                ids_by_trigram[trigram].add(row["id"])
+        self._search_text_by_id = search_text_by_id
+        self._ids_by_trigram = dict(ids_by_trigram)
+        self._search_index_ready = True
+
+    @staticmethod
+    def _schedule_entries(row: Dict[str, Any]) -> List[Tuple[datetime, str, str]]:
+        return [
+            (row[field], row["id"], field)
+            for field in CONTACT_SCHEDULE_FIELDS
+            if row.get(field) is not None
+        ]
+
+    def _build_schedule_index(self) -> None:
+        """Construit en une passe (tri) l'index des rappels et rendez-vous."""
+        self._schedule = sorted(
+            entry
+            for row in self._rows
+            if row is not None
+            for entry in self._schedule_entries(row)
+        )
+        self._schedule_index_ready = True
+
+    def load(self) -> None:
+        """Charge le fichier de base et rejoue le journal (au démarrage)."""
+        self._set_records(load_contacts_dataframe().to_dict(orient="records"))
+
+    def _ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.load()
+
+    def _compact_rows(self) -> None:
+        """Retire les emplacements des contacts supprimés quand ils deviennent majoritaires."""
+        self._rows = [row for row in self._rows if row is not None]
+        self._seqs = [
+            seq for seq, model in zip(self._seqs, self._models) if model is not None
+        ]
+        self._models = [model for model in self._models if model is not None]
+        self._position_by_id = {row["id"]: pos for pos, row in enumerate(self._rows)}
+        self._deleted_count = 0
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._position_by_id)
+
+    def __contains__(self, contact_id: str) -> bool:
+        self._ensure_loaded()
+        return contact_id in self._position_by_id
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Lignes courantes, dans l'ordre de stockage (références internes, ne pas modifier)."""
+        self._ensure_loaded()
+        return [row for row in self._rows if row is not None]
+
+    def models(self) -> List[ContactInDB]:
+        """Modèles Pydantic courants, sans reconstruction (cache write-through)."""
+        self._ensure_loaded()
+        return [model for model in self._models if model is not None]
+
+    def page(
+        self,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+        contact_ids: Optional[List[str]] = None,
+    ) -> Tuple[List[ContactInDB], Optional[int]]:
+        """
+        Pagination par curseur (keyset) sur la séquence d'insertion.
+        Retourne la page et le curseur de la page suivante (None si dernière page).
+        Sans contact_ids, le début de page est trouvé par bisection : O(log N + limit).
+        """
+        self._ensure_loaded()
+        if contact_ids is None:
+            start = bisect.bisect_right(self._seqs, after) if after is not None else 0
+            positions = (
+                pos
+                for pos in range(start, len(self._rows))
+                if self._models[pos] is not None
+            )
+        else:
+            positions = (self._position_by_id[contact_id] for contact_id in contact_ids)
+            if after is not None:
+                positions = (pos for pos in positions if self._seqs[pos] > after)
+
+        page_models: List[ContactInDB] = []
+        last_pos = None
+        for pos in positions:
+            if limit is not None and len(page_models) >= limit:
+                return page_models, self._seqs[last_pos]
+            page_models.append(self._models[pos])
+            last_pos = pos
+        return page_models, None
+
+    def cursor(self, seq: int) -> str:
+        """Curseur de pagination opaque, lié à l'epoch qui a numéroté les séquences."""
+        return f"{self.epoch}.{seq}"
+
+    def cursor_seq(self, cursor: str) -> Optional[int]:
+        """
+        Séquence désignée par un curseur, None s'il a été émis avant un
+        rechargement du stockage (redémarrage, remplacement complet).
+        ValueError si le curseur est mal formé.
+        """
+        epoch, _, seq = cursor.rpartition(".")
+        if not epoch:
+            raise ValueError(cursor)
+        seq_value = int(seq)
+        self._ensure_loaded()
+        return seq_value if epoch == self.epoch else None
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Enregistre un callback appelé après chaque mutation (push temps réel)."""
+        self._listeners.append(listener)
+
+    def _notify(self, event: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"[Store] Erreur dans un listener de mutation: {e}")
+
+    def _record_change(self, contact_id: str, deleted: bool = False) -> None:
+        """Inscrit un changement à la version courante (ETag de ligne, synchro différentielle)."""
+        if deleted:
+            self._row_versions.pop(contact_id, None)
+        else:
+            self._row_versions[contact_id] = self.version
+        if len(self._change_log) == self._change_log.maxlen:
+            # L'entrée la plus ancienne va être évincée
+            self._change_log_floor = self._change_log[0][0]
+        self._change_log.append((self.version, contact_id, deleted))
+
+    def _bump_version(self, contact_id: str, deleted: bool = False) -> None:
+        self.version += 1
+        self._record_change(contact_id, deleted)
+        if self._listeners:
+            if deleted:
+                event = {"type": "contact.deleted", "id": contact_id}
+            else:
+                # Modèle transmis tel quel : sérialisé par le diffuseur seulement s'il a des abonnés
+                model = self._models[self._position_by_id[contact_id]]
+                event = {"type": "contact.upserted", "contact": model}
+            self._notify({**event, "version": self.version, "epoch": self.epoch})
+
+    def changes_since(
+        self, since: int
+    ) -> Optional[Tuple[List[ContactInDB], List[str]]]:
+        """
+        Contacts créés/modifiés et ids supprimés depuis la version `since`.
+        Retourne None si cette version est trop ancienne (resynchronisation requise).
+        """
+        self._ensure_loaded()
+        if since < self._change_log_floor or since > self.version:
+            return None
+        changed_ids: Dict[str, bool] = {}
+        for version, contact_id, _deleted in reversed(self._change_log):
+            if version <= since:
+                break
+            changed_ids.setdefault(contact_id, True)
+        upserted = []
+        deleted = []
+        for contact_id in changed_ids:
+            model = self.get_model(contact_id)
+            if model is None:
+                deleted.append(contact_id)
+            else:
+                upserted.append(model)
+        return upserted, deleted
+
+    def etag(self) -> str:
+        """ETag de l'ensemble des contacts, change à chaque mutation."""
+        self._ensure_loaded()
+        return f'W/"{self.epoch}-{self.version}"'
+
+    def row_etag(self, contact_id: str) -> Optional[str]:
+        """ETag d'un contact, ne change que lorsque ce contact est modifié."""
+        self._ensure_loaded()
+        row_version = self._row_versions.get(contact_id)
+        if row_version is None:
+            return None
+        return f'W/"{self.epoch}-{contact_id}-{row_version}"'
+
+    def get(self, contact_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        pos = self._position_by_id.get(contact_id)
+        if pos is None:
+            return None
+        return dict(self._rows[pos])
+
+    def get_model(self, contact_id: str) -> Optional[ContactInDB]:
+        self._ensure_loaded()
+        pos = self._position_by_id.get(contact_id)
+        return self._models[pos] if pos is not None else None
+
+    def find_by_email(self, email: Optional[str]) -> Set[str]:
+        """Ids des contacts ayant cet email (comparaison normalisée, O(1))."""
+        self._ensure_loaded()
+        email_key = normalize_email_key(email)
+        if not email_key:
+            return set()
+        return set(self._ids_by_email.get(email_key, ()))
+
+    def find_by_name(
+        self, first_name: Optional[str], last_name: Optional[str]
+    ) -> Set[str]:
+        """Ids des contacts ayant ce couple prénom/nom (comparaison normalisée, O(1))."""
+        self._ensure_loaded()
+        return set(
+            self._ids_by_name.get(normalize_name_key(first_name, last_name), ())
+        )
+
+    def search(self, query: str) -> List[str]:
+        """
+        Ids des contacts dont les champs recherchables contiennent chaque mot de la
+        requête (sous-chaîne, sans accents ni casse), dans l'ordre de stockage.
+        Les candidats viennent de l'intersection des listes de trigrammes puis
+        sont vérifiés sur le texte complet.
+        """
+        self._ensure_loaded()
+        if not self._search_index_ready:
+            self._build_search_index()
+        terms = search_query_terms(query)
+        if not terms:
+            return [row["id"] for row in self._rows if row is not None]
+
+        candidates: Optional[Set[str]] = None
+        for forms in terms:
+            # Union des formes d'un terme, chaque forme étant l'intersection de ses trigrammes
+            term_ids: Set[str] = set()
+            for form in forms:
+                trigrams = text_trigrams(form)
+                if not trigrams:
+                    term_ids = None  # Forme de moins de 3 caractères : pas de filtrage
+                    break
+                form_ids: Optional[Set[str]] = None
+                for ids in sorted(
+                    (self._ids_by_trigram.get(trigram, set()) for trigram in trigrams),
+                    key=len,
+                ):
+                    form_ids = set(ids) if form_ids is None else form_ids & ids
+                    if not form_ids:
+                        break
+                term_ids |= form_ids or set()
+            if term_ids is None:
+                continue
+            candidates = term_ids if candidates is None else candidates & term_ids
+            if not candidates:
+                return []
+        if candidates is None:
+            # Termes de moins de 3 caractères : vérification directe des textes
+            candidates = set(self._search_text_by_id.keys())
+
+        matches = [
+            contact_id
+            for contact_id in candidates
+            if all(
+                any(form in self._search_text_by_id[contact_id] for form in forms)
+                for forms in terms
+            )
+        ]
+        matches.sort(key=self._position_by_id.__getitem__)
+        return matches
+
+    def find_by_phone(self, number: Optional[str]) -> List[str]:
+        """Ids des contacts associés à ce numéro, quel que soit son format (O(1))."""
+        self._ensure_loaded()
+        phone_key = phone_number_to_e164(number)
+        if not phone_key:
+            return []
+        return sorted(self._ids_by_phone.get(phone_key, ()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Nombre de contacts par statut et par source (compteurs maintenus, O(statuts))."""
+        self._ensure_loaded()
+        by_status: Counter = Counter()
+        for status_value, count in self._count_by_status.items():
+            by_status[status_value or "Non défini"] += count
+        by_source: Counter = Counter()
+        for source, count in self._count_by_source.items():
+            by_source[source or "Inconnue"] += count
+        return {
+            "total": len(self._position_by_id),
+            "by_status": dict(by_status),
+            "by_source": dict(by_source),
+        }
+
+    def scheduled_between(
+        self, start: datetime, end: datetime, field: Optional[str] = None
+    ) -> List[Tuple[datetime, str, str]]:
+        """
+        Rappels / rendez-vous (horodatage, id, champ) compris entre start et end,
+        par ordre chronologique : bisection dans l'index trié, O(log N + résultats).
+        """
+        self._ensure_loaded()
+        if not self._schedule_index_ready:
+            self._build_schedule_index()
+        entries = []
+        for pos in range(bisect.bisect_left(self._schedule, (start,)), len(self._schedule)):
+            entry = self._schedule[pos]
+            if entry[0] > end:
+                break
+            if field is None or entry[2] == field:
+                entries.append(entry)
+        return entries
+
+    def create(self, contact: ContactInDB) -> Dict[str, Any]:
+        self._ensure_loaded()
+        record = contact.model_dump()
+        record["phoneE164"] = phone_number_to_e164(record.get("phoneNumber"))
+        record.update(contact_schedule_fields(record))
+        self.journal.append(
+            "upsert", contact.id, {k: v for k, v in record.items() if k != "id"}
+        )
+        self._position_by_id[contact.id] = len(self._rows)
+        self._rows.append(record)
+        self._seqs.append(self._next_seq)
+        self._next_seq += 1
+        self._models.append(ContactInDB(**record))
+        self._index_row(record)
+        self._bump_version(contact.id)
+        return dict(record)
+
+    def update(
+        self, contact_id: str, fields: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        pos = self._position_by_id.get(contact_id)
+        if pos is None:
+            return None
+        if "phoneNumber" in fields:
+            fields = {
+                **fields,
+                "phoneE164": phone_number_to_e164(fields["phoneNumber"]),
+            }
+        if CONTACT_SCHEDULE_SOURCE_FIELDS & fields.keys():
+            fields = {**fields, **contact_schedule_fields({**self._rows[pos], **fields})}
+        if fields:
+            self.journal.append("patch", contact_id, fields)
+            self._unindex_row(self._rows[pos])
+            self._rows[pos].update(fields)
+            self._index_row(self._rows[pos])
+            self._models[pos] = ContactInDB(**self._rows[pos])
+            self._bump_version(contact_id)
+        return dict(self._rows[pos])
+
+    def delete(self, contact_id: str) -> bool:
+        self._ensure_loaded()
+        pos = self._position_by_id.pop(contact_id, None)
+        if pos is None:
+            return False
+        self.journal.append("delete", contact_id)
+        self._unindex_row(self._rows[pos])
+        self._rows[pos] = None
+        self._models[pos] = None
+        self._bump_version(contact_id, deleted=True)
+        self._deleted_count += 1
+        if self._deleted_count > len(self._rows) // 2:
+            self._compact_rows()
+        return True
+
+    def replace_all(self, df: pd.DataFrame) -> None:
+        """Remplace tout le contenu (import) : réécrit le fichier de base et vide le journal."""
+        replace_all_contacts(df)
+        self._set_records(df.to_dict(orient="records"))
+
+    def import_rows(self, rows: List[Tuple[Dict[str, Any], ContactInDB]]) -> int:
+        """
+        Fusionne un lot de contacts importés (lignes nettoyées et modèles) : un
+        contact de même nom et même email (normalisés, via les index) est remplacé
+        par la ligne importée. Le lot est journalisé en une écriture et inscrit
+        dans le journal des changements sous une seule version ; les abonnés ne
+        sont prévenus qu'une fois, par finish_import(). Retourne le nombre de remplacés.
+        """
+        self._ensure_loaded()
+        replaced_ids: List[str] = []
+        for row, model in rows:
+            email_key = normalize_email_key(row.get("email"))
+            for contact_id in self.find_by_name(row.get("firstName"), row.get("lastName")):
+                pos = self._position_by_id[contact_id]
+                if normalize_email_key(self._rows[pos].get("email")) != email_key:
+                    continue
+                del self._position_by_id[contact_id]
+                self._unindex_row(self._rows[pos])
+                self._rows[pos] = None
+                self._models[pos] = None
+                self._deleted_count += 1
+                replaced_ids.append(contact_id)
+            self._position_by_id[row["id"]] = len(self._rows)
+            self._rows.append(row)
+            self._seqs.append(self._next_seq)
+            self._next_seq += 1
+            self._models.append(model)
+            self._index_row(row)
+        # Journalisé dans le même tour de boucle : aucun client ne lit le lot avant
+        self.journal.append_many(
+            [("delete", contact_id, None) for contact_id in replaced_ids]
+            + [
+                ("upsert", row["id"], {k: v for k, v in row.items() if k != "id"})
+                for row, _model in rows
+            ]
+        )
+        self.version += 1
+        for contact_id in replaced_ids:
+            self._record_change(contact_id, deleted=True)
+        for row, _model in rows:
+            self._record_change(row["id"])
+        if self._deleted_count > len(self._rows) // 2:
+            self._compact_rows()
+        return len(replaced_ids)
+
+    def finish_import(self) -> None:
+        """Fin d'import : un seul événement de rechargement pour les abonnés temps réel."""
+        self._notify({"type": "contacts.reset", "version": self.version, "epoch": self.epoch})
+
+    def clear(self) -> None:
+        self._set_records([])
+
+    def dataframe(self) -> pd.DataFrame:
+        return contact_records_to_dataframe(self.records())
+
+
+contact_store = ContactStore(contacts_journal)
+contact_store.add_listener(event_broadcaster.publish)
+
+
+# --- Fonctions de gestion des données (chargement, sauvegarde, recherche) ---
+
+
+def load_contacts_from_storage() -> List[Dict]:
+    """Retourne les contacts du stockage en mémoire."""
+    try:
+        return [dict(record) for record in contact_store.records()]
+    except Exception as e:
+        print(f"[API ERREUR] Impossible de charger {CONTACTS_STORAGE_FILE}: {e}")
+        return []
+
+
+def save_contacts_to_storage(contacts_list: List[Dict]):
+    """Sauvegarde la liste complète des contacts dans le fichier Parquet."""
+    try:
+        contact_store.replace_all(contact_records_to_dataframe(contacts_list))
+        print(f"[API INFO] Contacts sauvegardés dans {CONTACTS_STORAGE_FILE}")
+    except Exception as e:
+        print(
+            f"[API ERREUR] Impossible de sauvegarder dans {CONTACTS_STORAGE_FILE}: {e}"
+        )
+
+
+# NOUVELLE FONCTION D'AIDE (ou à adapter si elle existe déjà sous un autre nom)
+def find_contact_by_id(contact_id: str) -> Optional[Dict]:
+    """Trouve un contact par son ID via l'index du stockage en mémoire (O(1))."""
+    return contact_store.get(contact_id)
+
+
+def patch_contact(contact_id: str, fields: Dict[str, Any]) -> Optional[Dict]:
+    """
+    Applique une modification partielle à un contact en n'écrivant que les champs
+    modifiés dans le journal. Retourne le contact mis à jour, ou None s'il n'existe pas.
+    """
+    return contact_store.update(contact_id, fields)
+
+
+# --- Historique des appels (journal append-only, partitionné par jour) ---
+class CallHistoryLog:
+    """
+    Journal des appels terminés, un répertoire par jour (heure de Paris) :
+    day=AAAA-MM-JJ/calls.jsonl reçoit les appels du jour (ajout en fin de
+    fichier), puis est scellé en calls.parquet une fois la journée passée.
+    """
+
+    COLUMNS = [
+        "contact_id",
+        "device",
+        "phone_number",
+        "start",
+        "end",
+        "duration_seconds",
+        "outcome",
+        "end_reason",
+    ]
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # Incrémentée à chaque écriture : ordonne les appels par rapport aux lectures
+        self.version = 0
+        self._listeners: List[Callable[[str, Dict[str, Any], int], None]] = []
+
+    def add_listener(self, listener: Callable[[str, Dict[str, Any], int], None]) -> None:
+        """Enregistre un callback (jour, appel, version) appelé après chaque ajout."""
+        self._listeners.append(listener)
+
+    def _partition(self, day: str) -> Path:
+        return self.directory / f"day={day}"
+
+    def append(self, event: Dict[str, Any], end_time: datetime) -> None:
+        day = end_time.astimezone(PARIS_TZ).date().isoformat()
+        partition = self._partition(day)
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            partition.mkdir(parents=True, exist_ok=True)
+            with open(partition / "calls.jsonl", "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.version += 1
+            version = self.version
+        for listener in self._listeners:
+            try:
+                listener(day, event, version)
+            except Exception as e:
+                print(f"[CallHistory] Erreur dans un listener d'appel: {e}")
+
+    @staticmethod
+    def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"[CallHistory] Ligne illisible ignorée dans {path}")
+        return records
+
+    def seal_past_days(self) -> None:
+        """Convertit en Parquet les journaux des jours passés."""
+        today = datetime.now(PARIS_TZ).date().isoformat()
+        for jsonl_file in sorted(self.directory.glob("day=*/calls.jsonl")):
+            if jsonl_file.parent.name[len("day="):] >= today:
+                continue
+            with self._lock:
+                parquet_file = jsonl_file.with_suffix(".parquet")
+                df = pd.DataFrame(self._read_jsonl(jsonl_file), columns=self.COLUMNS)
+                if parquet_file.exists():
+                    df = pd.concat([pd.read_parquet(parquet_file), df], ignore_index=True)
+                tmp_file = parquet_file.with_suffix(".parquet.tmp")
+                df.to_parquet(tmp_file, index=False)
+                os.replace(tmp_file, parquet_file)
+                jsonl_file.unlink()
+            print(f"[CallHistory] Journal {jsonl_file.parent.name} scellé en Parquet.")
+
+    def read(
+        self, contact_id: Optional[str] = None, day: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Appels enregistrés (tous les jours ou un seul), filtrés par contact."""
+        return self.read_with_version(contact_id, day)[0]
+
+    def read_with_version(
+        self, contact_id: Optional[str] = None, day: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, int]:
+        """Comme read(), avec la version du journal à laquelle la lecture correspond."""
+        partitions = [self._partition(day)] if day else sorted(self.directory.glob("day=*"))
+        filters = [("contact_id", "==", contact_id)] if contact_id else None
+        frames = []
+        with self._lock:
+            version = self.version
+            for partition in partitions:
+                parquet_file = partition / "calls.parquet"
+                if parquet_file.exists():
+                    frames.append(pd.read_parquet(parquet_file, filters=filters))
+                jsonl_file = partition / "calls.jsonl"
+                if jsonl_file.exists():
+                    frames.append(
+                        pd.DataFrame(self._read_jsonl(jsonl_file), columns=self.COLUMNS)
+                    )
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=self.COLUMNS), version
+        df = pd.concat(frames, ignore_index=True)
+        if contact_id:
+            df = df[df["contact_id"] == contact_id]
+        return df.sort_values("start", kind="stable").reset_index(drop=True), version
+
+
+call_history = CallHistoryLog(CALL_HISTORY_DIR)
+
+
+def record_call_end(
+    contact_id: str,
+    device: Optional[str],
+    start_time_iso: Optional[str],
+    end_time_utc: datetime,
+    duration_seconds: Optional[float],
+    duree_appel: str,
+    outcome: str,
+    end_reason: str,
+) -> Optional[Dict]:
+    """
+    Ajoute l'appel terminé à l'historique puis met à jour les champs « dernier
+    appel » du contact (dérivés de cet historique). Retourne le contact mis à
+    jour, ou None s'il n'existe pas.
+    """
+    contact = contact_store.get(contact_id)
+    try:
+        call_history.append(
+            {
+                "contact_id": contact_id,
+                "device": device,
+                "phone_number": contact.get("phoneNumber") if contact else None,
+                "start": start_time_iso,
+                "end": end_time_utc.isoformat(),
+                "duration_seconds": (
+                    int(duration_seconds) if duration_seconds is not None else None
+                ),
+                "outcome": outcome,
+                "end_reason": end_reason,
+            },
+            end_time_utc,
+        )
+    except Exception as e:
+        print(f"[CallHistory] Erreur lors de l'enregistrement de l'appel de {contact_id}: {e}")
+    if contact is None:
+        return None
+    end_time_paris = end_time_utc.astimezone(PARIS_TZ)
+    return patch_contact(
+        contact_id,
+        {
+            "isCurrentlyInCall": False,
+            "dureeAppel": duree_appel,
+            "dateAppel": end_time_paris.strftime("%d/%m/%Y"),
+            "heureAppel": end_time_paris.strftime("%H:%M:%S"),
+        },
+    )
+
+
+# --- Statistiques d'appels et de contacts (/analytics) ---
+ANALYTICS_CONVERSION_STATUSES = [
+    status.strip()
+    for status in os.getenv("ANALYTICS_CONVERSION_STATUSES", "DO,RO").split(",")
+    if status.strip()
+]
+DURATION_TEXT_PATTERN = re.compile(r"^\s*(?:(\d+):)?(\d+):(\d+)\s*$")
+# Jours d'historique dont les compteurs restent en mémoire
+CALL_ANALYTICS_CACHED_DAYS = 8
+
+
+def duration_text_seconds(value: Any) -> Optional[float]:
+    """Convertit une durée « MM:SS » / « HH:MM:SS » en secondes (None si invalide)."""
+    match = DURATION_TEXT_PATTERN.match(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    hours, minutes, seconds = match.groups()
+    return float(int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds))
+
+
+def optional_number(value: Any) -> Optional[float]:
+    """Nombre ou None (valeurs absentes, NaN des lectures Parquet, texte invalide)."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number
+
+
+class ContactAnalytics:
+    """
+    Agrégats par statut et par source des contacts (statut, source, durée du
+    dernier appel), tenus à jour par le listener du stockage : chaque mutation
+    retire l'ancienne contribution du contact et ajoute la nouvelle, en O(1).
+
+    Le calcul complet (premier appel, rechargement du stockage) parcourt les
+    contacts dans un thread ; les mutations reçues pendant ce calcul sont
+    appliquées ensuite.
+    """
+
+    def __init__(self, store: "ContactStore"):
+        self.store = store
+        # id -> (statut, source, durée en secondes) ; None tant que le calcul complet n'est pas fait
+        self._contributions: Optional[Dict[str, Tuple[str, str, Optional[float]]]] = None
+        self._by_status: Dict[str, List[float]] = {}  # statut -> [contacts, appelés, durée totale]
+        self._by_source: Dict[str, List[int]] = {}  # source -> [contacts, appelés, convertis]
+        self._pending: Optional[Dict[str, Optional[Tuple[str, str, Optional[float]]]]] = None
+        self._generation = 0
+        self._rebuild_lock = asyncio.Lock()
+        store.add_listener(self.on_store_event)
+
+    @staticmethod
+    def _contribution(
+        status: Optional[str], source: Optional[str], duree_appel: Optional[str]
+    ) -> Tuple[str, str, Optional[float]]:
+        return (status or "Non défini", source or "Inconnue", duration_text_seconds(duree_appel))
+
+    def _apply(self, contribution: Tuple[str, str, Optional[float]], sign: int) -> None:
+        status, source, duration = contribution
+        called = duration is not None
+        # Conversion rapportée aux contacts appelés : seuls les convertis appelés comptent
+        converted = called and status in ANALYTICS_CONVERSION_STATUSES
+        by_status = self._by_status.setdefault(status, [0, 0, 0.0])
+        by_status[0] += sign
+        by_status[1] += sign * called
+        by_status[2] += sign * (duration or 0.0)
+        if by_status[0] == 0:
+            del self._by_status[status]
+        by_source = self._by_source.setdefault(source, [0, 0, 0])
+        by_source[0] += sign
+        by_source[1] += sign * called
+        by_source[2] += sign * converted
+        if by_source[0] == 0:
+            del self._by_source[source]
+
+    def _set(
+        self, contact_id: str, contribution: Optional[Tuple[str, str, Optional[float]]]
+    ) -> None:
+        previous = self._contributions.pop(contact_id, None)
+        if previous is not None:
+            self._apply(previous, -1)
+        if contribution is not None:
+            self._contributions[contact_id] = contribution
+            self._apply(contribution, 1)
+
+    def on_store_event(self, event: Dict[str, Any]) -> None:
+        if event["type"] == "contacts.reset":
+            self._contributions = None
+            self._generation += 1
+            return
+        if event["type"] == "contact.deleted":
+            contact_id, contribution = event["id"], None
+        elif event["type"] == "contact.upserted":
+            contact = event["contact"]
+            contact_id = contact.id
+            contribution = self._contribution(contact.status, contact.source, contact.dureeAppel)
+        else:
+            return
+        if self._pending is not None:
+            self._pending[contact_id] = contribution  # Calcul complet en cours
+        elif self._contributions is not None:
+            self._set(contact_id, contribution)
+
+    def _aggregate(self, rows: List[Dict[str, Any]]) -> "ContactAnalytics":
+        """Calcul complet des contributions (exécuté hors de la boucle asyncio)."""
+        fresh = ContactAnalytics.__new__(ContactAnalytics)
+        fresh._contributions = {}
+        fresh._by_status = {}
+        fresh._by_source = {}
+        for row in rows:
+            fresh._set(
+                row["id"],
+                self._contribution(row.get("status"), row.get("source"), row.get("dureeAppel")),
+            )
+        return fresh
+
+    async def _ensure_built(self) -> None:
+        async with self._rebuild_lock:
+            while self._contributions is None:
+                generation = self._generation
+                self._pending = {}
+                try:
+                    fresh = await asyncio.to_thread(self._aggregate, self.store.records())
+                    pending = self._pending
+                finally:
+                    self._pending = None
+                if generation != self._generation:
+                    continue  # Stockage rechargé pendant le calcul : recommencer
+                self._contributions = fresh._contributions
+                self._by_status = fresh._by_status
+                self._by_source = fresh._by_source
+                for contact_id, contribution in pending.items():
+                    self._set(contact_id, contribution)
+
+    async def summary(self) -> Dict[str, Any]:
+        await self._ensure_built()
+        by_status = [
+            {
+                "status": status,
+                "contacts": int(contacts),
+                "called": int(called),
+                "avg_duration_seconds": round(total / called, 1) if called else None,
+                "total_duration_seconds": total,
+            }
+            for status, (contacts, called, total) in sorted(self._by_status.items())
+        ]
+        by_source = [
+            {
+                "source": source,
+                "contacts": contacts,
+                "called": called,
+                "converted": converted,
+                "conversion_rate": round(converted / called, 4) if called else None,
+            }
+            for source, (contacts, called, converted) in sorted(self._by_source.items())
+        ]
+        return {
+            "version": self.store.version,
+            "total_contacts": len(self._contributions),
+            "called_contacts": sum(row["called"] for row in by_status),
+            "converted_contacts": sum(row["converted"] for row in by_source),
+            "conversion_statuses": ANALYTICS_CONVERSION_STATUSES,
+            "by_status": by_status,
+            "by_source": by_source,
+        }
+
+
+class CallAnalytics:
+    """
+    Agrégats par jour de l'historique des appels. Les compteurs d'un jour sont
+    calculés (dans un thread) à sa première consultation, puis tenus à jour à
+    chaque appel enregistré, sans relire la partition.
+    """
+
+    def __init__(self, history: CallHistoryLog):
+        self.history = history
+        self._days: Dict[str, Dict[str, Any]] = {}
+        # Appels reçus pendant le calcul complet d'un jour : (version, appel)
+        self._loading: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        self._load_lock = asyncio.Lock()
+        history.add_listener(self.on_call_recorded)
+
+    @staticmethod
+    def _empty_day() -> Dict[str, Any]:
+        return {
+            "total": 0,
+            "answered": 0,
+            "duration_total": 0.0,
+            "duration_count": 0,
+            "calls_per_hour": [0] * 24,
+            "answered_per_hour": [0] * 24,
+            "by_outcome": Counter(),
+            "by_device": {},  # appareil -> [appels, décrochés, durée totale, durées connues]
+        }
+
+    @staticmethod
+    def _add_call(stats: Dict[str, Any], call: Dict[str, Any]) -> None:
+        outcome = call.get("outcome")
+        answered = outcome == "answered"
+        duration = optional_number(call.get("duration_seconds"))
+        stats["total"] += 1
+        stats["answered"] += answered
+        if duration is not None:
+            stats["duration_total"] += duration
+            stats["duration_count"] += 1
+        try:
+            hour = (
+                datetime.fromisoformat(str(call.get("end")).replace("Z", "+00:00"))
+                .astimezone(PARIS_TZ)
+                .hour
+            )
+        except ValueError:
+            hour = None
+        if hour is not None:
+            stats["calls_per_hour"][hour] += 1
+            stats["answered_per_hour"][hour] += answered
+        if isinstance(outcome, str):
+            stats["by_outcome"][outcome] += 1
+        device = call.get("device")
+        device = device if isinstance(device, str) else "default"
+        by_device = stats["by_device"].setdefault(device, [0, 0, 0.0, 0])
+        by_device[0] += 1
+        by_device[1] += answered
+        if duration is not None:
+            by_device[2] += duration
+            by_device[3] += 1
+
+    def _aggregate_day(self, day: str) -> Tuple[Dict[str, Any], int]:
+        """Calcul complet d'un jour (exécuté hors de la boucle asyncio)."""
+        df, version = self.history.read_with_version(day=day)
+        stats = self._empty_day()
+        for call in df.to_dict(orient="records"):
+            self._add_call(stats, call)
+        return stats, version
+
+    def on_call_recorded(self, day: str, call: Dict[str, Any], version: int) -> None:
+        if day in self._loading:
+            self._loading[day].append((version, call))
+        stats = self._days.get(day)
+        if stats is not None:
+            self._add_call(stats, call)
+
+    async def _day_stats(self, day: str) -> Dict[str, Any]:
+        async with self._load_lock:
+            stats = self._days.get(day)
+            if stats is not None:
+                return stats
+            self._loading[day] = []
+            try:
+                stats, version = await asyncio.to_thread(self._aggregate_day, day)
+                # Appels enregistrés après la lecture de la partition
+                for call_version, call in self._loading[day]:
+                    if call_version > version:
+                        self._add_call(stats, call)
+            finally:
+                del self._loading[day]
+            # Ne garder que les derniers jours consultés
+            if len(self._days) >= CALL_ANALYTICS_CACHED_DAYS:
+                self._days.pop(next(iter(self._days)))
+            self._days[day] = stats
+            return stats
+
+    async def summary(self, day: str) -> Dict[str, Any]:
+        stats = await self._day_stats(day)
+        return {
+            "day": day,
+            "total_calls": stats["total"],
+            "answered_calls": stats["answered"],
+            "avg_duration_seconds": (
+                round(stats["duration_total"] / stats["duration_count"], 1)
+                if stats["duration_count"]
+                else None
+            ),
+            "calls_per_hour": [
+                {"hour": hour, "calls": calls, "answered": answered}
+                for hour, (calls, answered) in enumerate(
+                    zip(stats["calls_per_hour"], stats["answered_per_hour"])
+                )
+            ],
+            "by_outcome": dict(stats["by_outcome"]),
+            "by_device": [
+                {
+                    "device": device,
+                    "calls": calls,
+                    "answered": answered,
+                    "avg_duration_seconds": round(total / known, 1) if known else None,
+                }
+                for device, (calls, answered, total, known) in sorted(
+                    stats["by_device"].items()
+                )
+            ],
+        }
+
+
+contact_analytics = ContactAnalytics(contact_store)
+call_analytics = CallAnalytics(call_history)
+
+
+# --- Logique de Backup (Scheduler) ---
+def perform_backup_contacts():
+    """Sauvegarde les contacts en format Parquet."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = BACKUP_DIR / f"contacts_backup_{timestamp}.parquet"
+    print(f"[Scheduler] Exécution du backup des contacts vers {filename}...")
+
+    if len(contact_store) == 0:
+        print("[Scheduler] Aucun contact à sauvegarder.")
+        return
+
+    try:
+        # Instantané du stockage en mémoire (base + mutations du journal)
+        df = contact_store.dataframe()
+        df.to_parquet(filename, index=False)
+        print(f"[Scheduler] Backup {filename} terminé avec succès.")
+    except Exception as e:
+        print(f"[Scheduler] Erreur lors de la création du backup Parquet: {e}")
+
+
+async def seal_call_history():
+    """Scelle les jours passés de l'historique des appels dans un thread."""
+    try:
+        await asyncio.to_thread(call_history.seal_past_days)
+    except Exception as e:
+        print(f"[Scheduler] Erreur lors du scellement de l'historique des appels: {e}")
+
+
+schedule.every(30).minutes.do(perform_backup_contacts)
+# run_pending tourne sur la boucle : l'écriture Parquet est lancée en tâche de fond
+schedule.every().day.at("00:05").do(lambda: asyncio.create_task(seal_call_history()))
+# schedule.every(10).seconds.do(perform_backup_contacts) # Pour test
+
+
+async def run_scheduler():
+    """Exécute les tâches planifiées en continu."""
+    while True:
+        schedule.run_pending()
+        if contacts_journal.should_compact() and not _journal_compaction_running:
+            asyncio.create_task(compact_contacts_journal())
+        await asyncio.sleep(1)
+
+
+@app.on_event("startup")
+async def startup_event():
+    print("Application FastAPI démarrée...")
+    # Précharger et mettre en cache les contacts pour réduire la latence initiale
+    try:
+        contact_store.load()
+        _ = get_cached_contacts()
+        print(f"[Startup] Chargement initial de {len(_)} contacts en cache.")
+    except Exception as e:
+        print(f"[Startup] Erreur lors du préchargement du cache des contacts: {e}")
+    try:
+        await asyncio.to_thread(migrate_contacts_storage_schema)
+    except Exception as e:
+        print(f"[Startup] Erreur lors de la migration du fichier de contacts: {e}")
+    if contacts_journal.entry_count or CONTACTS_JOURNAL_COMPACTING_FILE.exists():
+        print(
+            f"[Startup] {contacts_journal.entry_count} mutations rejouées depuis le journal, compaction planifiée."
+        )
+        asyncio.create_task(compact_contacts_journal())
+    asyncio.create_task(run_scheduler())
+    print("Scheduler démarré.")
+    await adb_devices.start()
+    try:
+        await asyncio.to_thread(call_history.seal_past_days)
+    except Exception as e:
+        print(f"[Startup] Erreur lors du scellement de l'historique des appels: {e}")
+    campaign_manager.load()
+    campaign_manager.resume_all()
+    # Lancer un premier backup au démarrage si souhaité
+    # perform_backup_contacts()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await campaign_manager.stop_all()
+    await adb_devices.stop()
+    await adb_shell_pool.close_all()
+
+
+# --- Fonctions ADB ---
+
+# Durée pendant laquelle le résultat d'une sonde ADB est réutilisé tel quel
+ADB_PROBE_CACHE_TTL_SECONDS = float(os.getenv("ADB_PROBE_CACHE_TTL_MS", "100")) / 1000
+
+
+class AdbProbeCoalescer:
+    """
+    Regroupe les sondes ADB identiques lancées en même temps : une seule
+    exécution est en vol par clé et son résultat est partagé par tous les
+    appelants, puis réutilisé pendant ttl_seconds.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._inflight: Dict[Tuple[str, ...], asyncio.Task] = {}
+        self._results: Dict[Tuple[str, ...], Tuple[float, Any]] = {}
+
+    async def run(
+        self, key: Tuple[str, ...], factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        cached = self._results.get(key)
+        if cached is not None and time.monotonic() - cached[0] <= self.ttl_seconds:
+            return cached[1]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._execute(key, factory))
+            self._inflight[key] = task
+        # shield : l'annulation d'un appelant n'interrompt pas la sonde partagée
+        return await asyncio.shield(task)
+
+    async def _execute(
+        self, key: Tuple[str, ...], factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        try:
+            result = await factory()
+            self._results[key] = (time.monotonic(), result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+
+adb_probe_coalescer = AdbProbeCoalescer(ADB_PROBE_CACHE_TTL_SECONDS)
+
+
+# Délai maximal d'une commande passée dans la session shell persistante
+ADB_SHELL_COMMAND_TIMEOUT_SECONDS = float(
+    os.getenv("ADB_SHELL_COMMAND_TIMEOUT_SECONDS", "10")
+)
+# Transport vers les appareils : "server" parle directement au serveur adb
+# (protocole smart-socket, TCP 5037), "binary" lance l'exécutable adb.
+ADB_TRANSPORT = os.getenv("ADB_TRANSPORT", "server").lower()
+ADB_SERVER_HOST = os.getenv("ADB_SERVER_HOST", "127.0.0.1")
+ADB_SERVER_PORT = int(os.getenv("ADB_SERVER_PORT", "5037"))
+
+
+class AdbProtocolError(Exception):
+    """Réponse FAIL (ou inattendue) du serveur adb."""
+
+
+class AdbCommandLostError(ConnectionResetError):
+    """
+    Session shell perdue après l'envoi d'une commande : elle a pu être
+    exécutée sur l'appareil, elle ne doit donc pas être renvoyée.
+    """
+
+
+class AdbServerClient:
+    """
+    Client asyncio du protocole smart-socket du serveur adb : chaque requête
+    est préfixée de sa longueur en 4 chiffres hexadécimaux et le serveur
+    répond OKAY ou FAIL suivi d'un message.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        return await asyncio.open_connection(
+            self.host,
+            self.port,
+            limit=2**20,  # les sorties de dumpsys peuvent avoir de très longues lignes
+        )
+
+    @staticmethod
+    async def _read_length_prefixed(reader: asyncio.StreamReader) -> bytes:
+        length = int(await reader.readexactly(4), 16)
+        return await reader.readexactly(length)
+
+    async def _request(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        payload: str,
+    ) -> None:
+        data = payload.encode("utf-8")
+        writer.write(b"%04x" % len(data) + data)
+        await writer.drain()
+        status = await reader.readexactly(4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            message = await self._read_length_prefixed(reader)
+            raise AdbProtocolError(message.decode("utf-8", errors="replace"))
+        raise AdbProtocolError(f"Réponse inattendue du serveur adb: {status!r}")
+
+    async def devices(self) -> List[Tuple[str, str]]:
+        """Équivalent de 'adb devices' : liste de (numéro de série, état)."""
+        reader, writer = await self._open()
+        try:
+            await self._request(reader, writer, "host:devices")
+            listing = await self._read_length_prefixed(reader)
+        finally:
+            writer.close()
+        devices = []
+        for line in listing.decode("utf-8", errors="replace").splitlines():
+            parts = line.strip().split("\t")
+            if len(parts) == 2:
+                devices.append((parts[0], parts[1]))
+        return devices
+
+    async def open_shell(
+        self, serial: Optional[str] = None
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """
+        Ouvre un shell interactif sans PTY sur l'appareil ; la connexion est
+        ensuite un flux brut stdin/stdout réutilisable pour plusieurs commandes.
+        """
+        return await self.open_service(serial, "shell,raw:")
+
+    async def open_service(
+        self, serial: Optional[str], service: str
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Sélectionne l'appareil puis ouvre un service (ex: 'shell,raw:logcat')."""
+        reader, writer = await self._open()
+        try:
+            transport = f"host:transport:{serial}" if serial else "host:transport-any"
+            await self._request(reader, writer, transport)
+            await self._request(reader, writer, service)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+
+adb_server_client = AdbServerClient(ADB_SERVER_HOST, ADB_SERVER_PORT)
+
+
+class AdbShellSession:
+    """
+    Session 'adb shell' persistante vers un appareil. Les commandes sont
+    écrites une par une sur l'entrée standard du shell et leur sortie est
+    délimitée par une sentinelle portant le code de retour, ce qui évite de
+    lancer un client adb (et un nouveau shell) pour chaque commande.
+    """
+
+    def __init__(self, serial: Optional[str] = None):
+        self.serial = serial
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._error = b""
+        self._lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        if self._reader is None or self._reader.at_eof():
+            return False
+        return self._process is None or self._process.returncode is None
+
+    async def _connect(self) -> None:
+        self._error = b""
+        if ADB_TRANSPORT == "server":
+            try:
+                self._reader, self._writer = await adb_server_client.open_shell(
+                    self.serial
+                )
+                return
+            except AdbProtocolError as e:
+                # ex: "device 'XYZ' not found", "no devices/emulators found"
+                self._error = f"error: {e}".encode("utf-8")
+                raise ConnectionResetError(str(e))
+            except OSError as e:
+                # Serveur non démarré : le client adb le lance lui-même
+                print(
+                    f"[AdbShellSession] Serveur adb injoignable ({e}), repli sur l'exécutable adb."
+                )
+        command = ["adb"] + (["-s", self.serial] if self.serial else []) + ["shell"]
+        self._process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=2**20,  # les sorties de dumpsys peuvent avoir de très longues lignes
+        )
+        self._reader, self._writer = self._process.stdout, self._process.stdin
+
+    async def _disconnect(self, kill: bool = False) -> bytes:
+        """
+        Ferme la session et renvoie le message d'erreur du transport. kill=True
+        coupe immédiatement un shell encore occupé (délai dépassé, annulation).
+        """
+        process, self._process = self._process, None
+        writer, self._writer, self._reader = self._writer, None, None
+        error, self._error = self._error, b""
+        if process is None:
+            if writer is not None:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+            return error
+        try:
+            if kill:
+                raise asyncio.TimeoutError
+            # Fermer l'entrée standard suffit à terminer le shell distant
+            process.stdin.close()
+            stderr = await asyncio.wait_for(process.stderr.read(), timeout=2)
+            await asyncio.wait_for(process.wait(), timeout=2)
+        except (asyncio.TimeoutError, ConnectionResetError, BrokenPipeError):
+            stderr = b""
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        return stderr or b""
+
+    async def _execute(self, command: str) -> Tuple[int, bytes]:
+        sentinel = f"__ADB_END_{uuid.uuid4().hex}__"
+        if self._writer.is_closing():
+            raise ConnectionResetError("Session adb shell fermée")  # Rien n'a été envoyé
+        self._writer.write(f"{command} 2>&1; echo {sentinel}$?\n".encode("utf-8"))
+
+        output = bytearray()
+        marker = sentinel.encode("ascii")
+        try:
+            await self._writer.drain()
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    raise AdbCommandLostError("Session adb shell fermée pendant la commande")
+                position = line.find(marker)
+                if position == -1:
+                    output += line
+                    continue
+                # La sortie peut ne pas finir par un saut de ligne : la sentinelle est alors collée
+                output += line[:position]
+                returncode = int(line[position + len(marker):].strip() or 0)
+                return returncode, bytes(output)
+        except (ConnectionResetError, BrokenPipeError) as e:
+            if isinstance(e, AdbCommandLostError):
+                raise
+            raise AdbCommandLostError(str(e) or "Session adb shell fermée") from e
+
+    async def run(
+        self, command: str, timeout_seconds: float = ADB_SHELL_COMMAND_TIMEOUT_SECONDS
+    ) -> Tuple[int, bytes, bytes]:
+        """
+        Exécute une commande shell sur l'appareil. Renvoie (returncode, stdout,
+        stderr) comme un processus adb ; stderr est fusionné dans stdout et
+        recopié dans stderr en cas d'échec pour les messages d'erreur.
+        Reconnecte automatiquement si l'appareil a décroché avant l'envoi ;
+        une commande perdue en cours d'exécution n'est jamais renvoyée (un
+        'am start ... CALL' composerait le numéro deux fois).
+        """
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if not self.connected:
+                        await asyncio.wait_for(self._connect(), timeout=timeout_seconds)
+                    returncode, output = await asyncio.wait_for(
+                        self._execute(command), timeout=timeout_seconds
+                    )
+                    return returncode, output, output if returncode else b""
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    # Sortie désynchronisée : repartir d'une session neuve au prochain appel
+                    await self._disconnect(kill=True)
+                    raise
+                except (ConnectionResetError, BrokenPipeError) as e:
+                    stderr = await self._disconnect()
+                    print(
+                        f"[AdbShellSession] Session perdue ({self.serial or 'appareil par défaut'}): "
+                        f"{stderr.decode('utf-8', errors='replace').strip() or e}"
+                    )
+                    if attempt == 1 or isinstance(e, AdbCommandLostError):
+                        return 1, b"", stderr or str(e).encode("utf-8")
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect()
+
+
+class AdbShellPool:
+    """Sessions shell persistantes, une par appareil (numéro de série)."""
+
+    def __init__(self):
+        self._sessions: Dict[Optional[str], AdbShellSession] = {}
+
+    def session(self, serial: Optional[str] = None) -> AdbShellSession:
+        session = self._sessions.get(serial)
+        if session is None:
+            session = AdbShellSession(serial)
+            self._sessions[serial] = session
+        return session
+
+    async def close_all(self) -> None:
+        for session in list(self._sessions.values()):
+            await session.close()
+        self._sessions.clear()
+
+
+adb_shell_pool = AdbShellPool()
+
+
+async def run_adb_shell(
+    shell_parts: List[str],
+    serial: Optional[str] = None,
+    timeout_seconds: float = ADB_SHELL_COMMAND_TIMEOUT_SECONDS,
+) -> Tuple[int, bytes, bytes]:
+    """Exécute 'adb shell <shell_parts>' dans la session persistante de l'appareil."""
+    command = " ".join(shlex.quote(part) for part in shell_parts)
+    return await adb_shell_pool.session(serial).run(command, timeout_seconds)
+
+
+async def run_adb_process(
+    command_parts: List[str],
+    timeout_seconds: float = ADB_SHELL_COMMAND_TIMEOUT_SECONDS,
+) -> Tuple[int, bytes, bytes]:
+    """
+    Lance l'exécutable adb sans bloquer la boucle d'événements. Le processus
+    est tué si le délai expire ou si l'appelant est annulé.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "adb",
+        *command_parts,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(), timeout=timeout_seconds
+        )
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    return process.returncode, stdout, stderr
+
+
+async def run_adb_probe(
+    command_parts: List[str],
+    timeout_seconds: float = ADB_SHELL_COMMAND_TIMEOUT_SECONDS,
+    serial: Optional[str] = None,
+) -> Tuple[int, bytes, bytes]:
+    """
+    Exécute une commande ADB en lecture seule (dumpsys, devices...) via le
+    regroupement des sondes. Renvoie (returncode, stdout, stderr).
+    """
+
+    async def execute() -> Tuple[int, bytes, bytes]:
+        if command_parts[0] == "shell":
+            return await run_adb_shell(
+                command_parts[1:], serial=serial, timeout_seconds=timeout_seconds
+            )
+        if command_parts == ["devices"] and ADB_TRANSPORT == "server":
+            try:
+                devices = await asyncio.wait_for(
+                    adb_server_client.devices(), timeout=timeout_seconds
+                )
+            except AdbProtocolError as e:
+                return 1, b"", str(e).encode("utf-8")
+            except OSError as e:
+                print(f"[API] Serveur adb injoignable ({e}), repli sur l'exécutable adb.")
+            else:
+                # Même format que la sortie de 'adb devices'
+                listing = "List of devices attached\n" + "".join(
+                    f"{serial}\t{state}\n" for serial, state in devices
+                )
+                return 0, listing.encode("utf-8"), b""
+        serial_parts = ["-s", serial] if serial else []
+        return await run_adb_process(serial_parts + command_parts, timeout_seconds)
+
+    return await adb_probe_coalescer.run((serial or "",) + tuple(command_parts), execute)
+
+
+async def run_adb_command(
+    command_parts: list[str],
+    timeout_seconds: float = 10,
+    serial: Optional[str] = None,
+) -> str:
+    """
+    Exécute une commande ADB et renvoie sa sortie standard. Les commandes
+    'shell' passent par la session persistante de l'appareil ; toute erreur
+    (ADB absent, délai dépassé, code de retour non nul) lève une HTTPException.
+    """
+    try:
+        serial_parts = ["-s", serial] if serial else []
+        print(
+            f"[API] Exécution de la commande ADB : adb {' '.join(serial_parts + command_parts)}"
+        )
+
+        if command_parts[0] == "shell":
+            returncode, stdout, stderr = await run_adb_shell(
+                command_parts[1:], serial=serial, timeout_seconds=timeout_seconds
+            )
+        else:
+            returncode, stdout, stderr = await run_adb_process(
+                serial_parts + command_parts, timeout_seconds
+            )
+
+        if returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, ["adb"] + command_parts, output=stdout, stderr=stderr
+            )
+
+        output = stdout.decode("utf-8", errors="replace").strip()
+        print(f"[API] Commande ADB exécutée avec succès. Output: {output}")
+        return output
+
+    except FileNotFoundError:
+        print(
+            "[API ERREUR] Commande ADB non trouvée. Assurez-vous qu'ADB est installé et dans le PATH (ou variable ADB_PATH configurée)."
+        )
+        raise HTTPException(status_code=500, detail="ADB non trouvé sur le serveur.")
+    except asyncio.TimeoutError:
+        error_message = f"Timeout lors de l'exécution de la commande ADB : {' '.join(command_parts)}"
+        print(f"[API ERREUR] {error_message}")
+        raise HTTPException(status_code=500, detail=error_message)
+    except subprocess.CalledProcessError as e:
+        # Décoder stderr en UTF-8, puis en cp1252 (messages Windows en français)
+        try:
+            stderr_str = e.stderr.decode("utf-8")
+        except UnicodeDecodeError:
+            stderr_str = e.stderr.decode("cp1252", errors="replace")
+
+        error_message = f"Erreur lors de l'exécution de la commande ADB ({' '.join(e.cmd)}, code {e.returncode}): {stderr_str.strip()}"
+        print(f"[API ERREUR] {error_message}")
+        raise HTTPException(status_code=500, detail=error_message)
+    except Exception as e:
+        error_message = f"Erreur inattendue avec ADB: {str(e)}"
+        print(f"[API ERREUR] {error_message}")
+        raise HTTPException(status_code=500, detail=error_message)
+
+
+# --- Routes API ---
+@app.post("/call", summary="Initier un appel téléphonique via ADB")
+async def make_call(call_request: CallRequest):
+    phone_number = call_request.phone_number
+    contact_id = call_request.contact_id  # Récupérer l'ID du contact
+    if not contact_id:
+        # Attribution de l'appel sortant via l'index des numéros (si non ambiguë)
+        matching_ids = contact_store.find_by_phone(phone_number)
+        if len(matching_ids) == 1:
+            contact_id = matching_ids[0]
+
+    adb_device = await adb_devices.resolve(call_request.device, call_request.sim)
+
+    print(
+        f"[API] Requête pour appeler le numéro : {phone_number}"
+        + (f" pour contact ID: {contact_id}" if contact_id else "")
+        + f" ({adb_device.label})"
+    )
+    try:
+        cleaned_phone_number = phone_number.replace(" ", "")
+        print(f"[API DEBUG] Numéro nettoyé AVANT appel ADB: '{cleaned_phone_number}'")
+        command = [
+            "am",
+            "start",
+            "-a",
+            "android.intent.action.CALL",
+            "-d",
+            f"tel:{cleaned_phone_number}",
+        ]
+        print(f"[API] Exécution de la commande ADB : adb shell {' '.join(command)}")
+
+        returncode, stdout, stderr = await run_adb_shell(
+            command, serial=adb_device.serial
+        )
+
+        current_time_utc_aware = datetime.now(timezone.utc)
+        current_time_iso_utc = current_time_utc_aware.isoformat()
+
+        if returncode == 0:
+            print(f"[API] Commande ADB pour initier l'appel exécutée avec succès.")
 
             # Si un contact_id est fourni, mettre à jour son statut d'appel
             if contact_id:
-                global ACTIVE_CALL_INFO
-                ACTIVE_CALL_INFO = {
+                adb_device.call_info = {
                     "contact_id": contact_id,
                     "start_time_iso": current_time_iso_utc,
+                    "answered": False,  # Passe à True dès que Telecom signale state=ACTIVE
+                    # Seuls les sondages lancés après la numérotation comptent pour cet appel
+                    "dialed_at": time.monotonic(),
+                    "active_seen": False,
                 }
-                print(f"[API /call] ACTIVE_CALL_INFO mis à jour: {ACTIVE_CALL_INFO}")
+                print(
+                    f"[API /call] Appel suivi mis à jour ({adb_device.label}): {adb_device.call_info}"
+                )
+                event_broadcaster.publish(
+                    {
+                        "type": "call.started",
+                        "device": adb_device.serial,
+                        "contact_id": contact_id,
+                        "phone_number": phone_number,
+                        "start_time": current_time_iso_utc,
+                    }
+                )
 
                 try:
-                    if (
-                        CONTACTS_STORAGE_FILE.exists()
-                        and CONTACTS_STORAGE_FILE.stat().st_size > 0
-                    ):
-                        df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-                        contact_index = df.index[df["id"] == contact_id].tolist()
-                        if contact_index:
-                            idx = contact_index[0]
-                            df.loc[idx, "isCurrentlyInCall"] = True
-                            df.loc[idx, "callStartTime"] = current_time_iso_utc
+                    updated_contact = patch_contact(
+                        contact_id,
+                        {
+                            "isCurrentlyInCall": True,
+                            "callStartTime": current_time_iso_utc,
                             # Réinitialiser les champs liés à la fin d'appel précédent
-                            df.loc[idx, "dureeAppel"] = None
-                            df.loc[idx, "dateAppel"] = None
-                            df.loc[idx, "heureAppel"] = None
-                            df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
-                            get_cached_contacts.cache_clear()
-                            print(
-                                f"[API /call] Contact {contact_id} marqué comme 'isCurrentlyInCall=True' et callStartTime enregistré."
-                            )
-                        else:
-                            print(
-                                f"[API /call] Contact ID {contact_id} non trouvé pour mise à jour isCurrentlyInCall."
-                            )
+                            "dureeAppel": None,
+                            "dateAppel": None,
+                            "heureAppel": None,
+                        },
+                    )
+                    if updated_contact:
+                        print(
+                            f"[API /call] Contact {contact_id} marqué comme 'isCurrentlyInCall=True' et callStartTime enregistré."
+                        )
                     else:
                         print(
-                            f"[API /call] Fichier de contacts non trouvé ou vide, impossible de mettre à jour isCurrentlyInCall pour {contact_id}."
+                            f"[API /call] Contact ID {contact_id} non trouvé pour mise à jour isCurrentlyInCall."
                         )
                 except Exception as e_update:
                     print(
@@ -636,7 +2819,7 @@ async def make_call(call_request: CallRequest):
                         decoded_stdout = stdout.decode("utf-8", errors="replace")
 
             print(f"[API] Erreur lors de l'exécution de la commande ADB.")
-            print(f"[API] Code de retour: {process.returncode}")
+            print(f"[API] Code de retour: {returncode}")
             print(f"[API] Stderr: {error_message}")
             print(f"[API] Stdout: {decoded_stdout if decoded_stdout else 'N/A'}")
             # Il est important de ne pas retourner current_time_iso_utc ici car l'appel a échoué
@@ -659,18 +2842,13 @@ async def make_call(call_request: CallRequest):
 async def get_adb_device_status():
     print("[API] Requête pour vérifier le statut de l'appareil ADB")
     try:
-        command = ["adb", "devices"]
-        print(f"[API] Exécution de la commande ADB : {' '.join(command)}")
-        process = await asyncio.create_subprocess_exec(
-            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
-        stdout_bytes, stderr_bytes = await process.communicate()
+        returncode, stdout_bytes, stderr_bytes = await run_adb_probe(["devices"])
 
         # Décodage avec gestion d'erreurs potentielles
         stdout = stdout_bytes.decode("utf-8", errors="replace") if stdout_bytes else ""
         stderr = stderr_bytes.decode("utf-8", errors="replace") if stderr_bytes else ""
 
-        if process.returncode == 0:
+        if returncode == 0:
             # print(f"[API] Commande ADB 'devices' exécutée. Output:\n{stdout}") # Commenté pour réduire la verbosité
 
             lines = stdout.splitlines()  # Utiliser splitlines() pour la robustesse
@@ -709,7 +2887,7 @@ async def get_adb_device_status():
                 else "Erreur ADB inconnue lors de la récupération du statut (returncode non nul)"
             )
             print(
-                f"[API] Erreur lors de la commande ADB 'devices'. Return code: {process.returncode}. Error: {error_message}"
+                f"[API] Erreur lors de la commande ADB 'devices'. Return code: {returncode}. Error: {error_message}"
             )
             raise HTTPException(
                 status_code=500, detail=f"Erreur ADB (devices): {error_message}"
@@ -738,22 +2916,21 @@ async def get_adb_device_status():
 
 
 @app.get("/adb/battery", summary="Récupérer le niveau de batterie de l'appareil ADB")
-async def get_adb_battery_status():
+async def get_adb_battery_status(
+    device: Optional[str] = Query(None, description="Numéro de série ou alias de l'appareil"),
+):
     print("[API] Requête pour récupérer le niveau de batterie ADB")
+    serial = (await adb_devices.resolve(device)).serial
     try:
         # Commande pour obtenir le niveau de batterie
         # Note: 'adb shell dumpsys battery' donne beaucoup d'infos, 'grep level' extrait la ligne avec le niveau
         # Pour éviter d'utiliser grep directement dans la commande (qui pourrait ne pas être dispo sur tous les OS de la même manière via Python)
         # nous allons récupérer tout le 'dumpsys battery' et parser le niveau en Python.
-        command = ["adb", "shell", "dumpsys", "battery"]
-        print(f"[API] Exécution de la commande ADB : {' '.join(command)}")
-
-        process = await asyncio.create_subprocess_exec(
-            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        returncode, stdout, stderr = await run_adb_probe(
+            ["shell", "dumpsys", "battery"], serial=serial
         )
-        stdout, stderr = await process.communicate()
 
-        if process.returncode == 0:
+        if returncode == 0:
             output = stdout.decode()
             # print(f"[API] Commande ADB 'dumpsys battery' exécutée. Output:\n{output[:300]}...") # Commenté pour réduire la verbosité
 
@@ -779,15 +2956,9 @@ async def get_adb_battery_status():
             else:
                 # Tenter de voir si un appareil est au moins connecté si 'level' n'est pas trouvé
                 # Cela pourrait arriver si l'appareil est en mode spécial ou si la sortie de dumpsys change.
-                status_command = ["adb", "devices"]
-                status_process = await asyncio.create_subprocess_exec(
-                    *status_command,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                status_stdout, _ = await status_process.communicate()
+                status_returncode, status_stdout, _ = await run_adb_probe(["devices"])
                 if (
-                    status_process.returncode == 0
+                    status_returncode == 0
                     and "device" in status_stdout.decode()
                 ):  # Vérifie si au moins un appareil est listé comme 'device'
                     print(
@@ -844,7 +3015,7 @@ async def get_adb_battery_status():
 @app.get("/contacts/export", summary="Exporter les contacts")
 async def export_contacts(format: str = "csv"):
     print(f"[API] Requête d'exportation des contacts au format : {format}")
-    if not CONTACTS_STORAGE_FILE.exists():
+    if len(contact_store) == 0:
         # Retourner une réponse vide avec le bon type de contenu si aucun contact
         if format.lower() == "csv":
             return StreamingResponse(
@@ -866,7 +3037,7 @@ async def export_contacts(format: str = "csv"):
                 detail="Format non supporté et aucun contact à exporter.",
             )
 
-    df = pd.read_parquet(CONTACTS_STORAGE_FILE)
+    df = contact_store.dataframe()
 
     if format.lower() == "csv":
         output = io.StringIO()
@@ -917,12 +3088,16 @@ async def import_contacts_file(
         f"[API] Réception du fichier d'import: {file.filename}, Type: {file.content_type}"
     )
 
-    # Lire le contenu du fichier avant de le passer à la tâche de fond
+    # Copier le fichier sur disque par blocs avant de le passer à la tâche de fond
     # car l'objet UploadFile pourrait ne plus être accessible ou son contenu consommé.
-    file_contents = await file.read()
+    IMPORT_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    spool_path = IMPORT_SPOOL_DIR / f"{uuid.uuid4().hex}{Path(file.filename or '').suffix}"
+    with open(spool_path, "wb") as f:
+        while chunk := await file.read(IMPORT_UPLOAD_CHUNK_SIZE):
+            f.write(chunk)
     await file.close()  # Fermer le fichier après lecture
 
-    background_tasks.add_task(process_imported_file, file_contents, file.content_type)
+    background_tasks.add_task(process_imported_file, spool_path, file.content_type)
 
     return {
         "message": f"Fichier {file.filename} reçu et mis en file pour traitement.",
@@ -930,10 +3105,184 @@ async def import_contacts_file(
     }
 
 
-@app.get("/contacts", summary="Lister tous les contacts")
-async def list_contacts() -> List[ContactInDB]:
-    # Retourner la liste mise en cache des contacts
-    return get_cached_contacts()
+def etag_matches(request: Request, etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match du client correspond à l'ETag courant."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def variant_etag(etag: str, *variant: Any) -> str:
+    """
+    ETag d'une représentation particulière d'une ressource : l'ETag de base
+    suffixé d'une empreinte des paramètres qui changent la réponse (requête,
+    champs, page, type de média).
+    """
+    digest = hashlib.blake2b(
+        json.dumps(variant, default=str).encode("utf-8"), digest_size=8
+    ).hexdigest()
+    return f'{etag[:-1]}-{digest}"'
+
+
+@app.get(
+    "/contacts",
+    response_model=List[ContactInDB],
+    summary="Lister tous les contacts",
+)
+async def list_contacts(
+    request: Request,
+    q: Optional[str] = Query(
+        None,
+        description="Recherche par sous-chaîne (nom, email, téléphone, statut, source, commentaire)",
+    ),
+    filter_text: Optional[str] = Query(
+        None, alias="filter", description="Alias de 'q' utilisé par le frontend"
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=10000, description="Taille de page (pagination par curseur)"
+    ),
+    after: Optional[str] = Query(
+        None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Champs à renvoyer, séparés par des virgules (id toujours inclus)"
+    ),
+):
+    after_seq = None
+    if after:
+        try:
+            after_seq = contact_store.cursor_seq(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Curseur invalide: {after}")
+        if after_seq is None:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Curseur expiré (contacts rechargés), reprendre la pagination depuis le début",
+            )
+
+    include = None
+    if fields:
+        requested_fields = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown_fields = requested_fields - set(ContactInDB.model_fields.keys())
+        if unknown_fields:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Champs inconnus: {', '.join(sorted(unknown_fields))}",
+            )
+        include = requested_fields | {"id"}
+
+    search_query = q if q is not None else filter_text
+    accept = request.headers.get("accept", "")
+    if ARROW_STREAM_MEDIA_TYPE in accept:
+        media_type = ARROW_STREAM_MEDIA_TYPE
+    elif NDJSON_MEDIA_TYPE in accept:
+        media_type = NDJSON_MEDIA_TYPE
+    else:
+        media_type = "application/json"
+
+    # Une page filtrée ne doit pas valider le cache d'une autre page ou d'un autre format
+    etag = variant_etag(
+        contact_store.etag(),
+        search_query_terms(search_query) if search_query else [],
+        sorted(include) if include else None,
+        after_seq,
+        limit,
+        media_type,
+    )
+    if etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Vary": "Accept"},
+        )
+
+    contact_ids = (
+        contact_store.search(search_query)
+        if search_query and search_query.strip()
+        else None
+    )
+    if contact_ids is None and after_seq is None and limit is None:
+        # Retourner la liste mise en cache des contacts
+        contacts, next_cursor = get_cached_contacts(), None
+    else:
+        contacts, next_cursor = contact_store.page(after_seq, limit, contact_ids)
+
+    headers = {"ETag": etag, "Vary": "Accept"}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = contact_store.cursor(next_cursor)
+    if media_type == ARROW_STREAM_MEDIA_TYPE:
+        return StreamingResponse(
+            stream_contacts_arrow(contacts, include),
+            media_type=ARROW_STREAM_MEDIA_TYPE,
+            headers=headers,
+        )
+    if media_type == NDJSON_MEDIA_TYPE:
+        return StreamingResponse(
+            stream_contacts_ndjson(contacts, include),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+    return Response(
+        content=CONTACT_LIST_ADAPTER.dump_json(
+            contacts, include={"__all__": include} if include else None
+        ),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@app.get("/contacts/changes", summary="Changements de contacts depuis une version")
+async def get_contact_changes(
+    since: int = Query(..., ge=0, description="Version connue du client"),
+    epoch: Optional[str] = Query(
+        None, description="Epoch renvoyée avec la version (détecte un redémarrage)"
+    ),
+):
+    """
+    Synchronisation différentielle : renvoie uniquement les contacts modifiés et
+    les ids supprimés depuis `since`, ou resync_required si la version est trop ancienne.
+    """
+    current_version = contact_store.version
+    changes = None
+    if epoch is None or epoch == contact_store.epoch:
+        changes = contact_store.changes_since(since)
+    if changes is None:
+        return {
+            "epoch": contact_store.epoch,
+            "version": current_version,
+            "resync_required": True,
+            "upserted": [],
+            "deleted": [],
+        }
+    upserted, deleted = changes
+    return {
+        "epoch": contact_store.epoch,
+        "version": current_version,
+        "resync_required": False,
+        "upserted": [contact.model_dump() for contact in upserted],
+        "deleted": deleted,
+    }
+
+
+@app.get("/contacts/stats", summary="Nombre de contacts par statut et par source")
+async def get_contact_stats(request: Request):
+    """Compteurs pour les graphiques de progression, sans transférer les contacts."""
+    etag = contact_store.etag()
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(
+        content=json.dumps(
+            {
+                "epoch": contact_store.epoch,
+                "version": contact_store.version,
+                **contact_store.stats(),
+            },
+            ensure_ascii=False,
+        ),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
 
 
 @app.post("/contacts", response_model=ContactInDB, summary="Créer un nouveau contact")
@@ -944,38 +3293,22 @@ async def create_contact(contact_data: ContactBase) -> ContactInDB:
     new_id = str(uuid.uuid4())
     new_contact = ContactInDB(id=new_id, **contact_data.model_dump())
 
-    new_contact_df = pd.DataFrame([new_contact.model_dump()])
-
     try:
-        if CONTACTS_STORAGE_FILE.exists() and CONTACTS_STORAGE_FILE.stat().st_size > 0:
-            existing_df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-            # Vérification des doublons (email ou nom/prénom)
-            if (
-                new_contact.email
-                and not existing_df[existing_df["email"] == new_contact.email].empty
-            ):
-                raise HTTPException(
-                    status_code=409,
-                    detail=f"Un contact avec l'email {new_contact.email} existe déjà.",
-                )
-            if not existing_df[
-                (existing_df["firstName"] == new_contact.firstName)
-                & (existing_df["lastName"] == new_contact.lastName)
-            ].empty:
-                raise HTTPException(
-                    status_code=409,
-                    detail=f"Un contact nommé {new_contact.firstName} {new_contact.lastName} existe déjà.",
-                )
-
-            combined_df = pd.concat([existing_df, new_contact_df], ignore_index=True)
-        else:
-            combined_df = new_contact_df
+        # Vérification des doublons (email ou nom/prénom) via les index secondaires
+        if new_contact.email and contact_store.find_by_email(new_contact.email):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Un contact avec l'email {new_contact.email} existe déjà.",
+            )
+        if contact_store.find_by_name(new_contact.firstName, new_contact.lastName):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Un contact nommé {new_contact.firstName} {new_contact.lastName} existe déjà.",
+            )
 
-        combined_df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
+        contact_store.create(new_contact)
         print(f"[API POST /contacts] Contact créé avec ID: {new_id}")
-        # Invalidation du cache après création d'un contact
-        get_cached_contacts.cache_clear()
-        return new_contact
+        return contact_store.get_model(new_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -994,23 +3327,14 @@ async def create_contact(contact_data: ContactBase) -> ContactInDB:
 async def update_contact(
     contact_id: str, contact_update_data: ContactUpdate
 ) -> ContactInDB:
-    if not CONTACTS_STORAGE_FILE.exists() or CONTACTS_STORAGE_FILE.stat().st_size == 0:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Aucun contact à mettre à jour. Le fichier de stockage est vide ou n'existe pas.",
-        )
-
     try:
-        df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-        contact_index = df.index[df["id"] == contact_id].tolist()
+        existing_contact = find_contact_by_id(contact_id)
 
-        if not contact_index:
+        if existing_contact is None:
             raise HTTPException(
                 status_code=404, detail=f"Contact avec ID {contact_id} non trouvé."
             )
 
-        idx = contact_index[0]
-
         # Mettre à jour uniquement les champs fournis dans update_data_dict
         update_data_dict = contact_update_data.model_dump(exclude_unset=True)
 
@@ -1037,25 +3361,21 @@ async def update_contact(
             # On pourrait retourner le contact existant sans modification ou une erreur 304 Not Modified
             # Pour l'instant, nous allons récupérer et retourner le contact existant.
             # Ou lever une HTTPException si l'on considère que c'est une requête invalide.
-            existing_contact_data = df.loc[idx].to_dict()
-            for key, value in existing_contact_data.items():
-                if pd.isna(value):
-                    existing_contact_data[key] = None
-            return ContactInDB(**existing_contact_data)
+            return ContactInDB(**existing_contact)
 
         # Logique de vérification des doublons d'email (si l'email est en cours de modification)
         if (
             "email" in update_data_dict and update_data_dict["email"] is not None
         ):  # S'assurer que l'email est fourni et non None
             new_email = update_data_dict["email"]
-            current_email = df.loc[idx, "email"]
-            if new_email != current_email and not df[df["email"] == new_email].empty:
+            if contact_store.find_by_email(new_email) - {contact_id}:
                 raise HTTPException(
                     status_code=409,
                     detail=f"Un autre contact avec l'email {new_email} existe déjà.",
                 )
 
-        # Appliquer les mises à jour au DataFrame
+        # Ne journaliser que les champs effectivement modifiés
+        changed_fields = {}
         for field, value in update_data_dict.items():
             # Autoriser les valeurs NULL pour tous les champs liés aux dates et heures
             if (
@@ -1066,21 +3386,12 @@ async def update_contact(
                 or field.startswith("date")
                 or field.startswith("heure")
             ):
-                df.loc[idx, field] = value
+                changed_fields[field] = value
             # Pour les autres champs que phoneNumber, si la valeur est None et qu'ils ne peuvent pas être None,
             # on pourrait vouloir les ignorer ou les convertir en une chaîne vide (déjà géré par Pydantic ou DataFrame?)
             # Actuellement, on permet de mettre à jour avec None si le modèle Pydantic le permet.
 
-        df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
-
-        # Invalidation du cache après mise à jour d'un contact
-        get_cached_contacts.cache_clear()
-
-        updated_contact_data = df.loc[idx].to_dict()
-        # Assurer que les champs None sont bien None et pas NaN pour Pydantic
-        for key, value in updated_contact_data.items():
-            if pd.isna(value):
-                updated_contact_data[key] = None
+        updated_contact_data = patch_contact(contact_id, changed_fields)
 
         print(
             f"[API PUT /contacts] Contact avec ID {contact_id} mis à jour avec {update_data_dict}."
@@ -1104,12 +3415,22 @@ async def clear_all_contacts():
     """
     Supprime toutes les données de contacts (le fichier contacts_storage.parquet).
     """
+
+    def remove_storage_files() -> Tuple[bool, bool]:
+        # Verrou tenu pendant toute réécriture du Parquet (compaction) : attendu hors de la boucle
+        with CONTACTS_STORAGE_LOCK:
+            had_journal = contacts_journal.entry_count > 0
+            contacts_journal.reset()
+            storage_exists = os.path.exists(CONTACTS_STORAGE_FILE)
+            if storage_exists:
+                os.remove(CONTACTS_STORAGE_FILE)
+        return had_journal, storage_exists
+
     try:
-        if os.path.exists(CONTACTS_STORAGE_FILE):
-            os.remove(CONTACTS_STORAGE_FILE)
-            print(f"[API] Fichier {CONTACTS_STORAGE_FILE} supprimé.")
-            # Invalidation du cache après suppression de tous les contacts
-            get_cached_contacts.cache_clear()
+        had_journal, storage_exists = await asyncio.to_thread(remove_storage_files)
+        contact_store.clear()
+        if storage_exists or had_journal:
+            print(f"[API] Fichier {CONTACTS_STORAGE_FILE} et journal supprimés.")
             return Response(status_code=status.HTTP_204_NO_CONTENT)
         else:
             print(
@@ -1128,28 +3449,12 @@ async def clear_all_contacts():
 
 @app.delete("/contacts/{contact_id}", status_code=204, summary="Supprimer un contact")
 async def delete_contact(contact_id: str):
-    if not CONTACTS_STORAGE_FILE.exists() or CONTACTS_STORAGE_FILE.stat().st_size == 0:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Aucun contact à supprimer. Le fichier de stockage est vide ou n'existe pas.",
-        )
-
     try:
-        df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-
-        original_count = len(df)
-        df = df[df["id"] != contact_id]
-
-        if len(df) == original_count:
+        if not contact_store.delete(contact_id):
             raise HTTPException(
                 status_code=404, detail=f"Contact avec ID {contact_id} non trouvé."
             )
 
-        if df.empty:
-            df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
-        else:
-            df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
-
         print(f"[API DELETE /contacts] Contact avec ID {contact_id} supprimé.")
         return
 
@@ -1165,6 +3470,66 @@ async def delete_contact(contact_id: str):
         )
 
 
+def format_sse_event(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@app.get("/events", summary="Flux SSE des mutations de contacts et états d'appel")
+async def stream_events(request: Request):
+    queue = event_broadcaster.subscribe()
+
+    async def event_stream():
+        try:
+            yield format_sse_event(
+                {
+                    "type": "hello",
+                    "version": contact_store.version,
+                    "epoch": contact_store.epoch,
+                }
+            )
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=EVENT_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse_event(event)
+        finally:
+            event_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket):
+    """Même flux que /events, via WebSocket."""
+    await websocket.accept()
+    queue = event_broadcaster.subscribe()
+    try:
+        await websocket.send_json(
+            {
+                "type": "hello",
+                "version": contact_store.version,
+                "epoch": contact_store.epoch,
+            }
+        )
+        while True:
+            event = await queue.get()
+            await websocket.send_text(json.dumps(event, default=str))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"[API /ws/events] Connexion WebSocket fermée: {e}")
+    finally:
+        event_broadcaster.unsubscribe(queue)
+
+
 @app.get("/")
 async def read_root():
     return {"message": "API for ADB Interaction"}
@@ -1175,6 +3540,10 @@ async def end_call(end_call_request: EndCallRequest):
     contact_id = end_call_request.contact_id
     call_start_time_str_from_client = end_call_request.call_start_time
     measured_duration_seconds_from_client = end_call_request.measured_duration_seconds
+    if end_call_request.device or end_call_request.sim:
+        adb_device = await adb_devices.resolve(end_call_request.device, end_call_request.sim)
+    else:
+        adb_device = adb_devices.find_by_contact(contact_id) or adb_devices.default()
 
     print(
         f"[API /call/end] Requête pour terminer l'appel pour le contact ID: {contact_id}"
@@ -1187,13 +3556,10 @@ async def end_call(end_call_request: EndCallRequest):
     )
 
     try:
-        command = ["adb", "shell", "input", "keyevent", "KEYCODE_ENDCALL"]
-        print(f"[API /call/end] Exécution de la commande ADB : {' '.join(command)}")
+        command = ["input", "keyevent", "KEYCODE_ENDCALL"]
+        print(f"[API /call/end] Exécution de la commande ADB : adb shell {' '.join(command)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
-        # stdout, stderr = await process.communicate()
+        await run_adb_shell(command, serial=adb_device.serial)
 
         call_end_time_utc_aware = datetime.now(
             timezone.utc
@@ -1275,327 +3641,762 @@ async def end_call(end_call_request: EndCallRequest):
             f"[API /call/end] Durée finale retenue et formatée: {formatted_duration} ({final_duration_seconds:.2f}s)"
         )
 
-        # Mettre à jour les données du contact (logique inchangée, utilise formatted_duration)
-        # ... (code de mise à jour du contact comme avant) ...
-        updated_contact_object_for_response = None
-        if contact_id:
-            try:
-                if not CONTACTS_STORAGE_FILE.exists():
-                    print(
-                        f"[API /call/end] Fichier de stockage {CONTACTS_STORAGE_FILE} non trouvé. Impossible de mettre à jour le contact."
-                    )
-                else:
-                    df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-                    if contact_id not in df["id"].values:
-                        print(
-                            f"[API /call/end] Contact avec ID {contact_id} non trouvé. Impossible de mettre à jour la durée."
-                        )
-                    else:
-                        contact_index = df[df["id"] == contact_id].index[0]
-                        df.at[contact_index, "dureeAppel"] = formatted_duration
-                        df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
-                        print(
-                            f"[API /call/end] Durée d'appel de {formatted_duration} enregistrée pour le contact ID {contact_id}"
-                        )
+        # Mettre à jour les données du contact (logique inchangée, utilise formatted_duration)
+        # ... (code de mise à jour du contact comme avant) ...
+        updated_contact_object_for_response = None
+        if contact_id:
+            tracked_call = adb_device.call_info
+            if tracked_call.get("contact_id") == contact_id:
+                # Fin d'appel traitée ici : le moniteur ne doit pas la détecter une seconde fois
+                adb_device.reset_call_info()
+                outcome = "answered" if tracked_call.get("answered") else "no_answer"
+            else:
+                outcome = "unknown"
+            try:
+                updated_contact_row = record_call_end(
+                    contact_id,
+                    adb_device.serial,
+                    call_start_time_str_from_client,
+                    call_end_time_utc_aware,
+                    final_duration_seconds,
+                    formatted_duration,
+                    outcome,
+                    "call_end",
+                )
+                if updated_contact_row is None:
+                    print(
+                        f"[API /call/end] Contact avec ID {contact_id} non trouvé. Impossible de mettre à jour la durée."
+                    )
+                else:
+                    print(
+                        f"[API /call/end] Durée d'appel de {formatted_duration} enregistrée pour le contact ID {contact_id}"
+                    )
+                    updated_contact_object_for_response = updated_contact_row
+
+            except Exception as update_error:
+                print(
+                    f"[API /call/end] Erreur lors de la mise à jour du contact: {update_error}"
+                )
+
+        response_data = {
+            "message": "Appel terminé et durée enregistrée",
+            "contact_id": contact_id,
+            "call_start_time": call_start_time_str_from_client,  # On renvoie ce qu'on a reçu
+            "call_end_time": call_end_time_utc_aware.isoformat(),
+            "duration": formatted_duration,
+            "contact": updated_contact_object_for_response,
+        }
+        event_broadcaster.publish(
+            {
+                "type": "call.ended",
+                "device": adb_device.serial,
+                "contact_id": contact_id,
+                "duration": formatted_duration,
+                "reason": "call_end",
+            }
+        )
+        print(
+            f"[API /call/end] Données de réponse prêtes à être envoyées : {response_data}"
+        )
+        return response_data
+
+    except FileNotFoundError:
+        print(
+            "[API] Erreur: Commande ADB non trouvée. Assurez-vous qu'ADB est installé et dans le PATH."
+        )
+        raise HTTPException(
+            status_code=500,
+            detail="Commande ADB non trouvée. Assurez-vous qu'ADB est installé et dans le PATH.",
+        )
+    except Exception as e:
+        print(f"[API] Erreur inattendue lors de la fin de l'appel: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- Surveillance de l'état d'appel (tâche de fond) ---
+# Cadence de sondage du téléphone par le moniteur ; 0 désactive le moniteur
+# (l'endpoint /call/status sonde alors l'appareil à chaque requête).
+CALL_STATE_POLL_INTERVAL_SECONDS = float(
+    os.getenv("CALL_STATE_POLL_INTERVAL_SECONDS", "1.0")
+)
+# Durée pendant laquelle le contact mis à jour après un raccrochage manuel
+# reste exposé dans /call/status pour les clients qui interrogent en boucle.
+CALL_HANGUP_REPORT_SECONDS = 10.0
+# Après la numérotation, un état "aucun appel" n'est pris pour un raccrochage
+# qu'une fois l'appel vu actif, ou passé ce délai (le téléphone met un instant
+# à passer en communication).
+CALL_DIAL_GRACE_SECONDS = float(os.getenv("CALL_DIAL_GRACE_SECONDS", "5"))
+
+
+async def probe_call_state(serial: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Interroge l'appareil via ADB (telephony.registry et telecom en parallèle)
+    et renvoie l'état d'appel fusionné des deux sources.
+    """
+    detection_start_time = time.perf_counter()
+    # Horloge monotone du début du sondage : un résultat antérieur à la
+    # numérotation ne doit pas être interprété comme la fin de l'appel suivi
+    probe_started_at = time.monotonic()
+    call_state_results = {
+        "telephony_registry": {"active": False, "value": 0, "raw": "Non trouvé"},
+        "telecom_dump": {"active": False, "calls": [], "raw": "", "phone_number": None},
+    }
+
+    async def run_telephony_registry_poller():
+        try:
+            returncode, stdout, stderr = await run_adb_probe(
+                ["shell", "dumpsys", "telephony.registry"], serial=serial
+            )
+
+            if returncode == 0:
+                output = stdout.decode("utf-8", errors="replace")
+                for line in output.splitlines():
+                    if "mCallState" in line:
+                        call_state_results["telephony_registry"]["raw"] = line.strip()
+                        try:
+                            call_state_parts = line.split("=")
+                            if len(call_state_parts) >= 2:
+                                value = int(call_state_parts[1].strip())
+                                call_state_results["telephony_registry"]["value"] = value
+                                call_state_results["telephony_registry"]["active"] = (value > 0)
+                                break
+                        except ValueError:
+                            print(f"[CallStateMonitor] Erreur parsing mCallState: {line}")
+                            continue
+        except Exception as e:
+            print(f"[CallStateMonitor] Erreur avec telephony.registry: {e}")
+
+    async def run_telecom_dump_poller():
+        try:
+            telecom_returncode, telecom_stdout, telecom_stderr = await run_adb_probe(
+                ["shell", "dumpsys", "telecom"], serial=serial
+            )
+
+            if telecom_returncode == 0:
+                telecom_output = telecom_stdout.decode("utf-8", errors="replace")
+                call_state_results["telecom_dump"]["raw"] = telecom_output[:200] + "..." # Tronqué pour les logs
+
+                # Analyser les appels actifs dans la sortie telecom
+                calls = []
+                for line in telecom_output.splitlines():
+                    if "Call id=" in line and ("state=DIALING" in line or "state=ACTIVE" in line or "state=CONNECTING" in line):
+                        calls.append(line.strip())
+                        phone_match = TELECOM_HANDLE_PATTERN.search(line)
+                        if phone_match and not call_state_results["telecom_dump"]["phone_number"]:
+                            call_state_results["telecom_dump"]["phone_number"] = phone_match.group(1).strip()
+
+                call_state_results["telecom_dump"]["calls"] = calls
+                call_state_results["telecom_dump"]["active"] = len(calls) > 0
+        except Exception as e:
+            print(f"[CallStateMonitor] Erreur avec telecom: {e}")
+
+    # Exécuter les pollers en parallèle
+    await asyncio.gather(run_telephony_registry_poller(), run_telecom_dump_poller())
+
+    detection_conflict = False
+    mCallState_value = 0
+    mCallState_raw_line = "Non trouvé"
+    # Combiner les résultats des deux pollers pour une détection plus fiable
+    # mCallState=0 est un indicateur fort qu'il n'y a pas d'appel
+    if call_state_results["telephony_registry"]["value"] == 0:
+        mCallState_raw_line = call_state_results["telephony_registry"]["raw"]
+        is_adb_call_active = False
+        # Si telephony.registry dit pas d'appel, mais telecom dit qu'il y a un appel
+        if call_state_results["telecom_dump"]["active"]:
+            detection_conflict = True
+            # Privilégier telephony.registry car plus fiable pour la détection de fin d'appel
+            detection_method = "Conflit résolu: TelephonyRegistry indique fin d'appel (mCallState=0)"
+        else:
+            detection_method = "TelephonyRegistry et TelecomDump confirment: pas d'appel actif"
+    elif call_state_results["telephony_registry"]["value"] > 0:
+        is_adb_call_active = True
+        detection_method = "TelephonyRegistry indique appel actif (mCallState > 0)"
+        mCallState_value = call_state_results["telephony_registry"]["value"]
+        mCallState_raw_line = call_state_results["telephony_registry"]["raw"]
+    # Si telephony.registry n'a pas de valeur mais telecom indique un appel
+    elif call_state_results["telecom_dump"]["active"]:
+        is_adb_call_active = True
+        detection_method = "TelecomDump indique appel actif"
+        mCallState_value = -1  # Valeur spéciale indiquant que mCallState n'est pas disponible
+    else:
+        # Ni telephony.registry ni telecom n'indiquent d'appel
+        is_adb_call_active = False
+        detection_method = "Aucun appel détecté par les pollers"
+
+    detected_phone_number = call_state_results["telecom_dump"]["phone_number"]
+    return {
+        "call_in_progress": is_adb_call_active,
+        "mCallState": mCallState_value,
+        "mCallState_raw": mCallState_raw_line,
+        "detection_method": detection_method,
+        "detection_conflict": detection_conflict,
+        "telephony_registry_active": call_state_results["telephony_registry"]["active"],
+        "telecom_dump_active": call_state_results["telecom_dump"]["active"],
+        "telecom_dump_calls": call_state_results["telecom_dump"]["calls"],
+        "detected_phone_number": detected_phone_number if is_adb_call_active else None,
+        "detection_time_ms": round((time.perf_counter() - detection_start_time) * 1000, 2),
+        "probe_started_at": probe_started_at,
+    }
+
+
+def call_state_is_answered(state: Dict[str, Any]) -> bool:
+    """Vrai si Telecom signale un appel décroché (state=ACTIVE)."""
+    return any("state=ACTIVE" in call for call in state.get("telecom_dump_calls") or [])
+
+
+def apply_call_state_transition(
+    state: Dict[str, Any], device: "AdbDevice"
+) -> Optional[Dict[str, Any]]:
+    """
+    Traite un nouvel état d'appel d'un appareil : diffusion des transitions et
+    détection du raccrochage manuel de l'appel qu'il suit. Renvoie le contact
+    mis à jour si un raccrochage a été enregistré.
+    """
+    is_adb_call_active = state["call_in_progress"]
+
+    # Notifier les clients abonnés uniquement lors d'une transition d'état
+    if device.last_call_state.get("call_in_progress") != is_adb_call_active:
+        device.last_call_state["call_in_progress"] = is_adb_call_active
+        event_broadcaster.publish(
+            {
+                "type": "call.state",
+                "device": device.serial,
+                "call_in_progress": is_adb_call_active,
+                "mCallState": state["mCallState"],
+                "detection_method": state["detection_method"],
+            }
+        )
+
+    # Logique de détection de raccrochage manuel pour un appel suivi
+    tracked_contact_id = device.call_info.get("contact_id")
+    if not tracked_contact_id:
+        return None
+    dialed_at = device.call_info.get("dialed_at") or 0.0
+    if state.get("probe_started_at", time.monotonic()) < dialed_at:
+        return None  # Sondage lancé avant la numérotation : ne dit rien de cet appel
+    if is_adb_call_active:
+        device.call_info["active_seen"] = True
+        if call_state_is_answered(state):
+            device.call_info["answered"] = True
+        return None
+    if (
+        not device.call_info.get("active_seen")
+        and time.monotonic() - dialed_at < CALL_DIAL_GRACE_SECONDS
+    ):
+        return None  # Appel pas encore établi côté téléphone
+
+    print(
+        f"[CallStateMonitor] Raccrochage manuel détecté pour l'appel suivi du contact ID: {tracked_contact_id}"
+    )
+    updated_contact_due_to_hangup = None
+    call_start_time_iso = device.call_info.get("start_time_iso")
+    hang_up_time_utc = datetime.now(timezone.utc)
+    dureeAppel_str = "00:00"
+    duration_seconds = None
+
+    if call_start_time_iso:
+        try:
+            call_start_time_utc = datetime.fromisoformat(
+                call_start_time_iso.replace("Z", "+00:00")
+            )
+            duration_seconds = (hang_up_time_utc - call_start_time_utc).total_seconds()
+            if duration_seconds < 0:
+                duration_seconds = 0
+            dureeAppel_str = format_duration(int(duration_seconds))
+            print(
+                f"[CallStateMonitor] Durée calculée pour {tracked_contact_id}: {dureeAppel_str}"
+            )
+        except Exception as e_dur:
+            print(
+                f"[CallStateMonitor] Erreur calcul durée pour {tracked_contact_id} (raccrochage manuel): {e_dur}"
+            )
+
+    try:
+        updated_contact_data = record_call_end(
+            tracked_contact_id,
+            device.serial,
+            call_start_time_iso,
+            hang_up_time_utc,
+            duration_seconds,
+            dureeAppel_str,
+            "answered" if device.call_info.get("answered") else "no_answer",
+            "manual_hangup",
+        )
+        if updated_contact_data:
+            print(
+                f"[CallStateMonitor] Contact {tracked_contact_id} mis à jour (raccrochage manuel)."
+            )
+            updated_contact_due_to_hangup = ContactInDB(
+                **updated_contact_data
+            ).model_dump()
+        else:
+            print(
+                f"[CallStateMonitor] Contact {tracked_contact_id} (raccrochage manuel) non trouvé dans storage."
+            )
+    except Exception as e_storage_hangup:
+        print(
+            f"[CallStateMonitor] Erreur storage pour {tracked_contact_id} (raccrochage manuel): {e_storage_hangup}"
+        )
+
+    device.reset_call_info()
+    event_broadcaster.publish(
+        {
+            "type": "call.ended",
+            "device": device.serial,
+            "contact_id": tracked_contact_id,
+            "duration": dureeAppel_str,
+            "reason": "manual_hangup",
+        }
+    )
+    return updated_contact_due_to_hangup
 
-                        updated_contact_row = df.loc[contact_index].to_dict()
-                        for key, value in updated_contact_row.items():
-                            if pd.isna(value):
-                                updated_contact_row[key] = None
-                        updated_contact_object_for_response = updated_contact_row
 
-            except Exception as update_error:
-                print(
-                    f"[API /call/end] Erreur lors de la mise à jour du contact: {update_error}"
-                )
+class CallStateMonitor:
+    """
+    Tâche de fond (une par appareil) qui sonde le téléphone à cadence fixe et
+    conserve en mémoire le dernier état d'appel fusionné, servi tel quel par
+    /call/status.
+    """
 
-        response_data = {
-            "message": "Appel terminé et durée enregistrée",
-            "contact_id": contact_id,
-            "call_start_time": call_start_time_str_from_client,  # On renvoie ce qu'on a reçu
-            "call_end_time": call_end_time_utc_aware.isoformat(),
-            "duration": formatted_duration,
-            "contact": updated_contact_object_for_response,
-        }
+    def __init__(self, device: "AdbDevice", interval_seconds: float):
+        self.device = device
+        self.interval_seconds = interval_seconds
+        self.latest: Optional[Dict[str, Any]] = None
+        self.updated_at: Optional[float] = None  # horloge monotone
+        self.updated_at_iso: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_hangup_contact: Optional[Dict[str, Any]] = None
+        self._last_hangup_at: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or self.running:
+            return
+        self._task = asyncio.create_task(self._run())
         print(
-            f"[API /call/end] Données de réponse prêtes à être envoyées : {response_data}"
+            f"[CallStateMonitor] Démarré pour {self.device.label} (intervalle {self.interval_seconds}s)."
         )
-        return response_data
 
-    except FileNotFoundError:
-        print(
-            "[API] Erreur: Commande ADB non trouvée. Assurez-vous qu'ADB est installé et dans le PATH."
-        )
-        raise HTTPException(
-            status_code=500,
-            detail="Commande ADB non trouvée. Assurez-vous qu'ADB est installé et dans le PATH.",
-        )
-    except Exception as e:
-        print(f"[API] Erreur inattendue lors de la fin de l'appel: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Sonde l'appareil une fois et met à jour l'état en mémoire."""
+        try:
+            state = await adb_probe_coalescer.run(
+                ("call_state", self.device.serial or ""),
+                lambda: probe_call_state(self.device.serial),
+            )
+            self.last_error = None
+        except Exception as e:
+            print(f"[CallStateMonitor] Erreur lors du sondage ({self.device.label}): {e}")
+            self.last_error = str(e)
+            return self.latest or {}
+        return self.submit(state)
+
+    def submit(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Enregistre un nouvel état (sondage ou événement) et traite ses transitions."""
+        updated_contact = apply_call_state_transition(state, self.device)
+        if updated_contact is not None:
+            self.last_hangup_contact = updated_contact
+            self._last_hangup_at = time.monotonic()
+        self.latest = state
+        self.updated_at = time.monotonic()
+        self.updated_at_iso = datetime.now(timezone.utc).isoformat()
+        return state
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval_seconds)
+
+    def recent_hangup_contact(self) -> Optional[Dict[str, Any]]:
+        if (
+            self.last_hangup_contact is not None
+            and time.monotonic() - self._last_hangup_at <= CALL_HANGUP_REPORT_SECONDS
+        ):
+            return self.last_hangup_contact
+        return None
 
+    def state_age_ms(self) -> Optional[float]:
+        if self.updated_at is None:
+            return None
+        return round((time.monotonic() - self.updated_at) * 1000, 2)
 
-@app.get("/call/status", summary="Vérifier si un appel est en cours")
-async def check_call_status():
+
+# --- Détection événementielle des appels (flux logcat) ---
+# "logcat" garde un flux logcat ouvert pour détecter les transitions en temps
+# réel ; le sondage dumpsys ne sert plus alors qu'à la réconciliation.
+CALL_STATE_DETECTOR = os.getenv("CALL_STATE_DETECTOR", "poll").lower()
+CALL_STATE_RECONCILE_INTERVAL_SECONDS = float(
+    os.getenv("CALL_STATE_RECONCILE_INTERVAL_SECONDS", "15")
+)
+# Filtre logcat : seuls les tags Telecom et TelephonyRegistry sont transmis
+CALL_STATE_LOGCAT_ARGS = [
+    "logcat", "-v", "brief", "-T", "1", "-b", "main", "-b", "system", "-b", "radio",
+    "Telecom:I", "TelephonyRegistry:D", "*:S",
+]
+# ex: "notifyCallState: state=2" / "notifyCallStateForAllSubs: state=0 ..."
+LOGCAT_CALL_STATE_PATTERN = re.compile(r"notifyCallState\w*\W.*?state\s*[=:]\s*(\d)")
+# ex: "Event: RecordEntry TC@3: SET_ACTIVE" / "setCallState DIALING -> ACTIVE, call: [TC@3, ...]"
+LOGCAT_TELECOM_STATE_PATTERN = re.compile(
+    r"(?:SET_|->\s*)(DIALING|CONNECTING|RINGING|ACTIVE|ON_HOLD|DISCONNECTED)\b"
+)
+LOGCAT_TELECOM_CALL_ID_PATTERN = re.compile(r"TC@\d+")
+
+
+class LogcatCallStateDetector:
     """
-    Vérifie via ADB si un appel téléphonique est en cours.
-    Gère également la détection de raccrochage manuel pour les appels suivis.
+    Garde un flux 'adb logcat' filtré ouvert et traduit incrémentalement les
+    lignes Telecom / TelephonyRegistry en états d'appel, soumis au même
+    moniteur que le sondage dumpsys. Le flux est rouvert s'il se coupe.
     """
-    print("[API GET /call/status] Requête pour vérifier le statut d'appel")
-    global ACTIVE_CALL_INFO
 
-    is_adb_call_active = False
-    mCallState_value = 0
-    mCallState_raw_line = "Non trouvé"
-    updated_contact_due_to_hangup = None
-    detection_method = "Aucune"
-    detection_conflict = False
-    detection_start_time = datetime.now()
+    RECONNECT_DELAY_SECONDS = 2.0
 
-    try:
-        # Créer des pollers spécifiques pour suivre les états d'appel
-        call_state_results = {
-            "telephony_registry": {"active": False, "value": 0, "raw": "Non trouvé"},
-            "telecom_dump": {"active": False, "calls": [], "raw": ""}
-        }
+    def __init__(self, monitor: CallStateMonitor):
+        self.monitor = monitor
+        self.serial = monitor.device.serial
+        # TC@N -> {"state": DIALING/ACTIVE/..., "number": numéro ou None}
+        self._active_calls: Dict[str, Dict[str, Optional[str]]] = {}
+        self._call_state_value: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
 
-        # Exécuter les pollers en parallèle pour plus de rapidité
-        async def run_telephony_registry_poller():
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            print(f"[LogcatCallStateDetector] Démarré pour {self.monitor.device.label}.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _open_stream(self):
+        """Renvoie (reader, coroutine de fermeture) du flux logcat."""
+        if ADB_TRANSPORT == "server":
             try:
-                print("15:16:30 | TelephonyRegistryPoller | START |", end="")
-                command = ["adb", "shell", "dumpsys", "telephony.registry"]
-                process = await asyncio.create_subprocess_exec(
-                    *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+                service = "shell,raw:" + " ".join(
+                    shlex.quote(part) for part in CALL_STATE_LOGCAT_ARGS
                 )
-                stdout, stderr = await process.communicate()
-
-                if process.returncode == 0:
-                    output = stdout.decode("utf-8", errors="replace")
-                    for line in output.splitlines():
-                        if "mCallState" in line:
-                            call_state_results["telephony_registry"]["raw"] = line.strip()
-                            try:
-                                call_state_parts = line.split("=")
-                                if len(call_state_parts) >= 2:
-                                    value = int(call_state_parts[1].strip())
-                                    call_state_results["telephony_registry"]["value"] = value
-                                    call_state_results["telephony_registry"]["active"] = (value > 0)
-                                    print(f"     mCallState={value}")
-                                    break
-                            except ValueError:
-                                print(f"     Erreur parsing mCallState: {line}")
-                                continue
-            except Exception as e:
-                print(f"     Erreur avec telephony.registry: {e}")
+                reader, writer = await adb_server_client.open_service(self.serial, service)
+
+                async def close_connection():
+                    writer.close()
+
+                return reader, close_connection
+            except OSError:
+                pass  # Serveur injoignable : repli sur l'exécutable adb
+        command = ["adb"] + (["-s", self.serial] if self.serial else [])
+        process = await asyncio.create_subprocess_exec(
+            *command, "shell", *CALL_STATE_LOGCAT_ARGS,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+        async def close():
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
 
-        async def run_telecom_dump_poller():
+        return process.stdout, close
+
+    async def _run(self) -> None:
+        while True:
+            close = None
             try:
-                print("15:16:30 | TelecomDumpPoller | START |", end="")
-                telecom_command = ["adb", "shell", "dumpsys", "telecom"]
-                telecom_process = await asyncio.create_subprocess_exec(
-                    *telecom_command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-                )
-                telecom_stdout, telecom_stderr = await telecom_process.communicate()
-
-                if telecom_process.returncode == 0:
-                    telecom_output = telecom_stdout.decode("utf-8", errors="replace")
-                    call_state_results["telecom_dump"]["raw"] = telecom_output[:200] + "..." # Tronqué pour les logs
-                    
-                    # Analyser les appels actifs dans la sortie telecom
-                    calls = []
-                    for line in telecom_output.splitlines():
-                        if "Call id=" in line and ("state=DIALING" in line or "state=ACTIVE" in line or "state=CONNECTING" in line):
-                            calls.append(line.strip())
-                            print(f"     {line.strip()}")
-                    
-                    if not calls:
-                        print("     Active dialing, or connecting calls:")
-                    
-                    call_state_results["telecom_dump"]["calls"] = calls
-                    call_state_results["telecom_dump"]["active"] = len(calls) > 0
+                reader, close = await self._open_stream()
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    self.feed_line(line.decode("utf-8", errors="replace"))
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                print(f"     Erreur avec telecom: {e}")
-
-        # Exécuter les pollers en parallèle
-        await asyncio.gather(run_telephony_registry_poller(), run_telecom_dump_poller())
-
-        # Combiner les résultats des deux pollers pour une détection plus fiable
-        # mCallState=0 est un indicateur fort qu'il n'y a pas d'appel
-        if call_state_results["telephony_registry"]["value"] == 0:
-            # Si telephony.registry dit pas d'appel, mais telecom dit qu'il y a un appel
-            if call_state_results["telecom_dump"]["active"]:
-                detection_conflict = True
-                print("15:16:38 | TelephonyRegistryPoller | END |     mCallState=0")
-                # Privilégier telephony.registry car plus fiable pour la détection de fin d'appel
-                is_adb_call_active = False
-                detection_method = "Conflit résolu: TelephonyRegistry indique fin d'appel (mCallState=0)"
-                mCallState_value = 0
-                mCallState_raw_line = call_state_results["telephony_registry"]["raw"]
-                # Vérifier si les appels dans telecom sont réellement terminés
-                print("15:16:38 | TelecomDumpPoller | END |     Active dialing, or connecting calls:")
-            else:
-                # Les deux pollers sont d'accord: pas d'appel
-                is_adb_call_active = False
-                detection_method = "TelephonyRegistry et TelecomDump confirment: pas d'appel actif"
-                mCallState_value = 0
-                mCallState_raw_line = call_state_results["telephony_registry"]["raw"]
-                print("15:16:38 | TelephonyRegistryPoller | END |     mCallState=0")
-                print("15:16:38 | TelecomDumpPoller | END |     Active dialing, or connecting calls:")
+                print(f"[LogcatCallStateDetector] Erreur du flux logcat: {e}")
+            finally:
+                if close is not None:
+                    await close()
+            # Des transitions ont pu être manquées pendant la coupure
+            self._active_calls.clear()
+            self._call_state_value = None
+            await self.monitor.refresh()
+            await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+
+    def feed_line(self, line: str) -> Optional[Dict[str, Any]]:
+        """Analyse une ligne logcat et soumet l'état si elle décrit une transition."""
+        started = time.perf_counter()
+        registry_match = LOGCAT_CALL_STATE_PATTERN.search(line)
+        if registry_match:
+            self._call_state_value = int(registry_match.group(1))
+            if self._call_state_value == 0:
+                self._active_calls.clear()
         else:
-            # Si telephony.registry dit qu'il y a un appel
-            if call_state_results["telephony_registry"]["value"] > 0:
-                is_adb_call_active = True
-                detection_method = "TelephonyRegistry indique appel actif (mCallState > 0)"
-                mCallState_value = call_state_results["telephony_registry"]["value"]
-                mCallState_raw_line = call_state_results["telephony_registry"]["raw"]
-            # Si telephony.registry n'a pas de valeur mais telecom indique un appel
-            elif call_state_results["telecom_dump"]["active"]:
-                is_adb_call_active = True
-                detection_method = "TelecomDump indique appel actif"
-                mCallState_value = -1  # Valeur spéciale indiquant que mCallState n'est pas disponible
+            telecom_match = LOGCAT_TELECOM_STATE_PATTERN.search(line)
+            call_id_match = LOGCAT_TELECOM_CALL_ID_PATTERN.search(line)
+            if not telecom_match or not call_id_match:
+                return None
+            call_id = call_id_match.group(0)
+            if telecom_match.group(1) == "DISCONNECTED":
+                self._active_calls.pop(call_id, None)
             else:
-                # Ni telephony.registry ni telecom n'indiquent d'appel
-                is_adb_call_active = False
-                detection_method = "Aucun appel détecté par les pollers"
+                call = self._active_calls.setdefault(call_id, {"state": None, "number": None})
+                call["state"] = telecom_match.group(1)
+                phone_match = TELECOM_HANDLE_PATTERN.search(line)
+                if phone_match:
+                    call["number"] = phone_match.group(1).strip()
+
+        # Même règle de fusion que le sondage : mCallState=0 fait foi pour la fin d'appel
+        if self._call_state_value is not None:
+            is_call_active = self._call_state_value > 0
+            mCallState_value = self._call_state_value
+        else:
+            is_call_active = bool(self._active_calls)
+            mCallState_value = -1 if is_call_active else 0
+        detected_phone_number = next(
+            (call["number"] for call in self._active_calls.values() if call["number"]),
+            None,
+        )
+        state = {
+            "call_in_progress": is_call_active,
+            "mCallState": mCallState_value,
+            "mCallState_raw": line.strip(),
+            "detection_method": "Logcat (événement Telecom/TelephonyRegistry)",
+            "detection_conflict": False,
+            "telephony_registry_active": bool(self._call_state_value),
+            "telecom_dump_active": bool(self._active_calls),
+            # Même forme que les lignes de 'dumpsys telecom'
+            "telecom_dump_calls": [
+                f"Call id={call_id}, state={call['state']}"
+                for call_id, call in self._active_calls.items()
+            ],
+            "detected_phone_number": detected_phone_number if is_call_active else None,
+            "detection_time_ms": round((time.perf_counter() - started) * 1000, 2),
+            "probe_started_at": time.monotonic(),
+        }
+        return self.monitor.submit(state)
 
-        # Mesurer la vitesse de détection
-        detection_time_ms = (datetime.now() - detection_start_time).total_seconds() * 1000
-        print(f"[API /call/status] Détection terminée en {detection_time_ms:.2f}ms. Résultat: {is_adb_call_active}")
 
-        # Logique de détection de raccrochage manuel pour un appel suivi
-        tracked_contact_id = ACTIVE_CALL_INFO.get("contact_id")
-        if (
-            tracked_contact_id and not is_adb_call_active
-        ):  # Un appel était suivi ET ADB dit qu'il n'y a plus d'appel
-            print(
-                f"[API /call/status] Raccrochage manuel détecté pour l'appel suivi du contact ID: {tracked_contact_id}"
-            )
-            call_start_time_iso = ACTIVE_CALL_INFO.get("start_time_iso")
-            hang_up_time_utc = datetime.now(timezone.utc)
-            dureeAppel_str = "00:00"
+# --- Registre des appareils ADB (plusieurs téléphones par instance) ---
+# Alias de sélection (ligne, SIM...) vers un numéro de série adb,
+# ex: ADB_DEVICE_ALIASES="sim1=R58M12345,pro=emulator-5554"
+ADB_DEVICE_ALIASES: Dict[str, str] = dict(
+    entry.split("=", 1)
+    for entry in os.getenv("ADB_DEVICE_ALIASES", "").replace(" ", "").split(",")
+    if "=" in entry
+)
 
-            if call_start_time_iso:
-                try:
-                    call_start_time_utc = datetime.fromisoformat(
-                        call_start_time_iso.replace("Z", "+00:00")
-                    )
-                    duration_seconds = (
-                        hang_up_time_utc - call_start_time_utc
-                    ).total_seconds()
-                    if duration_seconds < 0:
-                        duration_seconds = 0
-                    dureeAppel_str = format_duration(int(duration_seconds))
-                    print(
-                        f"[API /call/status] Durée calculée pour {tracked_contact_id}: {dureeAppel_str}"
-                    )
-                except Exception as e_dur:
-                    print(
-                        f"[API /call/status] Erreur calcul durée pour {tracked_contact_id} (raccrochage manuel): {e_dur}"
-                    )
 
-            try:
-                if (
-                    CONTACTS_STORAGE_FILE.exists()
-                    and CONTACTS_STORAGE_FILE.stat().st_size > 0
-                ):
-                    df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-                    contact_index = df.index[df["id"] == tracked_contact_id].tolist()
-                    if contact_index:
-                        idx = contact_index[0]
-                        df.loc[idx, "isCurrentlyInCall"] = False
-                        df.loc[idx, "dureeAppel"] = dureeAppel_str
-                        hang_up_time_paris = hang_up_time_utc.astimezone(PARIS_TZ)
-                        df.loc[idx, "dateAppel"] = hang_up_time_paris.strftime(
-                            "%d/%m/%Y"
-                        )
-                        df.loc[idx, "heureAppel"] = hang_up_time_paris.strftime(
-                            "%H:%M:%S"
-                        )
-                        df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
-                        get_cached_contacts.cache_clear()
-                        print(
-                            f"[API /call/status] Contact {tracked_contact_id} mis à jour (raccrochage manuel)."
-                        )
+class AdbDevice:
+    """
+    Un téléphone piloté par l'API : son appel suivi, son moniteur d'état et sa
+    session shell (qui sérialise ses commandes). serial=None désigne l'appareil
+    par défaut d'adb (un seul téléphone branché).
+    """
 
-                        updated_contact_data = df.loc[idx].to_dict()
-                        for key, value in updated_contact_data.items():
-                            if pd.isna(value):
-                                updated_contact_data[key] = None
-                        updated_contact_due_to_hangup = ContactInDB(
-                            **updated_contact_data
-                        ).model_dump()
-                    else:
-                        print(
-                            f"[API /call/status] Contact {tracked_contact_id} (raccrochage manuel) non trouvé dans storage."
-                        )
-            except Exception as e_storage_hangup:
-                print(
-                    f"[API /call/status] Erreur storage pour {tracked_contact_id} (raccrochage manuel): {e_storage_hangup}"
-                )
+    def __init__(self, serial: Optional[str]):
+        self.serial = serial
+        self.call_info: Dict[str, Any] = {"contact_id": None, "start_time_iso": None}
+        # Dernier état d'appel observé, pour ne diffuser que les transitions
+        self.last_call_state: Dict[str, Any] = {"call_in_progress": None}
+        self.monitor = CallStateMonitor(
+            self,
+            CALL_STATE_RECONCILE_INTERVAL_SECONDS
+            if CALL_STATE_DETECTOR == "logcat"
+            else CALL_STATE_POLL_INTERVAL_SECONDS,
+        )
+        self.logcat_detector = LogcatCallStateDetector(self.monitor)
+        # Réservé par le moteur de campagnes pendant un appel automatique
+        self.dial_lock = asyncio.Lock()
+
+    @property
+    def label(self) -> str:
+        return self.serial or "appareil par défaut"
+
+    def reset_call_info(self) -> None:
+        self.call_info = {"contact_id": None, "start_time_iso": None}
+
+    def start(self) -> None:
+        self.monitor.start()
+        if CALL_STATE_DETECTOR == "logcat":
+            self.logcat_detector.start()
+
+    async def stop(self) -> None:
+        await self.logcat_detector.stop()
+        await self.monitor.stop()
+        await adb_shell_pool.session(self.serial).close()
+
+
+class AdbDeviceRegistry:
+    """Appareils connus, indexés par numéro de série."""
+
+    def __init__(self):
+        self._devices: Dict[Optional[str], AdbDevice] = {}
+        self._started = False
+
+    def __iter__(self):
+        return iter(list(self._devices.values()))
+
+    def get(self, serial: Optional[str]) -> Optional[AdbDevice]:
+        """Appareil déjà enregistré (découverte ou alias), sans en créer."""
+        return self._devices.get(serial)
+
+    def _register(self, serial: Optional[str]) -> AdbDevice:
+        device = self._devices.get(serial)
+        if device is None:
+            device = AdbDevice(serial)
+            self._devices[serial] = device
+            if self._started:
+                device.start()
+        return device
+
+    async def resolve(
+        self, device: Optional[str] = None, sim: Optional[str] = None
+    ) -> AdbDevice:
+        """
+        Sélectionne l'appareil d'une requête : par numéro de série ou alias
+        (device), par alias de SIM (sim), sinon l'appareil par défaut.
+        Seuls les appareils listés par adb et les alias configurés sont acceptés :
+        un sélecteur inconnu ne crée jamais d'appareil (ni de moniteur).
+        """
+        selector = device or sim
+        if not selector:
+            return self.default()
+        if selector in ADB_DEVICE_ALIASES:
+            return self._register(ADB_DEVICE_ALIASES[selector])
+        if not device:
+            raise HTTPException(status_code=404, detail=f"SIM ou ligne inconnue: {selector}")
+        known = self.get(selector)
+        if known is not None:
+            return known
+        # Appareil branché depuis la dernière découverte ?
+        if selector in await self.discover():
+            return self._devices[selector]
+        raise HTTPException(status_code=404, detail=f"Appareil inconnu: {selector}")
+
+    def default(self) -> AdbDevice:
+        serials = [serial for serial in self._devices if serial is not None]
+        if serials and None not in self._devices:
+            return self._devices[serials[0]]
+        return self._register(None)
+
+    def find_by_contact(self, contact_id: Optional[str]) -> Optional[AdbDevice]:
+        """Appareil dont l'appel suivi concerne ce contact."""
+        if not contact_id:
+            return None
+        for device in self._devices.values():
+            if device.call_info.get("contact_id") == contact_id:
+                return device
+        return None
 
-            ACTIVE_CALL_INFO = {"contact_id": None, "start_time_iso": None}
-            print(
-                f"[API /call/status] ACTIVE_CALL_INFO réinitialisé suite à détection de raccrochage manuel."
-            )
+    async def discover(self) -> List[str]:
+        """Enregistre les appareils listés par 'adb devices' (état 'device')."""
+        try:
+            returncode, stdout, _ = await run_adb_probe(["devices"])
+        except Exception as e:
+            print(f"[AdbDeviceRegistry] Découverte des appareils impossible: {e}")
+            return []
+        serials = []
+        if returncode == 0:
+            for line in stdout.decode("utf-8", errors="replace").splitlines():
+                parts = line.strip().split("\t")
+                if len(parts) == 2 and parts[1] == "device":
+                    serials.append(parts[0])
+        for serial in serials:
+            self._register(serial)
+        return serials
+
+    async def start(self) -> None:
+        serials = await self.discover()
+        if not serials:
+            self._register(None)  # Aucun appareil listé : surveiller l'appareil par défaut
+        self._started = True
+        for device in self._devices.values():
+            device.start()
+
+    async def stop(self) -> None:
+        self._started = False
+        for device in list(self._devices.values()):
+            await device.stop()
+
+
+adb_devices = AdbDeviceRegistry()
 
-        # S'assurer que la réponse a toujours une structure cohérente
-        return {
-            "status": "success",
-            "call_in_progress": is_adb_call_active,  # Vrai si un appel est en cours selon ADB
-            "active_tracked_contact_id": ACTIVE_CALL_INFO.get(
-                "contact_id"
-            ),  # ID du contact si l'appel est suivi par l'API, sinon null
-            "mCallState": mCallState_value,
-            "mCallState_raw": mCallState_raw_line,
-            "detection_method": detection_method,
-            "detection_conflict": detection_conflict,
-            "updated_contact_after_hangup": updated_contact_due_to_hangup,  # Inclure le contact mis à jour si un raccrochage a été traité
-            "telephony_registry_active": call_state_results["telephony_registry"]["active"],
-            "telecom_dump_active": call_state_results["telecom_dump"]["active"],
-            "telecom_dump_calls": call_state_results["telecom_dump"]["calls"],
-            "detection_time_ms": round(detection_time_ms, 2)
-        }
 
-    except FileNotFoundError:
-        print("[API GET /call/status] Erreur critique: Commande ADB non trouvée.")
-        # En cas de FileNotFoundError, on ne peut rien faire, donc on réinitialise aussi l'appel suivi potentiellement.
-        # Cela évite un état incohérent si ADB devient indisponible pendant un appel suivi.
-        if ACTIVE_CALL_INFO.get("contact_id"):
-            print(
-                "[API GET /call/status] ADB non trouvé, réinitialisation de ACTIVE_CALL_INFO par précaution."
-            )
-            ACTIVE_CALL_INFO = {"contact_id": None, "start_time_iso": None}
-        
-        # Toujours renvoyer une structure cohérente, même en cas d'erreur
-        return {
-            "status": "error",
-            "error": "Commande ADB non trouvée. Impossible de déterminer le statut de l'appel.",
-            "call_in_progress": False,
-            "active_tracked_contact_id": None,
-            "mCallState": None,
-            "mCallState_raw": None,
-            "detection_method": None,
-            "detection_conflict": None,
-            "detection_time_ms": None
-        }
-    except Exception as e:
-        print(f"[API GET /call/status] Erreur inattendue: {e}")
-        import traceback
-        traceback.print_exc()
-        
+@app.get("/call/status", summary="Vérifier si un appel est en cours")
+async def check_call_status(
+    device: Optional[str] = Query(None, description="Numéro de série ou alias de l'appareil"),
+    sim: Optional[str] = Query(None, description="Alias de SIM / ligne"),
+):
+    """
+    Renvoie le dernier état d'appel observé par le moniteur de fond de
+    l'appareil, sans lancer de commande ADB. Sonde l'appareil directement si
+    le moniteur est désactivé ou n'a pas encore produit d'état.
+    """
+    adb_device = await adb_devices.resolve(device, sim)
+    call_state_monitor = adb_device.monitor
+    if not call_state_monitor.running or call_state_monitor.latest is None:
+        await call_state_monitor.refresh()
+
+    state = call_state_monitor.latest
+    if state is None:
         # Toujours renvoyer une structure cohérente, même en cas d'erreur
         return {
             "status": "error",
-            "error": f"Erreur interne serveur: {str(e)}",
+            "error": f"Impossible de déterminer le statut de l'appel: {call_state_monitor.last_error}",
+            "device": adb_device.serial,
             "call_in_progress": False,
-            "active_tracked_contact_id": ACTIVE_CALL_INFO.get("contact_id"),
+            "active_tracked_contact_id": adb_device.call_info.get("contact_id"),
             "mCallState": None,
             "mCallState_raw": None,
             "detection_method": None,
             "detection_conflict": None,
-            "detection_time_ms": None
+            "detection_time_ms": None,
+            "state_age_ms": None,
         }
 
+    detected_phone_number = state["detected_phone_number"]
+    return {
+        "status": "success",
+        **state,
+        "device": adb_device.serial,
+        "active_tracked_contact_id": adb_device.call_info.get(
+            "contact_id"
+        ),  # ID du contact si l'appel est suivi par l'API, sinon null
+        "updated_contact_after_hangup": call_state_monitor.recent_hangup_contact(),
+        # Attribution de l'appel détecté à un contact via l'index des numéros (O(1))
+        "detected_contact_ids": (
+            contact_store.find_by_phone(detected_phone_number)
+            if detected_phone_number
+            else []
+        ),
+        # Fraîcheur de l'état servi : âge en ms et horodatage du dernier sondage
+        "state_age_ms": call_state_monitor.state_age_ms(),
+        "state_updated_at": call_state_monitor.updated_at_iso,
+        "monitor_running": call_state_monitor.running,
+    }
+
 
 # Fonction utilitaire pour formater la durée
 def format_duration(seconds):
@@ -1624,12 +4425,19 @@ async def adb_hangup_call(
         contact_id_from_request = request_body.contact_id
         # contact_id_info = f" (Info contact ID depuis requête: {contact_id_from_request})" # Redondant avec la construction ultérieure
 
-    global ACTIVE_CALL_INFO
-    tracked_contact_id = ACTIVE_CALL_INFO.get("contact_id")
+    if request_body and (request_body.device or request_body.sim):
+        adb_device = await adb_devices.resolve(request_body.device, request_body.sim)
+    else:
+        adb_device = (
+            adb_devices.find_by_contact(contact_id_from_request)
+            or adb_devices.default()
+        )
+    serial = adb_device.serial
+    tracked_contact_id = adb_device.call_info.get("contact_id")
     effective_contact_id = (
         tracked_contact_id if tracked_contact_id else contact_id_from_request
     )
-    call_start_time_iso_for_duration_calc = ACTIVE_CALL_INFO.get("start_time_iso")
+    call_start_time_iso_for_duration_calc = adb_device.call_info.get("start_time_iso")
 
     if effective_contact_id:
         contact_id_info = f" (Pour contact ID: {effective_contact_id})"
@@ -1637,7 +4445,7 @@ async def adb_hangup_call(
         contact_id_info = " (Aucun contact ID spécifié ou suivi)"
 
     print(
-        f"[API POST /adb/hangup] Requête pour raccrocher l'appel{contact_id_info}. ACTIVE_CALL_INFO: {ACTIVE_CALL_INFO}"
+        f"[API POST /adb/hangup] Requête pour raccrocher l'appel{contact_id_info} ({adb_device.label}). Appel suivi: {adb_device.call_info}"
     )
 
     effective_hang_up_time_utc = datetime.now(timezone.utc)
@@ -1649,11 +4457,13 @@ async def adb_hangup_call(
         print(
             f"[API DEBUG /adb/hangup] Envoi de la commande KEYCODE_ENDCALL via ADB{contact_id_info}"
         )
-        run_adb_command(["shell", "input", "keyevent", "KEYCODE_ENDCALL"])
+        await run_adb_command(
+            ["shell", "input", "keyevent", "KEYCODE_ENDCALL"], serial=serial
+        )
 
         try:
-            call_status_output = run_adb_command(
-                ["shell", "dumpsys", "telephony.registry"], timeout_seconds=8
+            call_status_output = await run_adb_command(
+                ["shell", "dumpsys", "telephony.registry"], timeout_seconds=8, serial=serial
             )
             call_active_after_first_try = (
                 "mCallState=2" in call_status_output
@@ -1663,16 +4473,16 @@ async def adb_hangup_call(
                 print(
                     f"[API DEBUG /adb/hangup] Première tentative de raccrochage semble avoir échoué (appel toujours actif). Tentative de secours{contact_id_info}"
                 )
-                run_adb_command(
-                    ["shell", "input", "keyevent", "KEYCODE_POWER"], timeout_seconds=5
+                await run_adb_command(
+                    ["shell", "input", "keyevent", "KEYCODE_POWER"], timeout_seconds=5, serial=serial
                 )  # Tenter de réveiller l'écran
                 await asyncio.sleep(0.5)  # Petite pause
-                run_adb_command(
-                    ["shell", "input", "keyevent", "KEYCODE_ENDCALL"], timeout_seconds=5
+                await run_adb_command(
+                    ["shell", "input", "keyevent", "KEYCODE_ENDCALL"], timeout_seconds=5, serial=serial
                 )
 
-                call_status_output_after_retry = run_adb_command(
-                    ["shell", "dumpsys", "telephony.registry"], timeout_seconds=8
+                call_status_output_after_retry = await run_adb_command(
+                    ["shell", "dumpsys", "telephony.registry"], timeout_seconds=8, serial=serial
                 )
                 call_still_active_after_retry = (
                     "mCallState=2" in call_status_output_after_retry
@@ -1708,10 +4518,11 @@ async def adb_hangup_call(
         final_hangup_message = f"Échec commande ADB (Exception): {adb_error_detail}"
         print(f"[API /adb/hangup] {final_hangup_message}")
 
-    # --- Logique de mise à jour du contact et ACTIVE_CALL_INFO ---
+    # --- Logique de mise à jour du contact et de l'appel suivi par l'appareil ---
     overall_status_message = f"Tentative de raccrochage pour{contact_id_info} traitée. {final_hangup_message}"
     updated_contact_for_response = None
     dureeAppel_str = "00:00"
+    duration_seconds_for_history = None
 
     if effective_contact_id:
         if (
@@ -1729,6 +4540,7 @@ async def adb_hangup_call(
                         f"[API /adb/hangup] Durée négative détectée ({duration_seconds}s) pour {effective_contact_id}. Mise à 0."
                     )
                     duration_seconds = 0
+                duration_seconds_for_history = duration_seconds
                 dureeAppel_str = format_duration(int(duration_seconds))
                 print(
                     f"[API /adb/hangup] Durée calculée: {dureeAppel_str} pour contact {effective_contact_id}"
@@ -1745,52 +4557,28 @@ async def adb_hangup_call(
             dureeAppel_str = "N/A"  # ou garder "00:00"
 
         try:
-            if (
-                CONTACTS_STORAGE_FILE.exists()
-                and CONTACTS_STORAGE_FILE.stat().st_size > 0
-            ):
-                df = pd.read_parquet(CONTACTS_STORAGE_FILE)
-                contact_index_list = df.index[df["id"] == effective_contact_id].tolist()
-                if contact_index_list:
-                    idx = contact_index_list[0]
-                    df.loc[idx, "isCurrentlyInCall"] = False
-                    df.loc[idx, "dureeAppel"] = (
-                        dureeAppel_str  # Enregistre la durée calculée ou N/A
-                    )
-
-                    hang_up_time_paris = effective_hang_up_time_utc.astimezone(PARIS_TZ)
-                    df.loc[idx, "dateAppel"] = hang_up_time_paris.strftime(
-                        "%d/%m/%Y"
-                    )  # Date de fin d'appel
-                    df.loc[idx, "heureAppel"] = hang_up_time_paris.strftime(
-                        "%H:%M:%S"
-                    )  # Heure de fin d'appel
-
-                    # callStartTime n'est pas modifié ici, il reste l'heure de début de l'appel.
-                    df.to_parquet(CONTACTS_STORAGE_FILE, index=False)
-                    get_cached_contacts.cache_clear()
-
-                    updated_contact_data = df.loc[idx].to_dict()
-                    for key, value in updated_contact_data.items():
-                        if pd.isna(value):
-                            updated_contact_data[key] = None
-                    updated_contact_for_response = ContactInDB(**updated_contact_data)
-                    overall_status_message += f" Contact {effective_contact_id} mis à jour (isCurrentlyInCall=False, durée={dureeAppel_str})."
-                    print(
-                        f"[API /adb/hangup] Contact {effective_contact_id} mis à jour."
-                    )
-                else:
-                    print(
-                        f"[API /adb/hangup] Contact {effective_contact_id} non trouvé dans storage pour mise à jour après raccrochage."
-                    )
-                    overall_status_message += (
-                        f" Contact {effective_contact_id} non trouvé pour mise à jour."
-                    )
+            # callStartTime n'est pas modifié ici, il reste l'heure de début de l'appel.
+            updated_contact_data = record_call_end(
+                effective_contact_id,
+                serial,
+                call_start_time_iso_for_duration_calc,
+                effective_hang_up_time_utc,
+                duration_seconds_for_history,
+                dureeAppel_str,  # Enregistre la durée calculée ou N/A
+                "answered" if adb_device.call_info.get("answered") else "no_answer",
+                "adb_hangup",
+            )
+            if updated_contact_data:
+                updated_contact_for_response = ContactInDB(**updated_contact_data)
+                overall_status_message += f" Contact {effective_contact_id} mis à jour (isCurrentlyInCall=False, durée={dureeAppel_str})."
+                print(f"[API /adb/hangup] Contact {effective_contact_id} mis à jour.")
             else:
                 print(
-                    f"[API /adb/hangup] Fichier contacts vide/inexistant, pas de mise à jour de contact pour {effective_contact_id}."
+                    f"[API /adb/hangup] Contact {effective_contact_id} non trouvé dans storage pour mise à jour après raccrochage."
+                )
+                overall_status_message += (
+                    f" Contact {effective_contact_id} non trouvé pour mise à jour."
                 )
-                overall_status_message += " Fichier contacts vide, pas de mise à jour."
         except Exception as e_storage:
             error_msg_storage = f"Erreur de stockage lors de la mise à jour du contact {effective_contact_id}: {e_storage}"
             print(f"[API /adb/hangup] {error_msg_storage}")
@@ -1799,22 +4587,21 @@ async def adb_hangup_call(
     if (
         tracked_contact_id and tracked_contact_id == effective_contact_id
     ):  # Si l'appel raccroché était celui suivi par l'API
-        ACTIVE_CALL_INFO = {"contact_id": None, "start_time_iso": None}
+        adb_device.reset_call_info()
         print(
-            f"[API /adb/hangup] ACTIVE_CALL_INFO réinitialisé car l'appel suivi ({tracked_contact_id}) a été traité pour raccrochage."
+            f"[API /adb/hangup] Appel suivi réinitialisé ({adb_device.label}) car l'appel ({tracked_contact_id}) a été traité pour raccrochage."
         )
     elif not tracked_contact_id and effective_contact_id:
         print(
-            f"[API /adb/hangup] Un appel a été traité pour raccrochage pour {effective_contact_id} (demandé par requête), mais aucun appel n'était activement suivi par ACTIVE_CALL_INFO."
+            f"[API /adb/hangup] Un appel a été traité pour raccrochage pour {effective_contact_id} (demandé par requête), mais aucun appel n'était activement suivi par l'appareil."
         )
     elif not effective_contact_id:  # Aucun ID de contact, ni suivi, ni dans la requête
         print(
             f"[API /adb/hangup] Commande de raccrochage générique envoyée (aucun ID de contact spécifique traité)."
         )
-        # On pourrait quand même réinitialiser ACTIVE_CALL_INFO s'il contenait quelque chose, par précaution ?
-        # if ACTIVE_CALL_INFO.get("contact_id"):
-        #     print(f"[API /adb/hangup] Raccrochage générique, réinitialisation de ACTIVE_CALL_INFO qui contenait {ACTIVE_CALL_INFO} par précaution.")
-        #     ACTIVE_CALL_INFO = {"contact_id": None, "start_time_iso": None}
+        # On pourrait quand même réinitialiser l'appel suivi s'il contenait quelque chose, par précaution ?
+        # if adb_device.call_info.get("contact_id"):
+        #     adb_device.reset_call_info()
         pass
 
     response_status = "success" if adb_command_successful else "partial_success"
@@ -1830,36 +4617,572 @@ async def adb_hangup_call(
         "status": response_status,  # 'success', 'partial_success' (état MàJ mais ADB a eu un souci), 'error_adb_setup'
         "hang_up_time_utc": effective_hang_up_time_utc.isoformat(),
         "contact_id_processed": effective_contact_id,
+        "device": serial,
         "adb_command_executed": adb_command_successful,
         "adb_error_detail": adb_error_detail if not adb_command_successful else None,
     }
     if updated_contact_for_response:
         response_data["contact"] = updated_contact_for_response.model_dump()
 
+    event_broadcaster.publish(
+        {
+            "type": "call.ended",
+            "device": serial,
+            "contact_id": effective_contact_id,
+            "duration": dureeAppel_str if effective_contact_id else None,
+            "reason": "adb_hangup",
+        }
+    )
     print(f"[API /adb/hangup] Réponse: {response_data}")
     return response_data
 
 
+# --- Campagnes d'appels (power dialer) ---
+# Intervalle de surveillance de l'appel en cours par le moteur de campagne
+CAMPAIGN_POLL_SECONDS = 0.5
+# Fenêtre glissante du débit (appels / heure)
+CAMPAIGN_THROUGHPUT_WINDOW_SECONDS = 3600
+# Issues après lesquelles le contact est remis en file (dans la limite des tentatives)
+CAMPAIGN_RETRY_OUTCOMES = {"no_answer", "dial_failed", "interrupted"}
+# Durée maximale d'un appel de campagne : au-delà, raccrochage et mise en pause
+CAMPAIGN_MAX_CALL_SECONDS = float(os.getenv("CAMPAIGN_MAX_CALL_SECONDS", "3600"))
+# Sans état d'appel récent pendant ce délai (appareil débranché, adb en échec),
+# l'appel est abandonné et la campagne mise en pause
+CAMPAIGN_STALE_PROBE_SECONDS = float(os.getenv("CAMPAIGN_STALE_PROBE_SECONDS", "60"))
+# Étapes journalisées avant réécriture complète de l'état des campagnes
+CAMPAIGN_LOG_COMPACT_STEPS = 500
+
+
+class CampaignCallLostError(Exception):
+    """Fin d'appel impossible à constater : la campagne doit être mise en pause."""
+
+
+class CampaignCreate(BaseModel):
+    name: str
+    status: Optional[List[str]] = None  # Filtre sur le statut des contacts
+    source: Optional[List[str]] = None  # Filtre sur la source des contacts
+    device: Optional[str] = None  # Numéro de série ou alias de l'appareil
+    sim: Optional[str] = None  # Alias de SIM / ligne
+    wrap_up_seconds: float = Field(default=5.0, ge=0)  # Pause après chaque appel
+    max_attempts: int = Field(default=3, ge=1)
+    no_answer_timeout_seconds: float = Field(default=30.0, gt=0)
+    autostart: bool = True
+
+
+class CampaignManager:
+    """
+    Moteur de campagnes : une file de contacts par campagne, composée
+    automatiquement sur l'appareil choisi dès que l'appel précédent est
+    terminé (d'après l'état d'appel de l'appareil). L'état complet est écrit
+    en JSON aux changements d'état de campagne ; chaque étape d'appel
+    (contact pris, numérotation, issue) n'ajoute qu'une ligne à un journal
+    JSONL, rejoué au chargement pour reprendre après un redémarrage.
+    """
+
+    def __init__(self, state_file: Path):
+        self.state_file = state_file
+        self.log_file = state_file.with_suffix(".log.jsonl")
+        self.campaigns: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._log_seq = 0  # Numéro de la dernière étape journalisée
+        self._log_steps = 0  # Étapes journalisées depuis la dernière réécriture
+
+    # -- Persistance --
+    def load(self) -> None:
+        if not self.state_file.exists():
+            return
+        try:
+            data = json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"[Campaigns] Lecture de {self.state_file} impossible: {e}")
+            return
+        self.campaigns = {campaign["id"]: campaign for campaign in data.get("campaigns", [])}
+        self._log_seq = data.get("log_seq", 0)
+        replayed = 0
+        for step in read_journal_file(self.log_file):
+            campaign = self.campaigns.get(step.get("campaign_id"))
+            # Étapes déjà contenues dans l'instantané (arrêt avant la purge du journal)
+            if campaign is None or step.get("seq", 0) <= self._log_seq:
+                continue
+            self._apply_step(campaign, step)
+            self._log_seq = step["seq"]
+            replayed += 1
+        for campaign in self.campaigns.values():
+            current = campaign.get("current")
+            if current:
+                # Appel en cours au moment de l'arrêt : issue inconnue
+                self._finish_call(campaign, current["contact_id"], "interrupted")
+                replayed += 1
+        if replayed:
+            self.save()
+        print(f"[Campaigns] {len(self.campaigns)} campagne(s) rechargée(s).")
+
+    def save(self) -> None:
+        """Réécrit l'état complet puis purge le journal des étapes qu'il contient."""
+        tmp_file = self.state_file.with_suffix(".json.tmp")
+        tmp_file.write_text(
+            json.dumps(
+                {"campaigns": list(self.campaigns.values()), "log_seq": self._log_seq},
+                default=str,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_file, self.state_file)
+        self.log_file.unlink(missing_ok=True)
+        self._log_steps = 0
+
+    def _step(self, campaign: Dict[str, Any], step: Dict[str, Any]) -> None:
+        """Applique une étape d'appel et l'ajoute au journal (une ligne)."""
+        self._log_seq += 1
+        step = {"seq": self._log_seq, "campaign_id": campaign["id"], **step}
+        self._apply_step(campaign, step)
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(step, default=str) + "\n")
+        self._log_steps += 1
+        if self._log_steps >= CAMPAIGN_LOG_COMPACT_STEPS:
+            self.save()
+
+    def _apply_step(self, campaign: Dict[str, Any], step: Dict[str, Any]) -> None:
+        contact_id = step["contact_id"]
+        if step["op"] == "take":
+            if contact_id in campaign["queue"]:
+                campaign["queue"].remove(contact_id)
+        elif step["op"] == "dial":
+            campaign["attempts"][contact_id] = campaign["attempts"].get(contact_id, 0) + 1
+            campaign["current"] = {
+                "contact_id": contact_id,
+                "device": step["device"],
+                "started_at": step["started_at"],
+            }
+            cutoff = step["at"] - CAMPAIGN_THROUGHPUT_WINDOW_SECONDS
+            campaign["dials"] = [dial for dial in campaign["dials"] if dial["at"] >= cutoff]
+            campaign["dials"].append({"device": step["device"], "at": step["at"]})
+        elif step["op"] == "outcome":
+            self._finish_call(campaign, contact_id, step["outcome"])
+
+    # -- Gestion --
+    def create(self, request: CampaignCreate) -> Dict[str, Any]:
+        statuses = {s.strip().lower() for s in request.status} if request.status else None
+        sources = {s.strip().lower() for s in request.source} if request.source else None
+        queue = [
+            row["id"]
+            for row in contact_store.records()
+            if row.get("phoneNumber")
+            and (statuses is None or str(row.get("status") or "").strip().lower() in statuses)
+            and (sources is None or str(row.get("source") or "").strip().lower() in sources)
+        ]
+        campaign = {
+            "id": str(uuid.uuid4()),
+            "name": request.name,
+            "filters": {"status": request.status, "source": request.source},
+            "device": request.device,
+            "sim": request.sim,
+            "wrap_up_seconds": request.wrap_up_seconds,
+            "max_attempts": request.max_attempts,
+            "no_answer_timeout_seconds": request.no_answer_timeout_seconds,
+            "state": "paused",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "queue": queue,
+            "total_contacts": len(queue),
+            "attempts": {},
+            "outcomes": {},
+            "current": None,
+            "dials": [],  # [{"device", "at"}] sur la fenêtre de débit
+            "last_error": None,
+        }
+        self.campaigns[campaign["id"]] = campaign
+        if request.autostart:
+            self.start(campaign["id"])
+        else:
+            self.save()
+        return campaign
+
+    def get(self, campaign_id: str) -> Dict[str, Any]:
+        campaign = self.campaigns.get(campaign_id)
+        if campaign is None:
+            raise HTTPException(status_code=404, detail="Campagne non trouvée")
+        return campaign
+
+    def start(self, campaign_id: str) -> Dict[str, Any]:
+        campaign = self.get(campaign_id)
+        if campaign["state"] == "completed":
+            return campaign
+        campaign["state"] = "running"
+        campaign["last_error"] = None
+        self.save()
+        if campaign_id not in self._tasks:
+            self._tasks[campaign_id] = asyncio.create_task(self._run(campaign_id))
+        return campaign
+
+    def pause(self, campaign_id: str) -> Dict[str, Any]:
+        """Met en pause : l'appel en cours se termine normalement, aucun nouvel appel."""
+        campaign = self.get(campaign_id)
+        if campaign["state"] == "running":
+            campaign["state"] = "paused"
+            self.save()
+        return campaign
+
+    async def delete(self, campaign_id: str) -> None:
+        self.get(campaign_id)
+        task = self._tasks.pop(campaign_id, None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        del self.campaigns[campaign_id]
+        self.save()
+
+    def resume_all(self) -> None:
+        for campaign_id, campaign in self.campaigns.items():
+            if campaign["state"] == "running" and campaign_id not in self._tasks:
+                self._tasks[campaign_id] = asyncio.create_task(self._run(campaign_id))
+
+    async def stop_all(self) -> None:
+        """Arrêt du serveur : les campagnes restent 'running' et reprendront au démarrage."""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        for task in list(self._tasks.values()):
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+
+    def summary(self, campaign: Dict[str, Any]) -> Dict[str, Any]:
+        cutoff = time.time() - CAMPAIGN_THROUGHPUT_WINDOW_SECONDS
+        calls_per_hour_by_device: Dict[str, int] = defaultdict(int)
+        for dial in campaign["dials"]:
+            if dial["at"] >= cutoff:
+                calls_per_hour_by_device[dial["device"] or "default"] += 1
+        outcome_counts: Dict[str, int] = defaultdict(int)
+        for outcome in campaign["outcomes"].values():
+            outcome_counts[outcome] += 1
+        summary = {
+            key: value
+            for key, value in campaign.items()
+            if key not in ("queue", "attempts", "outcomes", "dials")
+        }
+        summary.update(
+            {
+                "pending": len(campaign["queue"]),
+                "outcome_counts": dict(outcome_counts),
+                "calls_per_hour": sum(calls_per_hour_by_device.values()),
+                "calls_per_hour_by_device": dict(calls_per_hour_by_device),
+            }
+        )
+        return summary
+
+    # -- Moteur --
+    def _finish_call(self, campaign: Dict[str, Any], contact_id: str, outcome: str) -> None:
+        campaign["current"] = None
+        campaign["outcomes"][contact_id] = outcome
+        if (
+            outcome in CAMPAIGN_RETRY_OUTCOMES
+            and campaign["attempts"].get(contact_id, 0) < campaign["max_attempts"]
+        ):
+            campaign["queue"].append(contact_id)
+
+    async def _run(self, campaign_id: str) -> None:
+        campaign = self.campaigns[campaign_id]
+        print(f"[Campaigns] Campagne '{campaign['name']}' démarrée.")
+        try:
+            while campaign["state"] == "running":
+                if not campaign["queue"]:
+                    campaign["state"] = "completed"
+                    self.save()
+                    event_broadcaster.publish(
+                        {"type": "campaign.completed", "campaign_id": campaign_id}
+                    )
+                    print(f"[Campaigns] Campagne '{campaign['name']}' terminée.")
+                    break
+                device = await adb_devices.resolve(campaign["device"], campaign["sim"])
+                # Un seul appel de campagne à la fois par appareil
+                async with device.dial_lock:
+                    await self._wait_until_idle(device)
+                    if campaign["state"] != "running" or not campaign["queue"]:
+                        continue
+                    contact_id = campaign["queue"][0]
+                    self._step(campaign, {"op": "take", "contact_id": contact_id})
+                    await self._dial(campaign, device, contact_id)
+                await asyncio.sleep(campaign["wrap_up_seconds"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Campaigns] Campagne '{campaign['name']}' interrompue: {e}")
+            campaign["state"] = "paused"
+            campaign["last_error"] = getattr(e, "detail", None) or str(e)
+            self.save()
+        finally:
+            self._tasks.pop(campaign_id, None)
+
+    async def _wait_until_idle(self, device: "AdbDevice") -> None:
+        while True:
+            if not device.monitor.running:
+                await device.monitor.refresh()
+            state = device.monitor.latest or {}
+            if not device.call_info.get("contact_id") and not state.get("call_in_progress"):
+                return
+            await asyncio.sleep(CAMPAIGN_POLL_SECONDS)
+
+    async def _dial(
+        self, campaign: Dict[str, Any], device: "AdbDevice", contact_id: str
+    ) -> None:
+        contact = contact_store.get(contact_id)
+        if contact is None or not contact.get("phoneNumber"):
+            self._step(
+                campaign, {"op": "outcome", "contact_id": contact_id, "outcome": "skipped"}
+            )
+            return
+
+        self._step(
+            campaign,
+            {
+                "op": "dial",
+                "contact_id": contact_id,
+                "device": device.serial,
+                "at": time.time(),
+                "started_at": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+
+        try:
+            await make_call(
+                CallRequest(
+                    phone_number=contact["phoneNumber"],
+                    contact_id=contact_id,
+                    device=device.serial,
+                )
+            )
+        except HTTPException as e:
+            print(f"[Campaigns] Échec de l'appel vers {contact_id}: {e.detail}")
+            outcome = "dial_failed"
+        else:
+            try:
+                outcome = await self._await_call_end(campaign, device, contact_id)
+            except CampaignCallLostError:
+                self._step(
+                    campaign,
+                    {"op": "outcome", "contact_id": contact_id, "outcome": "interrupted"},
+                )
+                raise
+
+        self._step(campaign, {"op": "outcome", "contact_id": contact_id, "outcome": outcome})
+        event_broadcaster.publish(
+            {
+                "type": "campaign.call",
+                "campaign_id": campaign["id"],
+                "device": device.serial,
+                "contact_id": contact_id,
+                "outcome": outcome,
+                "attempt": campaign["attempts"][contact_id],
+            }
+        )
+
+    async def _await_call_end(
+        self, campaign: Dict[str, Any], device: "AdbDevice", contact_id: str
+    ) -> str:
+        """
+        Attend la fin de l'appel ; raccroche si personne ne décroche à temps.
+        L'appel n'est tenu pour terminé qu'une fois le téléphone vu en appel
+        (ou le délai de numérotation écoulé) puis revenu au repos, d'après des
+        sondages lancés après la numérotation. Lève CampaignCallLostError si
+        l'appareil ne donne plus d'état récent ou si l'appel dépasse la durée
+        maximale : l'attente ne peut pas durer indéfiniment.
+        """
+        dialed_at = device.call_info.get("dialed_at") or time.monotonic()
+        answered = False
+        active_seen = False
+        while True:
+            await asyncio.sleep(CAMPAIGN_POLL_SECONDS)
+            if not device.monitor.running:
+                await device.monitor.refresh()
+            state = device.monitor.latest or {}
+            fresh = state.get("probe_started_at", 0.0) >= dialed_at
+            if fresh and state.get("call_in_progress"):
+                active_seen = True
+                answered = answered or call_state_is_answered(state)
+            # L'appel suivi est libéré par la détection de fin d'appel (ou /adb/hangup)
+            if (
+                device.call_info.get("contact_id") != contact_id
+                and fresh
+                and not state.get("call_in_progress")
+                and (
+                    active_seen
+                    or time.monotonic() - dialed_at >= CALL_DIAL_GRACE_SECONDS
+                )
+            ):
+                return "answered" if answered else "no_answer"
+            if (
+                not answered
+                and time.monotonic() - dialed_at >= campaign["no_answer_timeout_seconds"]
+            ):
+                await adb_hangup_call(
+                    HangUpRequest(contact_id=contact_id, device=device.serial)
+                )
+                return "no_answer"
+            now = time.monotonic()
+            last_probe_at = max(state.get("probe_started_at", 0.0), dialed_at)
+            if now - last_probe_at >= CAMPAIGN_STALE_PROBE_SECONDS:
+                reason = f"Aucun état d'appel reçu de {device.label} depuis {now - last_probe_at:.0f} s"
+            elif now - dialed_at >= CAMPAIGN_MAX_CALL_SECONDS:
+                reason = f"Appel vers {contact_id} toujours en cours après {CAMPAIGN_MAX_CALL_SECONDS:.0f} s"
+            else:
+                continue
+            try:
+                await adb_hangup_call(
+                    HangUpRequest(contact_id=contact_id, device=device.serial)
+                )
+            except Exception as e:
+                print(f"[Campaigns] Raccrochage impossible ({device.label}): {getattr(e, 'detail', e)}")
+            raise CampaignCallLostError(reason)
+
+
+campaign_manager = CampaignManager(CAMPAIGNS_STATE_FILE)
+
+
+@app.post("/campaigns", summary="Créer une campagne d'appels automatiques")
+async def create_campaign(request: CampaignCreate):
+    campaign = campaign_manager.create(request)
+    return campaign_manager.summary(campaign)
+
+
+@app.get("/campaigns", summary="Lister les campagnes d'appels")
+async def list_campaigns():
+    return [
+        campaign_manager.summary(campaign)
+        for campaign in campaign_manager.campaigns.values()
+    ]
+
+
+@app.get("/campaigns/{campaign_id}", summary="État et débit d'une campagne")
+async def get_campaign(campaign_id: str):
+    return campaign_manager.summary(campaign_manager.get(campaign_id))
+
+
+@app.post("/campaigns/{campaign_id}/start", summary="Démarrer / reprendre une campagne")
+async def start_campaign(campaign_id: str):
+    return campaign_manager.summary(campaign_manager.start(campaign_id))
+
+
+@app.post("/campaigns/{campaign_id}/pause", summary="Mettre une campagne en pause")
+async def pause_campaign(campaign_id: str):
+    return campaign_manager.summary(campaign_manager.pause(campaign_id))
+
+
+@app.delete("/campaigns/{campaign_id}", status_code=204, summary="Supprimer une campagne")
+async def delete_campaign(campaign_id: str):
+    await campaign_manager.delete(campaign_id)
+    return
+
+
+@app.get("/calls/history", summary="Historique des appels (journal par jour)")
+async def get_call_history(
+    contact_id: Optional[str] = Query(None, description="Filtrer sur un contact"),
+    day: Optional[str] = Query(
+        None, pattern=r"^\d{4}-\d{2}-\d{2}$", description="Jour (AAAA-MM-JJ, heure de Paris)"
+    ),
+):
+    df = await asyncio.to_thread(call_history.read, contact_id, day)
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+@app.get("/analytics", summary="Statistiques des appels et des contacts")
+async def get_analytics(
+    day: Optional[str] = Query(
+        None,
+        pattern=r"^\d{4}-\d{2}-\d{2}$",
+        description="Jour des appels (AAAA-MM-JJ), aujourd'hui par défaut",
+    ),
+):
+    day = day or datetime.now(PARIS_TZ).date().isoformat()
+    return {
+        "contacts": await contact_analytics.summary(),
+        "calls": await call_analytics.summary(day),
+    }
+
+
+DURATION_QUERY_PATTERN = re.compile(r"^\s*(\d+)\s*([smhdj]?)\s*$")
+DURATION_QUERY_UNITS = {"s": 1, "m": 60, "": 60, "h": 3600, "d": 86400, "j": 86400}
+
+
+def parse_duration_query(value: str) -> timedelta:
+    """Durée de requête ("30s", "15m", "2h", "1d" ; minutes par défaut)."""
+    match = DURATION_QUERY_PATTERN.match(value or "")
+    if not match:
+        raise HTTPException(status_code=400, detail=f"Durée invalide: {value}")
+    return timedelta(seconds=int(match.group(1)) * DURATION_QUERY_UNITS[match.group(2)])
+
+
+@app.get("/callbacks/due", summary="Rappels et rendez-vous à venir")
+async def get_due_callbacks(
+    within: str = Query("15m", description="Horizon à partir de maintenant (ex: 15m, 2h, 1d)"),
+    overdue: str = Query("0m", description="Inclure aussi les échéances passées depuis (ex: 1h)"),
+    kind: Optional[str] = Query(
+        None, pattern="^(rappel|rendezVous)$", description="rappel ou rendezVous"
+    ),
+):
+    now = datetime.now(PARIS_TZ)
+    start = now - parse_duration_query(overdue)
+    end = now + parse_duration_query(within)
+    entries = contact_store.scheduled_between(start, end, f"{kind}At" if kind else None)
+    return {
+        "now": now.isoformat(),
+        "from": start.isoformat(),
+        "until": end.isoformat(),
+        "callbacks": [
+            {
+                "kind": field[: -len("At")],
+                "at": at.isoformat(),
+                "contact": contact_store.get_model(contact_id),
+            }
+            for at, contact_id, field in entries
+        ],
+    }
+
+
+@app.get(
+    "/contacts/by-phone/{number}",
+    response_model=List[ContactInDB],
+    summary="Retrouver les contacts associés à un numéro de téléphone",
+)
+async def get_contacts_by_phone(number: str):
+    contact_ids = contact_store.find_by_phone(number)
+    if not contact_ids:
+        raise HTTPException(
+            status_code=404, detail=f"Aucun contact trouvé pour le numéro {number}"
+        )
+    return [contact_store.get_model(contact_id) for contact_id in contact_ids]
+
+
 @app.get(
     "/contacts/{contact_id}",
     response_model=ContactInDB,
     summary="Récupérer un contact par son ID",
 )
 async def get_contact_by_id_endpoint(
+    request: Request,
+    response: Response,
     contact_id: str = FastAPIPath(
         ..., title="L'ID du contact à récupérer", min_length=1
-    )
+    ),
 ):
     print(
         f"[API GET /contacts/{{contact_id}}] Requête pour récupérer le contact ID: {contact_id}"
     )
-    contacts = get_cached_contacts()
-    for contact in contacts:
-        if contact.id == contact_id:
-            print(
-                f"[API GET /contacts/{{contact_id}}] Contact trouvé: {contact.firstName}"
+    contact = contact_store.get_model(contact_id)
+    if contact is not None:
+        etag = contact_store.row_etag(contact_id)
+        if etag_matches(request, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
             )
-            return contact
+        print(
+            f"[API GET /contacts/{{contact_id}}] Contact trouvé: {contact.firstName}"
+        )
+        response.headers["ETag"] = etag
+        return contact
     print(f"[API GET /contacts/{{contact_id}}] Contact ID: {contact_id} non trouvé.")
     raise HTTPException(
         status_code=404, detail=f"Contact avec ID {contact_id} non trouvé"
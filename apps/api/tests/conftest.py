@@ -0,0 +1,25 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("ADB_TRANSPORT", "binary")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def isolated_storage(tmp_path, monkeypatch):
+    """Stockage des contacts et historique des appels dans un dossier temporaire."""
+    journal = main.ContactJournal(
+        tmp_path / "journal.jsonl", tmp_path / "journal.compacting.jsonl"
+    )
+    monkeypatch.setattr(main, "CONTACTS_STORAGE_FILE", tmp_path / "contacts_storage.parquet")
+    monkeypatch.setattr(main, "contacts_journal", journal)
+    store = main.ContactStore(journal)
+    store._set_records([])
+    monkeypatch.setattr(main, "contact_store", store)
+    monkeypatch.setattr(main, "call_history", main.CallHistoryLog(tmp_path / "call_history"))
+    return store
@@ -0,0 +1,162 @@
+import asyncio
+import os
+
+import pytest
+
+import main
+
+
+class CountingProbe:
+    """Sonde simulée : compte ses exécutions et attend d'être libérée."""
+
+    def __init__(self, result="sortie", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_identical_probes_share_one_execution():
+    async def scenario():
+        coalescer = main.AdbProbeCoalescer(ttl_seconds=0)
+        probe, other = CountingProbe("a"), CountingProbe("b")
+        tasks = [asyncio.create_task(coalescer.run(("dumpsys",), probe)) for _ in range(5)]
+        tasks.append(asyncio.create_task(coalescer.run(("devices",), other)))
+        await asyncio.sleep(0)
+        probe.release.set()
+        other.release.set()
+        return await asyncio.gather(*tasks), probe.calls, other.calls
+
+    results, calls, other_calls = asyncio.run(scenario())
+    assert results == ["a"] * 5 + ["b"]
+    assert (calls, other_calls) == (1, 1)
+
+
+def test_result_is_reused_only_within_ttl():
+    async def scenario():
+        coalescer = main.AdbProbeCoalescer(ttl_seconds=0.05)
+        probe = CountingProbe()
+        probe.release.set()
+        await coalescer.run(("dumpsys",), probe)
+        await coalescer.run(("dumpsys",), probe)
+        cached_calls = probe.calls
+        await asyncio.sleep(0.1)
+        await coalescer.run(("dumpsys",), probe)
+        return cached_calls, probe.calls
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_cancelled_caller_does_not_cancel_shared_probe():
+    async def scenario():
+        coalescer = main.AdbProbeCoalescer(ttl_seconds=0)
+        probe = CountingProbe()
+        first = asyncio.create_task(coalescer.run(("dumpsys",), probe))
+        second = asyncio.create_task(coalescer.run(("dumpsys",), probe))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        probe.release.set()
+        return await second, first.cancelled(), probe.calls
+
+    assert asyncio.run(scenario()) == ("sortie", True, 1)
+
+
+def test_failure_is_shared_but_not_cached():
+    async def scenario():
+        coalescer = main.AdbProbeCoalescer(ttl_seconds=60)
+        failing = CountingProbe(error=OSError("adb absent"))
+        tasks = [asyncio.create_task(coalescer.run(("dumpsys",), failing)) for _ in range(2)]
+        await asyncio.sleep(0)
+        failing.release.set()
+        errors = await asyncio.gather(*tasks, return_exceptions=True)
+        retry = CountingProbe("ok")
+        retry.release.set()
+        return errors, failing.calls, await coalescer.run(("dumpsys",), retry)
+
+    errors, calls, retried = asyncio.run(scenario())
+    assert [str(error) for error in errors] == ["adb absent", "adb absent"]
+    assert calls == 1
+    assert retried == "ok"
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    """Exécutable adb simulé en tête du PATH, dont le script est fourni par le test."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+
+    def install(script):
+        adb = bin_dir / "adb"
+        adb.write_text("#!/bin/sh\n" + script)
+        adb.chmod(0o755)
+
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return install
+
+
+def test_run_adb_command_returns_output_without_blocking_the_loop(fake_adb):
+    fake_adb('sleep 0.3; echo "adb $*"\n')
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            output = await main.run_adb_command(["devices"], serial="R58A")
+        finally:
+            ticking.cancel()
+        return output, ticks
+
+    output, ticks = asyncio.run(scenario())
+    assert output == "adb -s R58A devices"
+    assert ticks >= 5
+
+
+def test_run_adb_command_reports_failure_as_http_error(fake_adb):
+    fake_adb('echo "error: no devices/emulators found" >&2; exit 1\n')
+
+    with pytest.raises(main.HTTPException) as exc_info:
+        asyncio.run(main.run_adb_command(["devices"]))
+    assert exc_info.value.status_code == 500
+    assert "no devices/emulators found" in exc_info.value.detail
+
+
+def test_run_adb_command_times_out_and_kills_adb(fake_adb, tmp_path):
+    pid_file = tmp_path / "adb.pid"
+    fake_adb(f'echo $$ > {pid_file}; exec sleep 30\n')
+
+    with pytest.raises(main.HTTPException, match="Timeout"):
+        asyncio.run(main.run_adb_command(["reboot"], timeout_seconds=0.3))
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+
+
+def test_cancelled_adb_process_is_killed(fake_adb, tmp_path):
+    pid_file = tmp_path / "adb.pid"
+    fake_adb(f'echo $$ > {pid_file}; exec sleep 30\n')
+
+    async def scenario():
+        task = asyncio.create_task(main.run_adb_process(["wait-for-device"], 30))
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
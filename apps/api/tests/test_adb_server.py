@@ -0,0 +1,219 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+class FakeAdbServer:
+    """
+    Serveur adb simulé (protocole smart-socket) : host:devices,
+    host:transport:<série> / host:transport-any puis shell,raw:, les
+    commandes du shell étant exécutées par /bin/sh en local.
+    drop_shells : nombre de sessions shell coupées dès réception de la
+    première commande (appareil débranché en cours de commande).
+    """
+
+    def __init__(self, devices, drop_shells=0):
+        self.devices = devices
+        self.drop_shells = drop_shells
+        self.commands = []
+        self.requests = []
+        self.server = None
+        self.port = None
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    async def _okay(writer, payload=None):
+        writer.write(b"OKAY")
+        if payload is not None:
+            writer.write(b"%04x" % len(payload) + payload)
+        await writer.drain()
+
+    @staticmethod
+    async def _fail(writer, message):
+        data = message.encode("utf-8")
+        writer.write(b"FAIL" + b"%04x" % len(data) + data)
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        serial = None
+        try:
+            while True:
+                length = int(await reader.readexactly(4), 16)
+                request = (await reader.readexactly(length)).decode("utf-8")
+                self.requests.append(request)
+                if request == "host:devices":
+                    listing = "".join(f"{s}\t{state}\n" for s, state in self.devices)
+                    await self._okay(writer, listing.encode("utf-8"))
+                    return
+                if request == "host:transport-any":
+                    if not self.devices:
+                        await self._fail(writer, "no devices/emulators found")
+                        return
+                    serial = self.devices[0][0]
+                    await self._okay(writer)
+                elif request.startswith("host:transport:"):
+                    serial = request[len("host:transport:"):]
+                    if serial not in dict(self.devices):
+                        await self._fail(writer, f"device '{serial}' not found")
+                        return
+                    await self._okay(writer)
+                elif request.startswith("shell,raw:") and serial is not None:
+                    await self._okay(writer)
+                    if self.drop_shells:
+                        self.drop_shells -= 1
+                        self.commands.append(await reader.readline())
+                        return
+                    await self._shell(request[len("shell,raw:"):], reader, writer)
+                    return
+                else:
+                    await self._fail(writer, f"unknown service: {request}")
+                    return
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _shell(command, reader, writer):
+        process = await asyncio.create_subprocess_exec(
+            "/bin/sh",
+            *(["-c", command] if command else []),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+
+        async def pump_stdin():
+            while data := await reader.read(4096):
+                process.stdin.write(data)
+                await process.stdin.drain()
+            process.stdin.close()
+
+        stdin_task = asyncio.create_task(pump_stdin())
+        try:
+            while data := await process.stdout.read(4096):
+                writer.write(data)
+                await writer.drain()
+            await process.wait()
+        finally:
+            stdin_task.cancel()
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+
+DEVICES = [("R58A", "device"), ("EMU1", "offline")]
+
+
+def test_devices_lists_serials_and_states():
+    async def scenario():
+        async with FakeAdbServer(DEVICES) as server:
+            client = main.AdbServerClient("127.0.0.1", server.port)
+            return await client.devices()
+
+    assert asyncio.run(scenario()) == DEVICES
+
+
+def test_open_service_selects_device_then_streams_output():
+    async def scenario():
+        async with FakeAdbServer(DEVICES) as server:
+            client = main.AdbServerClient("127.0.0.1", server.port)
+            reader, writer = await client.open_service("R58A", "shell,raw:echo bonjour")
+            try:
+                output = await reader.read()
+            finally:
+                writer.close()
+            return output, server.requests
+
+    output, requests = asyncio.run(scenario())
+    assert output == b"bonjour\n"
+    assert requests == ["host:transport:R58A", "shell,raw:echo bonjour"]
+
+
+def test_open_service_raises_on_fail_response():
+    async def scenario():
+        async with FakeAdbServer(DEVICES) as server:
+            client = main.AdbServerClient("127.0.0.1", server.port)
+            await client.open_service("NOPE", "shell,raw:")
+
+    with pytest.raises(main.AdbProtocolError, match="device 'NOPE' not found"):
+        asyncio.run(scenario())
+
+
+def test_shell_session_round_trips_commands_over_server(monkeypatch):
+    monkeypatch.setattr(main, "ADB_TRANSPORT", "server")
+
+    async def scenario():
+        async with FakeAdbServer(DEVICES) as server:
+            monkeypatch.setattr(
+                main, "adb_server_client", main.AdbServerClient("127.0.0.1", server.port)
+            )
+            session = main.AdbShellSession("R58A")
+            try:
+                first = await session.run("echo un; echo deux")
+                second = await session.run("printf sans-fin-de-ligne")
+                failed = await session.run("echo oups; (exit 3)")
+            finally:
+                await session.close()
+            return first, second, failed, server.requests
+
+    first, second, failed, requests = asyncio.run(scenario())
+    assert first == (0, b"un\ndeux\n", b"")
+    assert second == (0, b"sans-fin-de-ligne", b"")
+    assert failed == (3, b"oups\n", b"oups\n")
+    # Une seule connexion pour les trois commandes
+    assert requests == ["host:transport:R58A", "shell,raw:"]
+
+
+def test_shell_session_reports_unknown_device(monkeypatch):
+    monkeypatch.setattr(main, "ADB_TRANSPORT", "server")
+
+    async def scenario():
+        async with FakeAdbServer(DEVICES) as server:
+            monkeypatch.setattr(
+                main, "adb_server_client", main.AdbServerClient("127.0.0.1", server.port)
+            )
+            session = main.AdbShellSession("NOPE")
+            try:
+                return await session.run("echo jamais")
+            finally:
+                await session.close()
+
+    returncode, stdout, stderr = asyncio.run(scenario())
+    assert returncode == 1
+    assert stdout == b""
+    assert b"device 'NOPE' not found" in stderr
+
+
+def test_shell_session_does_not_resend_command_lost_mid_flight(monkeypatch):
+    monkeypatch.setattr(main, "ADB_TRANSPORT", "server")
+
+    async def scenario():
+        async with FakeAdbServer(DEVICES, drop_shells=1) as server:
+            monkeypatch.setattr(
+                main, "adb_server_client", main.AdbServerClient("127.0.0.1", server.port)
+            )
+            session = main.AdbShellSession("R58A")
+            try:
+                lost = await session.run("am start -a android.intent.action.CALL -d tel:0612345678")
+                # La session suivante est rouverte normalement
+                after = await session.run("echo retour")
+            finally:
+                await session.close()
+            return lost, after, server.commands, server.requests
+
+    lost, after, commands, requests = asyncio.run(scenario())
+    assert lost[0] == 1
+    assert len(commands) == 1 and commands[0].startswith(b"am start")
+    assert after == (0, b"retour\n", b"")
+    assert requests.count("shell,raw:") == 2
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timezone
+
+import main
+
+
+def create_contacts(store):
+    rows = [
+        ("c1", "DO", "02:10"),
+        ("c2", "DO", None),  # Converti sans appel enregistré (import, saisie manuelle)
+        ("c3", "RO", None),
+        ("c4", "NRP", "00:30"),
+    ]
+    for contact_id, status, duration in rows:
+        store.create(
+            main.ContactInDB(
+                id=contact_id,
+                firstName=contact_id,
+                lastName="Test",
+                status=status,
+                source="salon",
+                dureeAppel=duration,
+            )
+        )
+
+
+def test_conversion_rate_only_counts_called_contacts(isolated_storage):
+    create_contacts(isolated_storage)
+
+    summary = asyncio.run(main.ContactAnalytics(isolated_storage).summary())
+
+    assert summary["called_contacts"] == 2
+    assert summary["converted_contacts"] == 1
+    (salon,) = summary["by_source"]
+    assert salon == {
+        "source": "salon",
+        "contacts": 4,
+        "called": 2,
+        "converted": 1,
+        "conversion_rate": 0.5,
+    }
+    by_status = {row["status"]: row for row in summary["by_status"]}
+    assert by_status["DO"]["avg_duration_seconds"] == 130.0
+    assert by_status["RO"]["avg_duration_seconds"] is None
+
+
+def test_contact_counters_follow_mutations_without_full_recompute(
+    isolated_storage, monkeypatch
+):
+    create_contacts(isolated_storage)
+    analytics = main.ContactAnalytics(isolated_storage)
+    asyncio.run(analytics.summary())
+
+    def no_full_recompute(rows):
+        raise AssertionError("recalcul complet inattendu")
+
+    monkeypatch.setattr(analytics, "_aggregate", no_full_recompute)
+    isolated_storage.update("c2", {"dureeAppel": "01:00"})
+    isolated_storage.update("c4", {"status": "DO"})
+    isolated_storage.delete("c3")
+
+    summary = asyncio.run(analytics.summary())
+    assert summary["total_contacts"] == 3
+    (salon,) = summary["by_source"]
+    assert (salon["called"], salon["converted"], salon["conversion_rate"]) == (3, 3, 1.0)
+    assert [row["status"] for row in summary["by_status"]] == ["DO"]
+
+
+def test_call_counters_are_updated_from_recorded_calls(isolated_storage, monkeypatch):
+    analytics = main.CallAnalytics(main.call_history)
+    day = "2026-03-10"
+    end = datetime(2026, 3, 10, 9, 15, tzinfo=timezone.utc)  # 10h à Paris
+
+    def record(outcome, duration, device="R58A"):
+        main.call_history.append(
+            {
+                "contact_id": "c1",
+                "device": device,
+                "start": end.isoformat(),
+                "end": end.isoformat(),
+                "duration_seconds": duration,
+                "outcome": outcome,
+                "end_reason": "manual_hangup",
+            },
+            end,
+        )
+
+    record("answered", 60)
+    assert asyncio.run(analytics.summary(day))["total_calls"] == 1
+
+    reads = []
+    original_read = main.call_history.read_with_version
+    monkeypatch.setattr(
+        main.call_history,
+        "read_with_version",
+        lambda *args, **kwargs: reads.append(1) or original_read(*args, **kwargs),
+    )
+    record("answered", 120)
+    record("no_answer", None, device=None)
+
+    summary = asyncio.run(analytics.summary(day))
+    assert reads == []  # Partition non relue
+    assert summary["total_calls"] == 3
+    assert summary["answered_calls"] == 2
+    assert summary["avg_duration_seconds"] == 90.0
+    assert summary["calls_per_hour"][10] == {"hour": 10, "calls": 3, "answered": 2}
+    assert summary["by_outcome"] == {"answered": 2, "no_answer": 1}
+    assert summary["by_device"] == [
+        {"device": "R58A", "calls": 2, "answered": 2, "avg_duration_seconds": 90.0},
+        {"device": "default", "calls": 1, "answered": 0, "avg_duration_seconds": None},
+    ]
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+REGISTRY_OFFHOOK = b"""Last Known State:
+  mCallState=2
+  mRingingCallState=0
+"""
+TELECOM_ACTIVE = b"""Call state:
+  Call id=TC@3, state=ACTIVE, handle=tel:+33612345678, video state=0
+  Call id=TC@2, state=DISCONNECTED, handle=tel:+33698765432
+"""
+
+
+def probe_outputs(registry, telecom):
+    async def fake_probe(command_parts, timeout_seconds=10, serial=None):
+        return 0, {"telephony.registry": registry, "telecom": telecom}[command_parts[-1]], b""
+
+    return fake_probe
+
+
+def call_state(active, probe_started_at, answered=False):
+    return {
+        "call_in_progress": active,
+        "mCallState": 2 if active else 0,
+        "detection_method": "test",
+        "telecom_dump_calls": ["Call id=TC@3, state=ACTIVE"] if answered else [],
+        "probe_started_at": probe_started_at,
+    }
+
+
+@pytest.fixture
+def device(isolated_storage):
+    isolated_storage.create(main.ContactInDB(id="c1", firstName="Ada", lastName="Lovelace"))
+    adb_device = main.AdbDevice("R58A")
+    adb_device.call_info = {
+        "contact_id": "c1",
+        "start_time_iso": datetime.now(timezone.utc).isoformat(),
+        "answered": False,
+        "dialed_at": time.monotonic(),
+        "active_seen": False,
+    }
+    return adb_device
+
+
+def test_probe_merges_registry_and_telecom(monkeypatch):
+    monkeypatch.setattr(main, "run_adb_probe", probe_outputs(REGISTRY_OFFHOOK, TELECOM_ACTIVE))
+
+    state = asyncio.run(main.probe_call_state("R58A"))
+    assert state["call_in_progress"] is True
+    assert state["mCallState"] == 2
+    assert state["telecom_dump_calls"] == [
+        "Call id=TC@3, state=ACTIVE, handle=tel:+33612345678, video state=0"
+    ]
+    assert state["detected_phone_number"] == "+33612345678"
+    assert main.call_state_is_answered(state)
+
+
+def test_probe_prefers_registry_idle_over_stale_telecom(monkeypatch):
+    monkeypatch.setattr(
+        main, "run_adb_probe", probe_outputs(b"  mCallState=0\n", TELECOM_ACTIVE)
+    )
+
+    state = asyncio.run(main.probe_call_state("R58A"))
+    assert state["call_in_progress"] is False
+    assert state["detection_conflict"] is True
+    assert state["detected_phone_number"] is None
+
+
+def test_call_status_serves_cached_state_without_probing(isolated_storage, monkeypatch):
+    isolated_storage.create(
+        main.ContactInDB(id="c1", firstName="Ada", lastName="L", phoneNumber="06 12 34 56 78")
+    )
+    registry = main.AdbDeviceRegistry()
+    adb_device = registry.default()
+    adb_device.monitor.latest = {
+        **call_state(True, time.monotonic()),
+        "detected_phone_number": "+33612345678",
+    }
+    adb_device.monitor.updated_at = time.monotonic()
+    monkeypatch.setattr(main, "adb_devices", registry)
+    monkeypatch.setattr(main.CallStateMonitor, "running", property(lambda self: True))
+
+    async def no_probe(*args, **kwargs):
+        raise AssertionError("/call/status ne doit pas sonder l'appareil")
+
+    monkeypatch.setattr(main, "run_adb_probe", no_probe)
+
+    body = TestClient(main.app).get("/call/status").json()
+    assert body["status"] == "success"
+    assert body["call_in_progress"] is True
+    assert body["detected_contact_ids"] == ["c1"]
+    assert body["state_age_ms"] is not None
+
+
+def test_probe_started_before_dial_is_ignored(device):
+    # Même passé le délai de grâce, un sondage antérieur ne termine pas l'appel
+    device.call_info["dialed_at"] -= main.CALL_DIAL_GRACE_SECONDS + 1
+    dialed_at = device.call_info["dialed_at"]
+
+    assert main.apply_call_state_transition(call_state(False, dialed_at - 1), device) is None
+    assert device.call_info["contact_id"] == "c1"
+
+
+def test_idle_within_dial_grace_is_not_a_hangup(device):
+    state = call_state(False, time.monotonic())
+
+    assert main.apply_call_state_transition(state, device) is None
+    assert device.call_info["contact_id"] == "c1"
+
+
+def test_hangup_recorded_once_call_was_seen_active(device):
+    assert main.apply_call_state_transition(
+        call_state(True, time.monotonic(), answered=True), device
+    ) is None
+    assert device.call_info["active_seen"] and device.call_info["answered"]
+
+    updated = main.apply_call_state_transition(call_state(False, time.monotonic()), device)
+    assert updated["id"] == "c1"
+    assert updated["isCurrentlyInCall"] is False
+    assert device.call_info["contact_id"] is None
+    calls = main.call_history.read(contact_id="c1")
+    assert calls["outcome"].tolist() == ["answered"]
+    assert calls["end_reason"].tolist() == ["manual_hangup"]
+
+
+def test_idle_after_dial_grace_is_an_unanswered_hangup(device):
+    device.call_info["dialed_at"] -= main.CALL_DIAL_GRACE_SECONDS + 1
+
+    updated = main.apply_call_state_transition(call_state(False, time.monotonic()), device)
+    assert updated["id"] == "c1"
+    assert main.call_history.read(contact_id="c1")["outcome"].tolist() == ["no_answer"]
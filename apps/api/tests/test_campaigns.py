@@ -0,0 +1,171 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import main
+
+
+IDLE, DIALING, ANSWERED = "idle", "dialing", "answered"
+
+
+class FakePhone:
+    """
+    Téléphone simulé : l'état d'appel dépend du temps écoulé depuis la
+    numérotation, selon une chronologie [(secondes, état), ...].
+    """
+
+    def __init__(self, timeline, probe_latency=0.02, unplug_after=None):
+        self.timeline = timeline
+        self.probe_latency = probe_latency
+        # Secondes après la numérotation au bout desquelles l'appareil ne répond plus
+        self.unplug_after = unplug_after
+        self.dialed_at = None
+
+    def state_at(self, moment):
+        if self.dialed_at is None:
+            return IDLE
+        state = IDLE
+        for offset, phase in self.timeline:
+            if moment - self.dialed_at >= offset:
+                state = phase
+        return state
+
+    async def run_adb_shell(self, parts, serial=None, timeout_seconds=None):
+        if parts[:2] == ["am", "start"]:
+            self.dialed_at = time.monotonic()
+        return 0, b"", b""
+
+    async def probe_call_state(self, serial=None, latency=None):
+        started = time.monotonic()
+        await asyncio.sleep(self.probe_latency if latency is None else latency)
+        if (
+            self.unplug_after is not None
+            and self.dialed_at is not None
+            and started - self.dialed_at >= self.unplug_after
+        ):
+            raise OSError("device 'FAKE' not found")
+        phase = self.state_at(started)
+        return {
+            "call_in_progress": phase != IDLE,
+            "mCallState": 0 if phase == IDLE else 2,
+            "detection_method": "fake",
+            "telecom_dump_calls": (
+                [f"Call id=TC@1, state={'ACTIVE' if phase == ANSWERED else 'DIALING'}"]
+                if phase != IDLE
+                else []
+            ),
+            "probe_started_at": started,
+        }
+
+
+@pytest.fixture
+def campaign_env(isolated_storage, tmp_path, monkeypatch):
+    def setup(timeline):
+        phone = FakePhone(timeline)
+        monkeypatch.setattr(main, "run_adb_shell", phone.run_adb_shell)
+        monkeypatch.setattr(main, "probe_call_state", phone.probe_call_state)
+        monkeypatch.setattr(main, "adb_probe_coalescer", main.AdbProbeCoalescer(0))
+        monkeypatch.setattr(main, "CAMPAIGN_POLL_SECONDS", 0.02)
+        monkeypatch.setattr(main, "CALL_DIAL_GRACE_SECONDS", 0.5)
+        registry = main.AdbDeviceRegistry()
+        device = registry._register("FAKE")
+        monkeypatch.setattr(main, "adb_devices", registry)
+        contact = isolated_storage.create(
+            main.ContactInDB(
+                id="c1", firstName="Ada", lastName="Lovelace", phoneNumber="0612345678"
+            )
+        )
+        manager = main.CampaignManager(tmp_path / "campaigns.json")
+        campaign = manager.create(
+            main.CampaignCreate(name="test", device="FAKE", autostart=False)
+        )
+        return phone, device, manager, campaign, contact["id"]
+
+    return setup
+
+
+def test_campaign_call_waits_for_active_then_idle(campaign_env):
+    phone, device, manager, campaign, contact_id = campaign_env(
+        [(0.1, DIALING), (0.2, ANSWERED), (0.5, IDLE)]
+    )
+
+    async def scenario():
+        # Sondage lent lancé avant la numérotation : il revient "au repos"
+        # alors que l'appel est déjà suivi et ne doit pas le terminer.
+        stale_probe = asyncio.create_task(device.monitor.refresh())
+        await asyncio.sleep(0)
+        phone.probe_latency = 0.02
+        started = time.monotonic()
+        campaign["queue"].remove(contact_id)
+        dial = asyncio.create_task(manager._dial(campaign, device, contact_id))
+        await stale_probe
+        assert device.call_info["contact_id"] == contact_id
+        await dial
+        return time.monotonic() - started
+
+    phone.probe_latency = 0.3
+    elapsed = asyncio.run(scenario())
+
+    assert campaign["outcomes"][contact_id] == "answered"
+    assert elapsed >= 0.5
+    assert campaign["queue"] == []
+    history = main.call_history.read(contact_id=contact_id)
+    assert history["outcome"].tolist() == ["answered"]
+    assert history["end_reason"].tolist() == ["manual_hangup"]
+    assert main.contact_store.get(contact_id)["isCurrentlyInCall"] is False
+
+
+def test_campaign_call_never_connected_ends_after_grace(campaign_env):
+    phone, device, manager, campaign, contact_id = campaign_env([])
+    campaign["queue"].remove(contact_id)
+
+    started = time.monotonic()
+    asyncio.run(manager._dial(campaign, device, contact_id))
+
+    assert time.monotonic() - started >= main.CALL_DIAL_GRACE_SECONDS
+    assert campaign["outcomes"][contact_id] == "no_answer"
+    assert campaign["queue"] == [contact_id]  # Nouvelle tentative planifiée
+
+
+def test_campaign_pauses_when_device_stops_reporting(campaign_env, monkeypatch):
+    monkeypatch.setattr(main, "CAMPAIGN_STALE_PROBE_SECONDS", 0.3)
+    phone, device, manager, campaign, contact_id = campaign_env([(0.05, ANSWERED)])
+    phone.unplug_after = 0.2
+    campaign["state"] = "running"
+
+    started = time.monotonic()
+    asyncio.run(asyncio.wait_for(manager._run(campaign["id"]), timeout=5))
+
+    assert time.monotonic() - started < 2
+    assert campaign["state"] == "paused"
+    assert "Aucun état d'appel" in campaign["last_error"]
+    assert campaign["outcomes"][contact_id] == "interrupted"
+    assert campaign["queue"] == [contact_id]
+
+
+def test_campaign_steps_are_appended_then_replayed(campaign_env):
+    phone, device, manager, campaign, contact_id = campaign_env([])
+    snapshot = manager.state_file.read_text(encoding="utf-8")
+
+    manager._step(campaign, {"op": "take", "contact_id": contact_id})
+    asyncio.run(manager._dial(campaign, device, contact_id))
+
+    # Seul le journal des étapes a été écrit pendant l'appel
+    assert manager.state_file.read_text(encoding="utf-8") == snapshot
+    log = manager.log_file.read_text(encoding="utf-8")
+    assert [json.loads(line)["op"] for line in log.splitlines()] == ["take", "dial", "outcome"]
+
+    reloaded = main.CampaignManager(manager.state_file)
+    reloaded.load()
+    restored = reloaded.campaigns[campaign["id"]]
+    for key in ("queue", "attempts", "outcomes", "current", "dials"):
+        assert restored[key] == campaign[key]
+    assert not manager.log_file.exists()  # Replié dans l'instantané
+
+    # Arrêt entre l'instantané et la purge du journal : les étapes ne sont pas rejouées deux fois
+    manager.log_file.write_text(log, encoding="utf-8")
+    again = main.CampaignManager(manager.state_file)
+    again.load()
+    assert again.campaigns[campaign["id"]]["attempts"] == {contact_id: 1}
@@ -0,0 +1,71 @@
+from collections import deque
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(isolated_storage):
+    for i in range(3):
+        isolated_storage.create(main.ContactInDB(id=f"c{i}", firstName=f"P{i}", lastName="Test"))
+    return TestClient(main.app)
+
+
+def changes(client, since, epoch=None):
+    params = {"since": since, **({"epoch": epoch} if epoch else {})}
+    response = client.get("/contacts/changes", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_changes_since_version_returns_only_the_delta(client, isolated_storage):
+    since = isolated_storage.version
+    isolated_storage.update("c1", {"status": "Rappel"})
+    isolated_storage.update("c1", {"comment": "rappeler lundi"})
+    isolated_storage.delete("c2")
+    isolated_storage.create(main.ContactInDB(id="c3", firstName="P3", lastName="Test"))
+
+    body = changes(client, since, isolated_storage.epoch)
+    assert body["resync_required"] is False
+    assert body["version"] == isolated_storage.version
+    assert [(c["id"], c["status"]) for c in body["upserted"]] == [("c3", None), ("c1", "Rappel")]
+    assert body["deleted"] == ["c2"]
+
+    assert changes(client, body["version"], body["epoch"])["upserted"] == []
+
+
+def test_created_then_deleted_contact_is_reported_deleted(client, isolated_storage):
+    since = isolated_storage.version
+    isolated_storage.create(main.ContactInDB(id="tmp", firstName="T", lastName="Test"))
+    isolated_storage.delete("tmp")
+
+    body = changes(client, since)
+    assert body["upserted"] == []
+    assert body["deleted"] == ["tmp"]
+
+
+def test_resync_required_when_version_left_the_change_log(client, isolated_storage):
+    isolated_storage._change_log = deque(isolated_storage._change_log, maxlen=2)
+    since = isolated_storage.version
+    for status in ("A", "B", "C"):
+        isolated_storage.update("c0", {"status": status})
+
+    assert changes(client, since)["resync_required"] is True
+    assert changes(client, isolated_storage.version - 1)["resync_required"] is False
+
+
+@pytest.mark.parametrize("case", ["other-epoch", "future", "reload"])
+def test_resync_required_after_restart_or_unknown_version(client, isolated_storage, case):
+    since, epoch = isolated_storage.version, isolated_storage.epoch
+    if case == "other-epoch":
+        epoch = "deadbeef"
+    elif case == "future":
+        since += 10
+    else:
+        isolated_storage.load()
+
+    body = changes(client, since, epoch)
+    assert body["resync_required"] is True
+    assert body["epoch"] == isolated_storage.epoch
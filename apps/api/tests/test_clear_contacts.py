@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import time
+
+import main
+
+
+def test_clear_waits_for_compaction_off_the_event_loop(isolated_storage):
+    isolated_storage.create(main.ContactInDB(id="c1", firstName="Ada", lastName="Lovelace"))
+    locked = threading.Event()
+
+    def compaction():
+        # Réécriture du Parquet simulée : verrou du fichier de base tenu dans un thread
+        with main.CONTACTS_STORAGE_LOCK:
+            locked.set()
+            time.sleep(0.3)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        worker = threading.Thread(target=compaction)
+        worker.start()
+        locked.wait()
+        beat = asyncio.create_task(heartbeat())
+        response = await main.clear_all_contacts()
+        beat.cancel()
+        worker.join()
+        return response, ticks
+
+    response, ticks = asyncio.run(scenario())
+    assert response.status_code == 204
+    assert ticks >= 10  # La boucle a continué de tourner pendant l'attente du verrou
+    assert len(isolated_storage) == 0
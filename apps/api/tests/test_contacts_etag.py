@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(isolated_storage):
+    for contact_id, first_name in [("c1", "Jean"), ("c2", "Ada")]:
+        isolated_storage.create(
+            main.ContactInDB(id=contact_id, firstName=first_name, lastName="Test")
+        )
+    return TestClient(main.app)
+
+
+def test_list_etag_depends_on_query_and_media_type(client):
+    full = client.get("/contacts")
+    filtered = client.get("/contacts", params={"q": "jean"})
+    page = client.get("/contacts", params={"limit": 1})
+    ndjson = client.get("/contacts", headers={"Accept": main.NDJSON_MEDIA_TYPE})
+
+    etags = {r.headers["ETag"] for r in (full, filtered, page, ndjson)}
+    assert len(etags) == 4
+
+    # L'ETag de la liste complète ne valide pas la page filtrée
+    response = client.get(
+        "/contacts", params={"q": "jean"}, headers={"If-None-Match": full.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()] == ["c1"]
+
+
+def test_list_etag_ignores_equivalent_query_spellings(client):
+    first = client.get("/contacts", params={"q": "Jean", "fields": "firstName,lastName"})
+    response = client.get(
+        "/contacts",
+        params={"q": " jéan ", "fields": "lastName,firstName"},
+        headers={"If-None-Match": first.headers["ETag"]},
+    )
+    assert response.status_code == 304
+
+
+def test_list_etag_changes_after_mutation(client, isolated_storage):
+    first = client.get("/contacts", params={"q": "jean"})
+    isolated_storage.delete("c2")
+    response = client.get(
+        "/contacts", params={"q": "jean"}, headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    plugged = ["R58A"]
+
+    async def fake_probe(command_parts, timeout_seconds=10, serial=None):
+        assert command_parts == ["devices"]
+        listing = "List of devices attached\n" + "".join(f"{s}\tdevice\n" for s in plugged)
+        return 0, (listing + "EMU1\toffline\n").encode("utf-8"), b""
+
+    monkeypatch.setattr(main, "run_adb_probe", fake_probe)
+    monkeypatch.setattr(main, "ADB_DEVICE_ALIASES", {"pro": "R58B"})
+    adb_devices = main.AdbDeviceRegistry()
+    adb_devices.plugged = plugged
+    monkeypatch.setattr(main, "adb_devices", adb_devices)
+    return adb_devices
+
+
+def resolve(registry, device=None, sim=None):
+    return asyncio.run(registry.resolve(device, sim))
+
+
+def test_discovery_registers_only_online_devices(registry):
+    assert asyncio.run(registry.discover()) == ["R58A"]
+    assert [d.serial for d in registry] == ["R58A"]
+    assert resolve(registry).serial == "R58A"
+
+
+def test_devices_are_resolved_by_serial_alias_or_late_discovery(registry):
+    assert resolve(registry, device="R58A") is resolve(registry, device="R58A")
+    assert resolve(registry, sim="pro").serial == "R58B"
+
+    registry.plugged.append("R58C")  # Branché après la découverte
+    assert resolve(registry, device="R58C").serial == "R58C"
+
+
+@pytest.mark.parametrize("selector", [{"device": "NOPE"}, {"sim": "perso"}])
+def test_unknown_selector_is_rejected_without_registering(registry, selector):
+    with pytest.raises(HTTPException) as exc_info:
+        resolve(registry, **selector)
+    assert exc_info.value.status_code == 404
+    assert registry.get("NOPE") is None and registry.get("perso") is None
+    assert "EMU1" not in [d.serial for d in registry]
+
+
+def test_call_status_for_unknown_device_is_404(registry):
+    response = TestClient(main.app).get("/call/status", params={"device": "NOPE"})
+    assert response.status_code == 404
+    # Seule la découverte a enregistré un appareil (le téléphone branché)
+    assert [d.serial for d in registry] == ["R58A"]
+
+
+def test_call_sessions_are_tracked_per_device(registry):
+    first = resolve(registry, device="R58A")
+    second = resolve(registry, sim="pro")
+    first.call_info = {"contact_id": "c1", "start_time_iso": None}
+    second.call_info = {"contact_id": "c2", "start_time_iso": None}
+
+    assert registry.find_by_contact("c1") is first
+    assert registry.find_by_contact("c2") is second
+    first.reset_call_info()
+    assert registry.find_by_contact("c1") is None
+    assert second.call_info["contact_id"] == "c2"
@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(isolated_storage):
+    isolated_storage.create(
+        main.ContactInDB(id="jean", firstName="Jean", lastName="Dupont", email="Jean.Dupont@X.fr")
+    )
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"firstName": "Marie", "lastName": "Curie", "email": "jean.dupont@x.fr"},
+        {"firstName": "Marie", "lastName": "Curie", "email": "  JEAN.DUPONT@X.FR "},
+        {"firstName": "jean", "lastName": "DUPONT"},
+        {"firstName": " Jean ", "lastName": "Dupont  "},
+    ],
+    ids=["email-case", "email-spaces", "name-case", "name-spaces"],
+)
+def test_create_rejects_duplicates_ignoring_case_and_spaces(client, payload):
+    response = client.post("/contacts", json=payload)
+    assert response.status_code == 409
+
+
+def test_create_accepts_distinct_contact(client):
+    response = client.post(
+        "/contacts", json={"firstName": "Jean", "lastName": "Durand", "email": "jean@x.fr"}
+    )
+    assert response.status_code == 200
+
+
+def test_update_rejects_email_of_another_contact(client, isolated_storage):
+    isolated_storage.create(main.ContactInDB(id="marie", firstName="Marie", lastName="Curie"))
+
+    response = client.patch("/contacts/marie", json={"email": "JEAN.dupont@x.fr"})
+    assert response.status_code == 409
+    # Changer la casse de son propre email n'est pas un doublon
+    response = client.patch("/contacts/jean", json={"email": "jean.dupont@x.fr"})
+    assert response.status_code == 200
+
+
+def test_indexes_follow_renames_and_deletions(client, isolated_storage):
+    isolated_storage.update("jean", {"firstName": "Jeanne", "email": "jeanne@x.fr"})
+    assert client.post(
+        "/contacts", json={"firstName": "Jean", "lastName": "Dupont", "email": "jean.dupont@x.fr"}
+    ).status_code == 200
+    assert client.post(
+        "/contacts", json={"firstName": "Marie", "lastName": "Curie", "email": "JEANNE@x.fr"}
+    ).status_code == 409
+
+    isolated_storage.delete("jean")
+    assert client.post(
+        "/contacts", json={"firstName": "Jeanne", "lastName": "Dupont", "email": "jeanne@x.fr"}
+    ).status_code == 200
@@ -0,0 +1,45 @@
+import asyncio
+
+import main
+
+
+def count_dumps(monkeypatch):
+    dumps = []
+    original = main.ContactInDB.model_dump
+
+    def counting_dump(self, *args, **kwargs):
+        dumps.append(self.id)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(main.ContactInDB, "model_dump", counting_dump)
+    return dumps
+
+
+def test_mutations_are_not_serialized_without_subscribers(isolated_storage, monkeypatch):
+    broadcaster = main.EventBroadcaster()
+    isolated_storage.add_listener(broadcaster.publish)
+    isolated_storage.create(main.ContactInDB(id="c1", firstName="Ada", lastName="Lovelace"))
+    dumps = count_dumps(monkeypatch)
+
+    isolated_storage.update("c1", {"status": "DO"})
+
+    assert dumps == []
+
+
+def test_mutation_is_serialized_once_per_fan_out(isolated_storage, monkeypatch):
+    broadcaster = main.EventBroadcaster()
+    isolated_storage.add_listener(broadcaster.publish)
+    isolated_storage.create(main.ContactInDB(id="c1", firstName="Ada", lastName="Lovelace"))
+
+    async def scenario():
+        queues = [broadcaster.subscribe() for _ in range(3)]
+        dumps = count_dumps(monkeypatch)
+        isolated_storage.update("c1", {"status": "DO"})
+        return dumps, [queue.get_nowait() for queue in queues]
+
+    dumps, events = asyncio.run(scenario())
+    assert dumps == ["c1"]
+    for event in events:
+        assert event["type"] == "contact.upserted"
+        assert event["contact"]["status"] == "DO"
+        assert event["version"] == isolated_storage.version
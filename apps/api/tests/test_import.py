@@ -0,0 +1,68 @@
+import asyncio
+
+import main
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Prénom,Nom,Email,Téléphone\n")
+        for first_name, last_name, email, phone in rows:
+            f.write(f"{first_name},{last_name},{email},{phone}\n")
+
+
+def reopen_store(store):
+    """Stockage relu depuis le disque, comme après un redémarrage."""
+    reopened = main.ContactStore(
+        main.ContactJournal(store.journal.path, store.journal.compacting_path)
+    )
+    main.contacts_journal = reopened.journal
+    reopened.load()
+    return reopened
+
+
+def test_import_is_durable_and_notifies_once(isolated_storage, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "IMPORT_CSV_BLOCK_SIZE", 256)  # Plusieurs lots
+    isolated_storage.create(
+        main.ContactInDB(id="old", firstName="Jean", lastName="Dupont", email="J@X.fr")
+    )
+    since = isolated_storage.version
+    events = []
+    isolated_storage.add_listener(events.append)
+
+    path = tmp_path / "import.csv"
+    write_csv(
+        path,
+        [("Jean", "Dupont", "j@x.fr", "0612345678")]
+        + [(f"P{i}", f"N{i}", f"p{i}@x.fr", f"06{i:08d}") for i in range(40)],
+    )
+    asyncio.run(main.process_imported_file(path, "text/csv"))
+
+    assert len(isolated_storage) == 41
+    assert "old" not in isolated_storage
+    assert [event["type"] for event in events] == ["contacts.reset"]
+    # Les curseurs de synchronisation restent valides pendant et après l'import
+    upserted, deleted = isolated_storage.changes_since(since)
+    assert len(upserted) == 41
+    assert deleted == ["old"]
+    assert len(reopen_store(isolated_storage)) == 41
+
+
+def test_import_interrupted_keeps_batches_already_merged(
+    isolated_storage, tmp_path, monkeypatch
+):
+    def failing_batches(path, content_type):
+        yield main.pd.DataFrame(
+            {"Prénom": ["Ada", "Alan"], "Nom": ["Lovelace", "Turing"]}
+        )
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(main, "iter_import_batches", failing_batches)
+    path = tmp_path / "import.csv"
+    path.write_text("")
+    asyncio.run(main.process_imported_file(path, "text/csv"))
+
+    assert len(isolated_storage) == 2
+    # Rien n'a été réécrit dans le fichier de base : les lots viennent du journal
+    assert not main.CONTACTS_STORAGE_FILE.exists()
+    reopened = reopen_store(isolated_storage)
+    assert sorted(row["firstName"] for row in reopened.records()) == ["Ada", "Alan"]
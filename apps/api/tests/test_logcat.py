@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+
+class RecordingMonitor:
+    """Moniteur minimal : enregistre les états soumis par le détecteur."""
+
+    def __init__(self):
+        self.device = SimpleNamespace(serial="R58A", label="R58A")
+        self.states = []
+
+    def submit(self, state):
+        self.states.append(state)
+        return state
+
+
+@pytest.fixture
+def detector():
+    return main.LogcatCallStateDetector(RecordingMonitor())
+
+
+def feed(detector, lines):
+    """Soumet les lignes et renvoie (ligne, état émis ou None) pour chacune."""
+    return [(line, detector.feed_line(line + "\n")) for line in lines]
+
+
+# Appel sortant : 'adb logcat -v brief -b main -b system -b radio Telecom:I TelephonyRegistry:D'
+OUTGOING_CALL = [
+    "I/Telecom ( 1568): CallsManager: setCallState NEW -> CONNECTING, call: [TC@5, NEW, null, "
+    "tel:+33612345678, A, childs(0), has_parent(false), [Capabilities:], [Properties:]]: CSW.oCR@AJk",
+    "I/Telecom ( 1568): Event: RecordEntry TC@5: SET_DIALING, successful outgoing call: CSW.hCCC@AJo",
+    "D/TelephonyRegistry( 1231): notifyCallStateForAllSubs: state=2 phoneNumber=",
+    "I/Telecom ( 1568): CallsManager: setCallState DIALING -> ACTIVE, call: [TC@5, DIALING, "
+    "com.android.phone/TelephonyConnectionService, tel:+33612345678, A]: CSW.sA@AKE",
+    "I/Telecom ( 1568): CallsManager: setCallState ACTIVE -> DISCONNECTED, call: [TC@5, ACTIVE, "
+    "com.android.phone/TelephonyConnectionService, tel:+33612345678, A]: CSW.sD@AKw",
+    "D/TelephonyRegistry( 1231): notifyCallStateForAllSubs: state=0 phoneNumber=",
+]
+
+# Appel entrant : sonnerie (state=1), décroché (state=2), repos (state=0)
+INCOMING_CALL = [
+    "D/TelephonyRegistry( 1231): notifyCallState: subId=1 state=1 phoneNumber=+33698765432",
+    "I/Telecom ( 1568): CallsManager: setCallState NEW -> RINGING, call: [TC@7, NEW, "
+    "com.android.phone/TelephonyConnectionService, tel:0698765432, A]: CSW.hCCC@AMI",
+    "D/TelephonyRegistry( 1231): notifyCallState: subId=1 state=2 phoneNumber=+33698765432",
+    "D/TelephonyRegistry( 1231): notifyCallState: subId=1 state=0 phoneNumber=",
+]
+
+NOISE = [
+    "I/Telecom ( 1568): PhoneAccountRegistrar: getSimCallManager: SimCallManager for subId 1 "
+    "queried, returning: null",
+    "D/TelephonyRegistry( 1231): notifyPreciseCallState: ringingCallState=0 "
+    "foregroundCallState=1 backgroundCallState=0",
+    "D/TelephonyRegistry( 1231): notifyServiceStateForPhoneId: phoneId=0 subId=1 state=0",
+    "I/Telecom ( 1568): InCallController: Binding complete -> InCallService: CSW.oCR@AJk",
+    "D/TelephonyRegistry( 1231): listen: Binder.getCallingUid()=10123 events=0x20",
+    "--------- beginning of radio",
+]
+
+
+def summary(state):
+    return (
+        state["call_in_progress"],
+        state["mCallState"],
+        state["telecom_dump_calls"],
+        state["detected_phone_number"],
+    )
+
+
+def test_outgoing_call_transitions(detector):
+    states = [state for _line, state in feed(detector, OUTGOING_CALL)]
+
+    assert [summary(state) for state in states] == [
+        (True, -1, ["Call id=TC@5, state=CONNECTING"], "+33612345678"),
+        (True, -1, ["Call id=TC@5, state=DIALING"], "+33612345678"),
+        (True, 2, ["Call id=TC@5, state=DIALING"], "+33612345678"),
+        (True, 2, ["Call id=TC@5, state=ACTIVE"], "+33612345678"),
+        # TelephonyRegistry fait foi pour la fin d'appel : encore OFFHOOK
+        (True, 2, [], None),
+        (False, 0, [], None),
+    ]
+    assert not main.call_state_is_answered(states[1])
+    assert main.call_state_is_answered(states[3])
+    assert detector.monitor.states == states
+
+
+def test_incoming_call_ringing_offhook_idle(detector):
+    states = [state for _line, state in feed(detector, INCOMING_CALL)]
+
+    assert [(state["call_in_progress"], state["mCallState"]) for state in states] == [
+        (True, 1),
+        (True, 1),
+        (True, 2),
+        (False, 0),
+    ]
+    assert states[1]["telecom_dump_calls"] == ["Call id=TC@7, state=RINGING"]
+    assert states[1]["detected_phone_number"] == "0698765432"
+    # L'état repos vide aussi les appels Telecom suivis
+    assert states[3]["telecom_dump_calls"] == []
+
+
+def test_unrelated_lines_emit_nothing(detector):
+    assert [state for _line, state in feed(detector, NOISE)] == [None] * len(NOISE)
+    assert detector.monitor.states == []
+
+
+def test_noise_between_transitions_is_ignored(detector):
+    lines = OUTGOING_CALL[:3] + NOISE + OUTGOING_CALL[3:]
+    emitted = [line for line, state in feed(detector, lines) if state is not None]
+
+    assert emitted == OUTGOING_CALL
+    assert detector.monitor.states[-1]["call_in_progress"] is False
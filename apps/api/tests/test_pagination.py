@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(isolated_storage):
+    for i in range(5):
+        isolated_storage.create(main.ContactInDB(id=f"c{i}", firstName=f"P{i}", lastName="Test"))
+    return TestClient(main.app)
+
+
+def fetch_all(client, **params):
+    ids, cursor = [], None
+    while True:
+        response = client.get("/contacts", params={**params, **({"after": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [contact["id"] for contact in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pagination_walks_every_contact_once(client, isolated_storage):
+    first = client.get("/contacts", params={"limit": 2})
+    cursor = first.headers["X-Next-Cursor"]
+    isolated_storage.delete("c0")
+    isolated_storage.create(main.ContactInDB(id="c5", firstName="P5", lastName="Test"))
+
+    rest = fetch_all(client, limit=2, after=cursor)
+    assert [c["id"] for c in first.json()] + rest == ["c0", "c1", "c2", "c3", "c4", "c5"]
+
+
+def test_cursor_issued_before_reload_is_rejected(client, isolated_storage):
+    cursor = client.get("/contacts", params={"limit": 2}).headers["X-Next-Cursor"]
+    isolated_storage.load()  # Redémarrage : séquences renumérotées
+
+    response = client.get("/contacts", params={"limit": 2, "after": cursor})
+    assert response.status_code == 410
+
+
+@pytest.mark.parametrize("cursor", ["12", "abc", "epoch.x"])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get("/contacts", params={"limit": 2, "after": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,103 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.mark.parametrize(
+    "number, expected",
+    [
+        ("06 12 34 56 78", "+33612345678"),
+        ("+33 6 12 34 56 78", "+33612345678"),
+        ("0033612345678", "+33612345678"),
+        ("33612345678", "+33612345678"),
+        ("612345678", "+33612345678"),
+        ("06.12.34.56.78", "+33612345678"),
+        ("+44 20 7946 0958", "+442079460958"),
+        ("12345", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_phone_number_to_e164(number, expected):
+    assert main.phone_number_to_e164(number) == expected
+
+
+def test_phone_index_finds_contacts_in_any_format(isolated_storage):
+    isolated_storage.create(
+        main.ContactInDB(id="a", firstName="Ada", lastName="L", phoneNumber="+33 6 12 34 56 78")
+    )
+    isolated_storage.create(
+        main.ContactInDB(id="b", firstName="Bob", lastName="M", phoneNumber="0612345678")
+    )
+    isolated_storage.create(
+        main.ContactInDB(id="c", firstName="Cy", lastName="N", phoneNumber="0698765432")
+    )
+
+    assert isolated_storage.find_by_phone("0033612345678") == ["a", "b"]
+    assert isolated_storage.find_by_phone("612345678") == ["a", "b"]
+
+    isolated_storage.update("b", {"phoneNumber": "07 00 00 00 00"})
+    isolated_storage.delete("c")
+    assert isolated_storage.find_by_phone("0612345678") == ["a"]
+    assert isolated_storage.find_by_phone("+33700000000") == ["b"]
+    assert isolated_storage.find_by_phone("0698765432") == []
+
+
+def test_by_phone_endpoint(isolated_storage):
+    isolated_storage.create(
+        main.ContactInDB(id="a", firstName="Ada", lastName="L", phoneNumber="+33 6 12 34 56 78")
+    )
+    client = TestClient(main.app)
+
+    response = client.get("/contacts/by-phone/0612345678")
+    assert response.status_code == 200
+    assert [contact["id"] for contact in response.json()] == ["a"]
+    assert client.get("/contacts/by-phone/0700000000").status_code == 404
+
+
+FORMAT_SAMPLES = [
+    "0612345678",
+    "06 12 34 56 78",
+    "06.12.34.56.78",
+    "+33612345678",
+    "+33 6 12 34 56 78",
+    "33612345678",
+    "612345678",
+    "812345678",
+    "0033612345678",
+    "+44 20 7946 0958",
+    "+33 6 12",
+    "06-12-34-56-7",
+    "(01) 23 45 67 89",
+    "+33+612345678",
+    "tel: 06 12 34 56 78",
+    "abc",
+    "",
+    "   ",
+    "٠٦١٢٣٤٥٦٧٨",
+    None,
+    float("nan"),
+    612345678,
+]
+
+
+def test_phone_column_matches_scalar_formatter():
+    values = main.pd.Series(FORMAT_SAMPLES, dtype=object)
+
+    formatted = main.format_phone_number_column(values)
+    assert formatted.tolist() == [main.format_phone_number(value) for value in FORMAT_SAMPLES]
+    assert formatted.index.equals(values.index)
+
+
+def test_import_normalizes_phone_numbers():
+    batch = main.pd.DataFrame(
+        {
+            "Prénom": ["Ada", "Alan", "Grace"],
+            "Nom": ["Lovelace", "Turing", "Hopper"],
+            "Téléphone": ["06.12.34.56.78", "+44 20 7946 0958", None],
+        }
+    )
+
+    frame = main.normalize_import_frame(batch)
+    assert frame["phoneNumber"].tolist() == ["+33 6 12 34 56 78", "+442079460958", None]
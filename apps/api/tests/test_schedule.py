@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.mark.parametrize(
+    "date_str, time_str, expected",
+    [
+        ("25/12/2026", "14:30", "2026-12-25T14:30:00+01:00"),
+        ("2026-07-14", "9h05", "2026-07-14T09:05:00+02:00"),
+        (" 14/07/2026 ", None, "2026-07-14T00:00:00+02:00"),
+        ("14/07/2026", "25:00", "2026-07-14T00:00:00+02:00"),
+        # Passage à l'heure d'été : 02:30 n'existe pas, même instant que 03:30 CEST
+        ("29/03/2026", "02:30", "2026-03-29T01:30:00+00:00"),
+        # Retour à l'heure d'hiver : 02:30 ambiguë, première occurrence (CEST)
+        ("25/10/2026", "02:30", "2026-10-25T00:30:00+00:00"),
+        ("31/02/2026", "10:00", None),
+        ("demain", "10:00", None),
+        ("", "10:00", None),
+        (None, None, None),
+    ],
+)
+def test_parse_schedule_datetime(date_str, time_str, expected):
+    parsed = main.parse_schedule_datetime(date_str, time_str)
+    if expected is None:
+        assert parsed is None
+    else:
+        # Comparaison d'instants : heures d'été inexistantes / ambiguës comprises
+        assert parsed.timestamp() == datetime.fromisoformat(expected).timestamp()
+
+
+def test_schedule_column_matches_scalar_parser():
+    dates = ["25/12/2026", "2026-07-14", "29/03/2026", "25/10/2026", "31/02/2026", None, ""]
+    times = ["14:30", "9h05", "02:30", "02:30", "10:00", "10:00", None]
+
+    column = main.schedule_datetime_column(pd.Series(dates), pd.Series(times))
+    assert str(column.dtype) == "datetime64[ns, Europe/Paris]"
+    for value, date_str, time_str in zip(column, dates, times):
+        expected = main.parse_schedule_datetime(date_str, time_str)
+        if expected is None:
+            assert pd.isna(value)
+        else:
+            assert value.timestamp() == expected.timestamp()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("30s", 30), ("15m", 900), ("15", 900), ("2h", 7200), ("1d", 86400), (" 1j ", 86400)],
+)
+def test_parse_duration_query(value, expected):
+    assert main.parse_duration_query(value) == timedelta(seconds=expected)
+
+
+def schedule_fields(prefix, at):
+    return {f"date{prefix}": at.strftime("%d/%m/%Y"), f"heure{prefix}": at.strftime("%H:%M")}
+
+
+@pytest.fixture
+def client(isolated_storage):
+    now = datetime.now(main.PARIS_TZ)
+    for contact_id, prefix, delta in [
+        ("bientot", "Rappel", timedelta(minutes=10)),
+        ("rdv", "RendezVous", timedelta(minutes=5)),
+        ("plus-tard", "Rappel", timedelta(hours=1)),
+        ("en-retard", "Rappel", timedelta(minutes=-30)),
+    ]:
+        isolated_storage.create(
+            main.ContactInDB(
+                id=contact_id,
+                firstName=contact_id,
+                lastName="Test",
+                **schedule_fields(prefix, now + delta),
+            )
+        )
+    return TestClient(main.app)
+
+
+def due(client, **params):
+    response = client.get("/callbacks/due", params=params)
+    assert response.status_code == 200
+    return [(c["contact"]["id"], c["kind"]) for c in response.json()["callbacks"]]
+
+
+def test_callbacks_due_window(client):
+    assert due(client) == [("rdv", "rendezVous"), ("bientot", "rappel")]
+    assert due(client, within="2h", overdue="1h") == [
+        ("en-retard", "rappel"),
+        ("rdv", "rendezVous"),
+        ("bientot", "rappel"),
+        ("plus-tard", "rappel"),
+    ]
+    assert due(client, within="2h", kind="rappel") == [("bientot", "rappel"), ("plus-tard", "rappel")]
+
+
+def test_callbacks_due_follows_rescheduling(client, isolated_storage):
+    later = datetime.now(main.PARIS_TZ) + timedelta(days=2)
+    isolated_storage.update("bientot", schedule_fields("Rappel", later))
+    isolated_storage.update("rdv", {"dateRendezVous": None})
+
+    assert due(client) == []
+    assert due(client, within="3d", kind="rappel")[-1] == ("bientot", "rappel")
+
+
+@pytest.mark.parametrize("params", [{"within": "demain"}, {"overdue": "-1h"}])
+def test_callbacks_due_rejects_invalid_durations(client, params):
+    assert client.get("/callbacks/due", params=params).status_code == 400
@@ -0,0 +1,40 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def store(isolated_storage):
+    isolated_storage.create(
+        main.ContactInDB(
+            id="c1",
+            firstName="Jean",
+            lastName="Dupont",
+            phoneNumber=main.format_phone_number("06 12 34 56 78"),
+        )
+    )
+    isolated_storage.create(
+        main.ContactInDB(id="c2", firstName="Ada", lastName="Lovelace", phoneNumber="0798765432")
+    )
+    return isolated_storage
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "+33 6 12 34 56 78",
+        "+33612345678",
+        "0033 6 12 34 56 78",
+        "06.12.34.56.78",
+        "06-12-34",
+        "0612",
+        "dupont 0612345678",
+    ],
+)
+def test_search_matches_phone_in_any_format(store, query):
+    assert store.search(query) == ["c1"]
+
+
+@pytest.mark.parametrize("query", ["+33 7 12", "+44 6 12 34", "dupont 0798"])
+def test_search_phone_terms_still_filter(store, query):
+    assert store.search(query) == []
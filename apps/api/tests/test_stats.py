@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_stats_counters_follow_mutations(isolated_storage):
+    client = TestClient(main.app)
+    for i, (status, source) in enumerate(
+        [("Rappel", "Salon"), ("Rappel", "Web"), (None, "Web"), ("Rendez-vous", None)]
+    ):
+        isolated_storage.create(
+            main.ContactInDB(
+                id=f"c{i}", firstName=f"P{i}", lastName="Test", status=status, source=source
+            )
+        )
+    isolated_storage.update("c1", {"status": "Rendez-vous"})
+    isolated_storage.delete("c0")
+
+    body = client.get("/contacts/stats").json()
+    assert body["total"] == 3
+    assert body["by_status"] == {"Rendez-vous": 2, "Non défini": 1}
+    assert body["by_source"] == {"Web": 2, "Inconnue": 1}
+    assert body["version"] == isolated_storage.version
+
+
+def test_stats_counters_match_a_full_recount_after_reload(isolated_storage):
+    for i in range(6):
+        isolated_storage.create(
+            main.ContactInDB(id=f"c{i}", firstName=f"P{i}", lastName="Test", status=f"S{i % 3}")
+        )
+    for i in range(4):
+        isolated_storage.update(f"c{i}", {"status": "Rappel"})
+    incremental = isolated_storage.stats()
+
+    isolated_storage.load()
+    assert isolated_storage.stats() == incremental
+    assert incremental["by_status"] == {"Rappel": 4, "S1": 1, "S2": 1}
+
+
+def test_stats_honours_if_none_match(isolated_storage):
+    client = TestClient(main.app)
+    etag = client.get("/contacts/stats").headers["ETag"]
+
+    assert client.get("/contacts/stats", headers={"If-None-Match": etag}).status_code == 304
+    isolated_storage.create(main.ContactInDB(id="c0", firstName="P0", lastName="Test"))
+    assert client.get("/contacts/stats", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,51 @@
+import pyarrow.parquet
+import pytest
+
+import main
+
+
+RECORDS = [
+    {
+        "id": "c1",
+        "firstName": "Ada",
+        "lastName": "Lovelace",
+        "dateRappel": "25/12/2026",
+        "heureRappel": "14:30",
+        "isCurrentlyInCall": False,
+    },
+    {"id": "c2", "firstName": "Alan", "lastName": "Turing"},
+]
+
+
+def stored_schema():
+    return pyarrow.parquet.read_schema(main.CONTACTS_STORAGE_FILE).remove_metadata()
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda: main.write_contacts_base(main.contact_records_to_dataframe(RECORDS)),
+        lambda: main.write_contacts_base_records(RECORDS),
+    ],
+    ids=["dataframe", "records"],
+)
+def test_base_writers_share_one_schema(isolated_storage, write):
+    write()
+
+    assert stored_schema().equals(main.CONTACT_STORAGE_SCHEMA)
+    assert stored_schema().field("rappelAt").type == pyarrow.timestamp("us", tz="Europe/Paris")
+    rows = {row["id"]: row for row in main.read_base_contact_records()}
+    assert rows["c1"]["rappelAt"].isoformat() == "2026-12-25T14:30:00+01:00"
+
+
+def test_migration_rewrites_base_written_with_another_schema(isolated_storage):
+    # Ancien chemin d'écriture : pandas.to_parquet, horodatages en nanosecondes
+    main.add_contact_schedule_columns(main.contact_records_to_dataframe(RECORDS)).to_parquet(
+        main.CONTACTS_STORAGE_FILE, index=False
+    )
+    assert not stored_schema().equals(main.CONTACT_STORAGE_SCHEMA)
+
+    main.migrate_contacts_storage_schema()
+
+    assert stored_schema().equals(main.CONTACT_STORAGE_SCHEMA)
+    assert sorted(row["id"] for row in main.read_base_contact_records()) == ["c1", "c2"]
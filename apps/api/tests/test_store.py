@@ -0,0 +1,101 @@
+import asyncio
+
+import main
+
+
+def reopen_store(store):
+    """Stockage relu depuis le disque, comme après un redémarrage."""
+    reopened = main.ContactStore(
+        main.ContactJournal(store.journal.path, store.journal.compacting_path)
+    )
+    main.contacts_journal = reopened.journal
+    reopened.load()
+    return reopened
+
+
+def contact(contact_id, first_name, last_name="Test", **fields):
+    return main.ContactInDB(id=contact_id, firstName=first_name, lastName=last_name, **fields)
+
+
+def snapshot(store):
+    return {row["id"]: (row["firstName"], row["status"]) for row in store.records()}
+
+
+def test_mutations_are_served_from_memory_by_id(isolated_storage):
+    for i in range(4):
+        isolated_storage.create(contact(f"c{i}", f"P{i}"))
+    isolated_storage.update("c1", {"status": "Rappel"})
+    isolated_storage.delete("c2")
+
+    assert len(isolated_storage) == 3
+    assert "c2" not in isolated_storage
+    assert isolated_storage.get("c1")["status"] == "Rappel"
+    assert isolated_storage.get("c2") is None
+    assert isolated_storage.update("c2", {"status": "Rappel"}) is None
+    assert not isolated_storage.delete("c2")
+    # Aucune écriture du fichier de base : seul le journal est alimenté
+    assert not main.CONTACTS_STORAGE_FILE.exists()
+    assert [entry["op"] for entry in isolated_storage.journal.entries()] == [
+        "upsert", "upsert", "upsert", "upsert", "patch", "delete"
+    ]
+
+
+def test_deleted_slots_are_compacted_without_losing_the_index(isolated_storage):
+    for i in range(6):
+        isolated_storage.create(contact(f"c{i}", f"P{i}"))
+    for i in range(4):
+        isolated_storage.delete(f"c{i}")
+
+    assert [row["id"] for row in isolated_storage.records()] == ["c4", "c5"]
+    assert isolated_storage.get("c5")["firstName"] == "P5"
+    isolated_storage.update("c4", {"status": "Rappel"})
+    assert isolated_storage.get("c4")["status"] == "Rappel"
+
+
+def test_journal_replay_and_compaction_round_trip(isolated_storage):
+    for i in range(3):
+        isolated_storage.create(contact(f"c{i}", f"P{i}"))
+    isolated_storage.update("c0", {"status": "Rappel"})
+    isolated_storage.delete("c1")
+    expected = snapshot(isolated_storage)
+
+    # Redémarrage avant compaction : l'état vient du rejeu du journal
+    assert snapshot(reopen_store(isolated_storage)) == expected
+
+    asyncio.run(main.compact_contacts_journal())
+    assert main.CONTACTS_STORAGE_FILE.exists()
+    assert main.contacts_journal.entries() == []
+    assert sorted(row["id"] for row in main.read_base_contact_records()) == ["c0", "c2"]
+
+    # Mutations après compaction : base repliée + nouveau journal
+    reopened = reopen_store(isolated_storage)
+    reopened.update("c2", {"status": "Rendez-vous"})
+    expected["c2"] = ("P2", "Rendez-vous")
+    assert snapshot(reopen_store(reopened)) == expected
+
+
+def test_interrupted_compaction_is_replayed_then_folded(isolated_storage):
+    isolated_storage.create(contact("c0", "P0"))
+    isolated_storage.journal.rotate()  # Compaction interrompue avant le repli
+    isolated_storage.update("c0", {"status": "Rappel"})
+
+    assert snapshot(reopen_store(isolated_storage)) == {"c0": ("P0", "Rappel")}
+    asyncio.run(main.compact_contacts_journal())
+    assert not main.contacts_journal.compacting_path.exists()
+    assert snapshot(reopen_store(isolated_storage)) == {"c0": ("P0", "Rappel")}
+
+
+def test_model_cache_rebuilds_only_the_mutated_row(isolated_storage):
+    for i in range(3):
+        isolated_storage.create(contact(f"c{i}", f"P{i}"))
+    before = main.get_cached_contacts()
+
+    isolated_storage.update("c1", {"status": "Rappel"})
+    after = main.get_cached_contacts()
+
+    assert after[0] is before[0] and after[2] is before[2]
+    assert after[1] is not before[1]
+    assert after[1].status == "Rappel"
+    assert isolated_storage.get_model("c1") is after[1]
+    isolated_storage.delete("c0")
+    assert [model.id for model in main.get_cached_contacts()] == ["c1", "c2"]
@@ -0,0 +1,80 @@
+import json
+
+import pyarrow
+import pyarrow.ipc
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(isolated_storage, monkeypatch):
+    monkeypatch.setattr(main, "CONTACT_STREAM_CHUNK_SIZE", 2)  # Plusieurs blocs
+    for i in range(5):
+        isolated_storage.create(
+            main.ContactInDB(
+                id=f"c{i}",
+                firstName=f"P{i}",
+                lastName="Test",
+                phoneNumber=f"06 00 00 00 0{i}",
+                dateRappel="25/12/2026" if i == 0 else None,
+                heureRappel="14:30" if i == 0 else None,
+            )
+        )
+    return TestClient(main.app)
+
+
+def test_ndjson_stream_matches_json_list(client):
+    expected = client.get("/contacts").json()
+
+    response = client.get("/contacts", headers={"Accept": main.NDJSON_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == main.NDJSON_MEDIA_TYPE
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+
+def test_ndjson_stream_applies_projection_and_pagination(client):
+    response = client.get(
+        "/contacts",
+        params={"fields": "firstName", "limit": 3},
+        headers={"Accept": main.NDJSON_MEDIA_TYPE},
+    )
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"id": "c0", "firstName": "P0"},
+        {"id": "c1", "firstName": "P1"},
+        {"id": "c2", "firstName": "P2"},
+    ]
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_arrow_stream_round_trips_contacts(client):
+    response = client.get("/contacts", headers={"Accept": main.ARROW_STREAM_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == main.ARROW_STREAM_MEDIA_TYPE
+
+    reader = pyarrow.ipc.open_stream(response.content)
+    batches = list(reader)
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    table = pyarrow.Table.from_batches(batches, schema=reader.schema)
+    assert table.schema.field("isCurrentlyInCall").type == pyarrow.bool_()
+    assert table.schema.field("rappelAt").type == pyarrow.timestamp("us", tz="Europe/Paris")
+    rows = table.to_pylist()
+    assert [row["id"] for row in rows] == ["c0", "c1", "c2", "c3", "c4"]
+    assert rows[0]["rappelAt"].isoformat() == "2026-12-25T14:30:00+01:00"
+    assert rows[1]["rappelAt"] is None
+    assert rows[4]["phoneNumber"] == "06 00 00 00 04"
+
+
+def test_arrow_stream_projection_and_empty_store(client, isolated_storage):
+    response = client.get(
+        "/contacts",
+        params={"fields": "lastName"},
+        headers={"Accept": main.ARROW_STREAM_MEDIA_TYPE},
+    )
+    assert pyarrow.ipc.open_stream(response.content).schema.names == ["lastName", "id"]
+
+    isolated_storage.clear()
+    response = client.get("/contacts", headers={"Accept": main.ARROW_STREAM_MEDIA_TYPE})
+    assert pyarrow.ipc.open_stream(response.content).read_all().num_rows == 0
+